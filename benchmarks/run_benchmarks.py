@@ -0,0 +1,254 @@
+"""アプリのホットパスをヘッドレスで計測するベンチマーク。
+
+使い方（リポジトリ直下で実行）:
+    QT_QPA_PLATFORM=offscreen python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --save-baseline      # 現在の結果をベースラインとして保存
+    python benchmarks/run_benchmarks.py -k timeline          # 名前に timeline を含むものだけ実行
+
+ベースライン（benchmarks/baseline.json）が存在する場合は中央値を比較し、
+閾値を超えて遅くなったケースがあれば終了コード 1 を返す。
+
+baseline.json はリポジトリに含めてあり、"_environment" に計測した環境（Python・Qt・OS）を記録している。
+所要時間は計測する機械に左右されるため、比較は同じ機械で取ったベースラインと行うこと。
+ホットパスを意図して変えたとき（速くなった場合も含む）や計測する機械を変えたときは、
+変更後に --save-baseline を実行して baseline.json を更新し、変更と同じコミットに含める。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Qt はオフスクリーンで動かす（import 前に設定する必要がある）
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import PySide6  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+from PySide6.QtGui import QPixmap  # noqa: E402
+from PySide6.QtCore import QPoint  # noqa: E402
+
+import synthetic  # noqa: E402
+from champion_aliases import ChampionAliases  # noqa: E402
+from champion_matcher import ChampionMatcher  # noqa: E402
+from diary_tab import TimelineWidget  # noqa: E402
+from lol_pick_support_tab import LolPickSupportTab  # noqa: E402
+from todo_store import read_todos, write_todos  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+# ベースライン比でこの倍率を超えたら劣化とみなす
+DEFAULT_THRESHOLD = 1.25
+
+
+def measure(func, rounds: int, warmup: int = 1) -> dict:
+    """func を rounds 回実行し、所要時間（ミリ秒）の統計を返す"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "rounds": rounds,
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def _timeline_with_events(n: int) -> TimelineWidget:
+    tl = TimelineWidget()
+    tl.events = synthetic.make_events(n)
+    tl.resize(800, tl.minimumHeight())
+    return tl
+
+
+def bench_timeline_paint(n: int):
+    tl = _timeline_with_events(n)
+    pix = QPixmap(tl.size())
+
+    def run():
+        tl.render(pix)
+    return run
+
+
+def bench_hit_test(n: int):
+    tl = _timeline_with_events(n)
+    rng = random.Random(1)
+    points = [QPoint(rng.randrange(0, tl.width()), rng.randrange(0, tl.height())) for _ in range(200)]
+
+    def run():
+        for p in points:
+            tl._hit_test(p)
+    return run
+
+
+def bench_to_json(n: int):
+    tl = _timeline_with_events(n)
+    return tl.to_json
+
+
+def bench_from_json(n: int):
+    content = _timeline_with_events(n).to_json()
+    tl = TimelineWidget()
+
+    def run():
+        tl.from_json(content)
+    return run
+
+
+def _lol_tab() -> LolPickSupportTab:
+    tab = LolPickSupportTab(client=None)
+    tab.champions = synthetic.load_champions()
+    tab.aliases = ChampionAliases.from_names(tab.champions)
+    tab.matcher = ChampionMatcher(tab.champions, tab.aliases.matcher_aliases())
+    return tab
+
+
+def bench_to_hiragana():
+    tab = _lol_tab()
+    names = tab.champions
+
+    def run():
+        for name in names:
+            tab._to_hiragana(name)
+    return run
+
+
+def bench_update_completer():
+    tab = _lol_tab()
+    combo = tab.ban_combos[0]
+    strokes = synthetic.make_keystrokes("ツイステッド・フェイト") + synthetic.make_keystrokes("あ")
+
+    def run():
+        for text in strokes:
+            tab._update_completer(combo, text)
+    return run
+
+
+def bench_ocr_extract():
+    tab = _lol_tab()
+    text = synthetic.make_ocr_text(tab.champions, n_names=10, noise_chars=2000)
+
+    def run():
+        tab._extract_champion_names(text)
+    return run
+
+
+def bench_todo_save(n: int, tmpdir: str):
+    todos = synthetic.make_todos(n)
+    path = os.path.join(tmpdir, f"todos_save_{n}.json")
+
+    def run():
+        write_todos(todos, path)
+    return run
+
+
+def bench_todo_load(n: int, tmpdir: str):
+    path = os.path.join(tmpdir, f"todos_load_{n}.json")
+    write_todos(synthetic.make_todos(n), path)
+
+    def run():
+        read_todos(path)
+    return run
+
+
+def build_cases(tmpdir: str) -> list:
+    """(名前, 準備関数, 計測回数) の一覧"""
+    cases = []
+    for n in (50, 500, 2000):
+        cases.append((f"timeline_paint[{n}]", lambda n=n: bench_timeline_paint(n), 20))
+    for n in (50, 2000):
+        cases.append((f"hit_test_x200[{n}]", lambda n=n: bench_hit_test(n), 20))
+    for n in (1000, 10000):
+        cases.append((f"to_json[{n}]", lambda n=n: bench_to_json(n), 10))
+        cases.append((f"from_json[{n}]", lambda n=n: bench_from_json(n), 10))
+    cases.append(("to_hiragana_roster", bench_to_hiragana, 50))
+    cases.append(("update_completer_keystrokes", bench_update_completer, 20))
+    cases.append(("ocr_extract_names", bench_ocr_extract, 50))
+    for n in (10000, 50000):
+        cases.append((f"todo_save[{n}]", lambda n=n: bench_todo_save(n, tmpdir), 10))
+        cases.append((f"todo_load[{n}]", lambda n=n: bench_todo_load(n, tmpdir), 10))
+    return cases
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """ベースラインより threshold 倍以上遅くなったケース名を返す"""
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = res["median_ms"] / max(base["median_ms"], 1e-9)
+        res["baseline_ratio"] = ratio
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def environment() -> dict:
+    """ベースラインに添える計測環境"""
+    return {
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DiaryApp ホットパスのベンチマーク")
+    parser.add_argument("-k", dest="keyword", default="", help="名前にこの文字列を含むケースだけ実行")
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="ベースラインファイルのパス")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="劣化とみなす倍率")
+    parser.add_argument("--json", dest="json_out", help="結果を JSON で書き出すパス")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, setup, rounds in build_cases(tmpdir):
+            if args.keyword and args.keyword not in name:
+                continue
+            results[name] = measure(setup(), rounds)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        saved_env = baseline.pop("_environment", None)
+        if saved_env and saved_env != environment():
+            print(f"注意: ベースラインは別の環境で計測されています（{saved_env.get('platform')}）。比較は目安です。")
+    regressions = compare(results, baseline, args.threshold)
+
+    print(f"{'case':36s} {'median':>10s} {'min':>10s} {'vs base':>8s}")
+    for name, res in results.items():
+        ratio = res.get("baseline_ratio")
+        mark = " !" if name in regressions else ""
+        ratio_s = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{name:36s} {res['median_ms']:9.3f}ms {res['min_ms']:9.3f}ms {ratio_s:>8s}{mark}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"_environment": environment(), **results}, f, ensure_ascii=False, indent=2)
+        print(f"ベースラインを保存しました: {args.baseline}")
+    if regressions:
+        print("劣化したケース: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
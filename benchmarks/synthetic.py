@@ -0,0 +1,61 @@
+"""ベンチマーク用の合成データ生成。乱数シードを固定して毎回同じデータを作る。"""
+import json
+import os
+import random
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAMPION_JSON = os.path.join(ROOT_DIR, "champion_names_ja.json")
+
+# タイムラインの表示範囲（06:00 〜 翌 06:00、15 分単位）
+DAY_START_MIN = 6 * 60
+DAY_TOTAL_MIN = 24 * 60
+SLOT_MIN = 15
+
+_TITLES = ["会議", "作業", "昼食", "移動", "読書", "運動", "ゲーム", "買い物", "勉強", "睡眠"]
+_LOCATIONS = ["自宅", "会社", "カフェ", "駅", "ジム", ""]
+
+
+def load_champions() -> list[str]:
+    with open(CHAMPION_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_events(n: int, seed: int = 0) -> list[dict]:
+    """n 件のイベントを生成する（重なりを許容、時刻は 15 分単位）"""
+    rng = random.Random(seed)
+    slots = DAY_TOTAL_MIN // SLOT_MIN
+    events = []
+    for i in range(n):
+        start_slot = rng.randrange(0, slots - 1)
+        length = rng.randint(1, min(8, slots - start_slot))
+        start = DAY_START_MIN + start_slot * SLOT_MIN
+        events.append({
+            "start": start,
+            "end": start + length * SLOT_MIN,
+            "title": f"{rng.choice(_TITLES)} {i}",
+            "location": rng.choice(_LOCATIONS),
+            "reflection": "振り返り" * rng.randint(0, 20),
+        })
+    return events
+
+
+def make_todos(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(_TITLES)}の準備 #{i}" for i in range(n)]
+
+
+def make_keystrokes(word: str) -> list[str]:
+    """1 文字ずつ入力したときの入力欄テキストの列を返す"""
+    return [word[:i] for i in range(1, len(word) + 1)]
+
+
+def make_ocr_text(champions: list[str], n_names: int = 10, noise_chars: int = 400, seed: int = 0) -> str:
+    """チャンピオン名をノイズ文字列の中に散らした疑似 OCR テキストを生成する"""
+    rng = random.Random(seed)
+    noise_pool = "あいうえおカキクケコ0123456789abcXYZ ー・\n"
+    names = rng.sample([c for c in champions if c != "指定なし"], n_names)
+    parts = []
+    for name in names:
+        parts.append("".join(rng.choice(noise_pool) for _ in range(noise_chars // max(1, n_names))))
+        parts.append(name)
+    return "".join(parts)
@@ -0,0 +1,190 @@
+"""OpenAI クライアントのラッパー。
+
+- httpx のコネクションプールを共有し、起動時にバックグラウンドで事前接続して TLS ハンドシェイクを済ませる
+- 呼び出しごとにタイムアウトを明示する
+- 429 / 5xx / 接続エラーはジッター付き指数バックオフで再試行する（Retry-After を優先）
+- レスポンスヘッダのレート制限情報（x-ratelimit-*）を見て、枯渇時はリセットまで送信を待つ
+
+OPENAI_BASE_URL 環境変数（または base_url 引数）でローカルのモックサーバーに向けて動作確認できる。
+Qt には依存しない。
+"""
+import random
+import re
+import threading
+import time
+
+import httpx
+from openai import OpenAI, APIStatusError, APIConnectionError
+
+from token_accounting import TokenLedger, usage_report
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# タイムアウト（秒）: 接続は短く、応答待ちは呼び出しごとに指定する
+CONNECT_TIMEOUT_S = 5.0
+DEFAULT_READ_TIMEOUT_S = 60.0
+
+# コネクションプール: 同時接続は少数で十分。keep-alive を長めにして接続を温存する
+MAX_CONNECTIONS = 8
+MAX_KEEPALIVE_CONNECTIONS = 4
+KEEPALIVE_EXPIRY_S = 300.0
+
+# 再試行ポリシー
+MAX_RETRIES = 3
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 8.0
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# "1s", "6m0s", "250ms" などのリセット時間表記
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """x-ratelimit-reset-* の値を秒に変換する。解釈できなければ None"""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in parts)
+
+
+def _parse_retry_after(headers) -> float | None:
+    """Retry-After / retry-after-ms ヘッダから待ち時間（秒）を取り出す"""
+    if headers is None:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms is not None:
+            return float(ms) / 1000.0
+        sec = headers.get("retry-after")
+        if sec is not None:
+            return float(sec)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class AIClient:
+    """アプリ全体で 1 つだけ持つ AI クライアント（MainWindow が所有する）"""
+
+    def __init__(self, api_key: str, base_url: str | None = None, max_retries: int = MAX_RETRIES,
+                 transport: httpx.BaseTransport | None = None):
+        """transport: httpx のトランスポート（テストでは httpx.MockTransport で応答を差し替える）"""
+        self.max_retries = max_retries
+        self._http = httpx.Client(
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_S,
+            ),
+            timeout=httpx.Timeout(DEFAULT_READ_TIMEOUT_S, connect=CONNECT_TIMEOUT_S),
+        )
+        # 再試行はこのクラスで制御するため SDK 側の再試行は無効化する
+        self._openai = OpenAI(api_key=api_key, base_url=base_url, http_client=self._http, max_retries=0)
+
+        # レート制限: この時刻（monotonic）までは送信を控える
+        self._rate_lock = threading.Lock()
+        self._not_before = 0.0
+        self.last_rate_limit: dict[str, str] = {}
+        # セッション中の累計トークン数・料金
+        self.usage = TokenLedger()
+
+    @property
+    def base_url(self) -> str:
+        return str(self._openai.base_url)
+
+    def warm_up(self):
+        """バックグラウンドでエンドポイントに接続し、プールに接続を確保しておく"""
+        thread = threading.Thread(target=self._preconnect, name="ai-client-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _preconnect(self):
+        try:
+            # 応答内容は不要。TCP/TLS 接続をプールに残すことが目的
+            self._http.head(self.base_url, timeout=CONNECT_TIMEOUT_S)
+        except httpx.HTTPError:
+            pass
+
+    def chat_completion(self, messages: list[dict], model: str = DEFAULT_MODEL,
+                        timeout: float = DEFAULT_READ_TIMEOUT_S, **kwargs):
+        """Chat Completions API を呼び出し、ChatCompletion オブジェクトを返す"""
+        response = self._call_with_retry(
+            lambda: self._openai.chat.completions.with_raw_response.create(
+                model=model, messages=messages, timeout=timeout, **kwargs
+            )
+        )
+        self.usage.add(usage_report(response, model))
+        return response
+
+    def embeddings(self, inputs: list[str], model: str = DEFAULT_EMBEDDING_MODEL,
+                   timeout: float = DEFAULT_READ_TIMEOUT_S) -> list[list[float]]:
+        """Embeddings API でテキストごとのベクトルを返す（入力と同じ順）"""
+        response = self._call_with_retry(
+            lambda: self._openai.embeddings.with_raw_response.create(model=model, input=inputs, timeout=timeout)
+        )
+        self.usage.add(usage_report(response, model))
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def close(self):
+        self._http.close()
+
+    # ---------- 内部処理 ----------
+    def _call_with_retry(self, request):
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit()
+            try:
+                raw = request()
+                self._update_rate_limit(raw.headers)
+                return raw.parse()
+            except APIStatusError as e:
+                self._update_rate_limit(e.response.headers)
+                if e.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+                retry_after = _parse_retry_after(e.response.headers)
+            except APIConnectionError:
+                # タイムアウト（APITimeoutError）もここに含まれる
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            time.sleep(self._backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def _backoff_delay(self, attempt: int, retry_after: float | None) -> float:
+        """Retry-After があればそれに従い、無ければ full jitter の指数バックオフ"""
+        if retry_after is not None:
+            return min(retry_after, BACKOFF_MAX_S * 4)
+        cap = min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _wait_for_rate_limit(self):
+        with self._rate_lock:
+            wait = self._not_before - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _update_rate_limit(self, headers):
+        if headers is None:
+            return
+        info = {k.lower(): v for k, v in headers.items() if k.lower().startswith("x-ratelimit-")}
+        if not info:
+            return
+        self.last_rate_limit = info
+        # リクエスト数・トークン数のどちらかが枯渇していたらリセットまで待つ
+        delay = 0.0
+        for kind in ("requests", "tokens"):
+            remaining = info.get(f"x-ratelimit-remaining-{kind}")
+            reset = _parse_duration(info.get(f"x-ratelimit-reset-{kind}"))
+            try:
+                if remaining is not None and int(remaining) <= 0 and reset:
+                    delay = max(delay, reset)
+            except ValueError:
+                continue
+        if delay > 0:
+            with self._rate_lock:
+                self._not_before = max(self._not_before, time.monotonic() + delay)
@@ -3,20 +3,30 @@ import os
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel, QFrame
 )
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QFont, QKeySequence, QShortcut
 from PySide6.QtCore import Qt
-from openai import OpenAI
 
 from diary_tab import DiaryTab
 from todo_tab import TodoTab
 from lol_pick_support_tab import LolPickSupportTab
+from debug_panel import TraceDebugPanel
+from ai_client import AIClient
+from tracing import TRACER, TRACE_FILE_ENV, span
+
+# MainWindow の client 省略時: 環境変数から AI クライアントを作る（明示的な None は「AI を使わない」）
+_CREATE_CLIENT = object()
+
 
 class MainWindow(QMainWindow):
     """メインウィンドウ：lol_pick_support_tab のスタイルに合わせて白基調・丸み・上品な UI にする"""
 
-    def __init__(self, client: OpenAI | None = None):
+    def __init__(self, client: AIClient | None = _CREATE_CLIENT):
         super().__init__()
-        self.client = client
+        # AI クライアントはウィンドウが所有し、全タブで共有する
+        self.client = create_openai_client() if client is _CREATE_CLIENT else client
+        if self.client is not None:
+            # 初回リクエストで TLS ハンドシェイクを待たないよう事前接続しておく
+            self.client.warm_up()
         self.setWindowTitle("AI Diary & Todo App")
         self.resize(1000, 680)
 
@@ -49,13 +59,18 @@ class MainWindow(QMainWindow):
         tabs.setDocumentMode(True)
         tabs.setMovable(False)
 
-        diary_tab = DiaryTab(client=self.client)
-        todo_tab = TodoTab()
-        lol_tab = LolPickSupportTab(client=self.client)
+        with span("startup.DiaryTab"):
+            diary_tab = DiaryTab(client=self.client)
+        with span("startup.TodoTab"):
+            todo_tab = TodoTab()
+        with span("startup.LolPickSupportTab"):
+            lol_tab = LolPickSupportTab(client=self.client)
 
         tabs.addTab(diary_tab, "日記")
         tabs.addTab(todo_tab, "Todoリスト")
         tabs.addTab(lol_tab, "LoLピック支援")
+        self.lol_tab = lol_tab
+        self.diary_tab = diary_tab
 
         card_layout.addWidget(tabs)
         card.setLayout(card_layout)
@@ -98,18 +113,43 @@ class MainWindow(QMainWindow):
             }
         """)
 
+        # 隠しデバッグパネル（Ctrl+Shift+D で表示切替）
+        self.debug_panel = TraceDebugPanel(parent=self)
+        self.debug_panel.hide()
+        self._debug_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self._debug_shortcut.activated.connect(self.debug_panel.toggle)
+
+    def closeEvent(self, event):
+        self.lol_tab.shutdown()
+        self.diary_tab.shutdown()
+        if self.client is not None:
+            self.client.close()
+        super().closeEvent(event)
+
 def create_openai_client():
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         return None
+    with span("startup.create_openai_client"):
+        try:
+            return AIClient(api_key=api_key, base_url=os.environ.get("OPENAI_BASE_URL") or None)
+        except Exception:
+            return None
+
+def _export_trace_on_exit():
+    """環境変数 DIARYAPP_TRACE_FILE が指定されていれば終了時にトレースを書き出す"""
+    path = os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return
     try:
-        return OpenAI(api_key=api_key)
+        TRACER.export_chrome_trace(path)
     except Exception:
-        return None
+        pass
 
 if __name__ == "__main__":
-    client = create_openai_client()
     app = QApplication(sys.argv)
-    main_win = MainWindow(client=client)
+    app.aboutToQuit.connect(_export_trace_on_exit)
+    with span("startup.MainWindow"):
+        main_win = MainWindow()
     main_win.show()
     sys.exit(app.exec())
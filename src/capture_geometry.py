@@ -0,0 +1,109 @@
+"""キャプチャ領域の計算を一元化するサービス。
+
+- ゲームウィンドウ（Windows のみ検出）があるスクリーンを対象にし、無ければアプリのウィンドウがあるスクリーン
+- 矩形は論理座標で計算し、devicePixelRatio を考慮して実ピクセルで取得する
+- 取得画像は固定の検出解像度へ縮小し、モニター解像度に関係なく検出コストを一定にする
+
+オーバーレイの枠表示とキャプチャは必ずこのサービスの同じ計算結果を使う。
+"""
+import sys
+
+from PySide6.QtCore import QPoint, QRect, Qt
+from PySide6.QtGui import QGuiApplication, QImage
+
+GAME_WINDOW_TITLE = "League of Legends"
+
+# 検出に使う固定解像度（これより大きい取得画像は縮小する）
+DETECTION_WIDTH = 1280
+DETECTION_HEIGHT = 720
+
+# スクリーン端から確保する余白（論理ピクセル、左右・上下それぞれの合計）
+SCREEN_MARGIN = 40
+
+
+def find_game_window_native_rect() -> QRect | None:
+    """ゲームウィンドウの矩形を実ピクセル座標で返す（Windows 以外・見つからない場合は None）"""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        hwnd = user32.FindWindowW(None, GAME_WINDOW_TITLE)
+        if not hwnd or user32.IsIconic(hwnd):
+            return None
+        rect = wintypes.RECT()
+        if not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        return QRect(rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top)
+    except Exception:
+        return None
+
+
+def _native_to_logical(screen, native: QRect) -> QRect:
+    """実ピクセル座標の矩形を、そのスクリーンの論理座標に変換する（スクリーン原点は共通）"""
+    origin = screen.geometry().topLeft()
+    dpr = screen.devicePixelRatio()
+    return QRect(
+        origin.x() + int((native.x() - origin.x()) / dpr),
+        origin.y() + int((native.y() - origin.y()) / dpr),
+        int(native.width() / dpr),
+        int(native.height() / dpr),
+    )
+
+
+def _screen_for_native_point(point: QPoint):
+    for screen in QGuiApplication.screens():
+        geom = screen.geometry()
+        dpr = screen.devicePixelRatio()
+        native = QRect(geom.x(), geom.y(), int(geom.width() * dpr), int(geom.height() * dpr))
+        if native.contains(point):
+            return screen
+    return None
+
+
+class CaptureGeometry:
+    """キャプチャ対象のスクリーン・矩形・取得処理をまとめて扱う"""
+
+    def __init__(self, rect_width: int = 1280, rect_height: int = 720, anchor_widget=None):
+        self.rect_width = rect_width
+        self.rect_height = rect_height
+        self.anchor_widget = anchor_widget
+
+    def target(self):
+        """(スクリーン, ゲームウィンドウの論理矩形 or None) を返す"""
+        native = find_game_window_native_rect()
+        if native is not None:
+            screen = _screen_for_native_point(native.center())
+            if screen is not None:
+                return screen, _native_to_logical(screen, native)
+        screen = None
+        if self.anchor_widget is not None and self.anchor_widget.window().windowHandle() is not None:
+            screen = self.anchor_widget.window().windowHandle().screen()
+        return screen or QGuiApplication.primaryScreen(), None
+
+    def capture_rect(self, screen=None, game_rect: QRect | None = None) -> QRect:
+        """キャプチャ矩形（グローバル論理座標）。ゲームウィンドウがあればその中央、無ければスクリーン中央"""
+        if screen is None:
+            screen, game_rect = self.target()
+        bounds = game_rect if game_rect is not None else screen.geometry()
+        rw = max(1, min(self.rect_width, bounds.width() - SCREEN_MARGIN))
+        rh = max(1, min(self.rect_height, bounds.height() - SCREEN_MARGIN))
+        return QRect(bounds.x() + (bounds.width() - rw) // 2, bounds.y() + (bounds.height() - rh) // 2, rw, rh)
+
+    def grab(self):
+        """キャプチャ矩形を取得し、検出解像度に揃えた (QImage, 論理矩形) を返す。スクリーンが無ければ None"""
+        screen, game_rect = self.target()
+        if screen is None:
+            return None
+        rect = self.capture_rect(screen, game_rect)
+        origin = screen.geometry().topLeft()
+        # grabWindow(0, ...) の座標はスクリーン原点からの論理座標。結果は実ピクセル（論理 × DPR）になる
+        image = screen.grabWindow(0, rect.x() - origin.x(), rect.y() - origin.y(), rect.width(), rect.height()).toImage()
+        image.setDevicePixelRatio(1.0)
+        if image.width() > DETECTION_WIDTH or image.height() > DETECTION_HEIGHT:
+            image = image.scaled(DETECTION_WIDTH, DETECTION_HEIGHT, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if image.format() != QImage.Format_RGB32:
+            image = image.convertToFormat(QImage.Format_RGB32)
+        return image, rect
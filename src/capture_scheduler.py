@@ -0,0 +1,91 @@
+"""自動取得の適応スケジューラ。
+
+縮小したグレースケール画像の差分（安価）を短い間隔で調べ、領域に変化があったときだけ
+フル検出（OCR）を実行する。変化が無い間は間隔を伸ばし、CPU 使用率の上限も守る。
+"""
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QTimer
+
+# ポーリング間隔（ミリ秒）: 変化直後は最短、無変化が続くと最長まで伸ばす
+MIN_INTERVAL_MS = 250
+MAX_INTERVAL_MS = 3000
+BACKOFF_FACTOR = 1.5
+
+# 変化検出: 画像を GRID×GRID の領域に分け、いずれかの平均差分（0〜255）が閾値を超えたら変化とみなす
+DIFF_GRID = 4
+REGION_DIFF_THRESHOLD = 6.0
+
+# CPU 予算: 処理時間 /（処理時間 + 待ち時間）をこの割合以下に抑える
+CPU_BUDGET = 0.25
+
+
+def frame_changed(prev: np.ndarray | None, frame: np.ndarray | None,
+                  threshold: float = REGION_DIFF_THRESHOLD, grid: int = DIFF_GRID) -> bool:
+    """2 枚の縮小グレースケール画像を領域ごとに比較する"""
+    if prev is None or frame is None or prev.shape != frame.shape:
+        return True
+    diff = np.abs(frame.astype(np.int16) - prev.astype(np.int16))
+    h, w = diff.shape
+    gh, gw = h // grid, w // grid
+    if gh == 0 or gw == 0:
+        return float(diff.mean()) > threshold
+    # (grid, gh, grid, gw) に並べ替えて領域ごとの平均を一括計算する
+    cells = diff[: gh * grid, : gw * grid].reshape(grid, gh, grid, gw).mean(axis=(1, 3))
+    return bool((cells > threshold).any())
+
+
+class AdaptiveCaptureScheduler(QObject):
+    """probe() で縮小画像を取得し、変化があれば detect() を呼ぶ"""
+
+    def __init__(self, probe, detect, parent=None):
+        super().__init__(parent)
+        self._probe = probe
+        self._detect = detect
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+        self._prev = None
+        self._force = True
+        self.interval_ms = MIN_INTERVAL_MS
+        self.detect_count = 0
+        self.probe_count = 0
+        self.probe_failures = 0
+
+    def start(self):
+        self._prev = None
+        self._force = True
+        self.interval_ms = MIN_INTERVAL_MS
+        self._timer.start(0)
+
+    def stop(self):
+        self._timer.stop()
+
+    def isActive(self) -> bool:
+        return self._timer.isActive()
+
+    def _tick(self):
+        t0 = time.perf_counter()
+        frame = self._probe()
+        self.probe_count += 1
+        if frame is None:
+            # 取得できない（ゲーム画面や領域が無い）間は検出せず間隔を伸ばす。
+            # 前の画像は捨てるので、取得できるようになった最初のフレームで検出する
+            changed = False
+            self.probe_failures += 1
+        else:
+            changed = self._force or frame_changed(self._prev, frame)
+        self._prev = frame
+        if changed:
+            self._force = False
+            self._detect()
+            self.detect_count += 1
+            self.interval_ms = MIN_INTERVAL_MS
+        else:
+            self.interval_ms = min(MAX_INTERVAL_MS, int(self.interval_ms * BACKOFF_FACTOR))
+
+        # 今回の処理時間から、CPU 予算を守るのに必要な最短待ち時間を求める
+        busy_ms = (time.perf_counter() - t0) * 1000.0
+        budget_wait_ms = busy_ms * (1.0 - CPU_BUDGET) / CPU_BUDGET
+        self._timer.start(int(max(self.interval_ms, budget_wait_ms)))
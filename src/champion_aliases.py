@@ -0,0 +1,109 @@
+"""チャンピオン名の別名表（日本語名・英語 ID・英語名・ローマ字・通称）。
+
+champion_aliases.json は utils/build_champion_aliases.py がダウンロード済みの champion.json から生成する（README 参照）。
+ファイルが無い場合は日本語名とローマ字読みだけの表で動く（is_fallback が True）。このときは英語名・英語 ID での検索、
+アイコン（icon_id）、対戦履歴の championName の解決ができない。
+
+別名はすべて champion_matcher.to_hiragana で正規化して保持し、
+- 完全一致は dict への 1 回の参照
+- 前方一致はソート済みキーへの bisect 1 回（＋該当範囲の走査）
+で引ける。Qt には依存しない。
+
+champion_aliases.json の形式:
+    {
+      "version": "14.1.1",
+      "champions": [
+        {"ja": "アーリ", "id": "Ahri", "en": "Ahri", "romaji": "ari", "nicknames": []},
+        ...
+      ]
+    }
+"""
+import json
+import os
+from bisect import bisect_left
+
+from champion_matcher import NO_CHAMPION, to_hiragana, to_romaji
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALIASES_JSON = os.path.join(ROOT_DIR, "champion_aliases.json")
+
+# OCR テキストの検索に使う別名の最短長（"tf" や "mf" のような短い通称は雑音に一致しやすい）
+MATCHER_MIN_ALIAS_LENGTH = 4
+
+
+class ChampionAliases:
+    """正規化した別名 → 日本語名の索引"""
+
+    def __init__(self, entries: list[dict], version: str | None = None):
+        self.version = version
+        # champion_aliases.json を読めず、日本語名とローマ字読みだけで作った表か
+        self.is_fallback = False
+        self._exact = {}  # 正規化した別名 → 日本語名
+        self._ids = {}  # 日本語名 → 英語 ID（アイコン等のファイル名）
+        entries = [e for e in entries if e.get("ja") and e["ja"] != NO_CHAMPION]
+        # 日本語名そのものを先に登録し、他のチャンピオンの通称に上書きされないようにする
+        for entry in entries:
+            self._exact.setdefault(to_hiragana(entry["ja"]), entry["ja"])
+            if entry.get("id"):
+                self._ids[entry["ja"]] = entry["id"]
+        ja_keys = {to_hiragana(entry["ja"]): entry["ja"] for entry in entries}
+        for entry in entries:
+            # 他のチャンピオンの日本語名の一部になっている通称（「シン」「リー」など）は別のチャンピオンに当たるので使わない
+            nicknames = [n for n in entry.get("nicknames") or []
+                         if not any(to_hiragana(n) in key and ja != entry["ja"] for key, ja in ja_keys.items())]
+            for alias in [entry.get("id"), entry.get("en"), entry.get("romaji")] + nicknames:
+                key = to_hiragana(alias or "")
+                if key:
+                    # 同じ別名が複数に当たる場合は先に登録した方を優先する
+                    self._exact.setdefault(key, entry["ja"])
+        self._sorted_keys = sorted(self._exact)
+
+    @classmethod
+    def from_names(cls, names: list[str]) -> "ChampionAliases":
+        """別名表が無いときの代替: 日本語名とローマ字読みだけで作る"""
+        aliases = cls([{"ja": name, "romaji": to_romaji(name)} for name in names])
+        aliases.is_fallback = True
+        return aliases
+
+    @classmethod
+    def load(cls, names: list[str], path: str = ALIASES_JSON) -> "ChampionAliases":
+        """別名表を読み込む。無い・壊れている場合は names から代替の表を作る。
+        別名表に載っていない names もローマ字読み付きで補う"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = list(data.get("champions", []))
+            version = data.get("version")
+        except (OSError, ValueError, AttributeError):
+            return cls.from_names(names)
+        known = {entry.get("ja") for entry in entries}
+        entries += [{"ja": name, "romaji": to_romaji(name)} for name in names if name not in known]
+        return cls(entries, version)
+
+    def lookup(self, text: str) -> str | None:
+        """別名（日本語名・英語名・ローマ字・通称のどれでも）から日本語名を返す"""
+        return self._exact.get(to_hiragana(text))
+
+    def prefix_matches(self, text: str, limit: int = 50) -> list[str]:
+        """別名が text で始まる日本語名を、キー順・重複なしで返す"""
+        prefix = to_hiragana(text)
+        if not prefix:
+            return []
+        found = {}
+        i = bisect_left(self._sorted_keys, prefix)
+        while i < len(self._sorted_keys) and len(found) < limit:
+            key = self._sorted_keys[i]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(self._exact[key], None)
+            i += 1
+        return list(found)
+
+    def icon_id(self, name: str) -> str | None:
+        """日本語名から英語 ID（Data Dragon のファイル名）を返す"""
+        return self._ids.get(name)
+
+    def matcher_aliases(self, min_length: int = MATCHER_MIN_ALIAS_LENGTH) -> dict[str, str]:
+        """ChampionMatcher に渡す 別名 → 日本語名（日本語名自身と、誤検出しやすい短い別名は除く）"""
+        return {key: name for key, name in self._exact.items()
+                if len(key) >= min_length and key != to_hiragana(name)}
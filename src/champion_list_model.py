@@ -0,0 +1,41 @@
+"""チャンピオン名一覧のリストモデル（アイコン付き）。
+
+全コンボで 1 つのモデルを共有し、アイコンは DecorationRole を要求されたとき（＝表示される行だけ）
+IconAtlas から取り出す。補完候補用にはコンボごとに別インスタンスを作り、set_names で絞り込み結果に差し替える。
+"""
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# コンボ・補完ポップアップに表示するアイコンの大きさ（論理ピクセル）
+ICON_SIZE = 20
+
+
+class ChampionListModel(QAbstractListModel):
+    def __init__(self, names: list[str], atlas=None, icon_id=None, parent=None):
+        """atlas: IconAtlas（None ならアイコンなし）、icon_id: 表示名 → アトラスの ID を返す関数"""
+        super().__init__(parent)
+        self._names = list(names)
+        self.atlas = atlas
+        self.icon_id = icon_id or (lambda name: name)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._names):
+            return None
+        name = self._names[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return name
+        if role == Qt.DecorationRole and self.atlas is not None:
+            champ_id = self.icon_id(name)
+            return self.atlas.pixmap(champ_id, ICON_SIZE) if champ_id else None
+        return None
+
+    def names(self) -> list[str]:
+        return list(self._names)
+
+    def set_names(self, names: list[str]):
+        """表示する名前を差し替える（補完候補の絞り込み用）"""
+        self.beginResetModel()
+        self._names = list(names)
+        self.endResetModel()
@@ -0,0 +1,205 @@
+"""OCR テキストからチャンピオン名をあいまい検索する。
+
+名前（ひらがな正規化済み）とローマ字読みをバイグラムで索引化し、テキストを 1 回走査して
+候補を絞り込んでから、候補の周辺だけを編集距離（近似部分文字列照合）で検証する。
+OCR の誤認識が 1〜2 文字あっても検出でき、名前数 × テキスト長の総当たりを避けられる。
+Qt には依存しない。
+"""
+import unicodedata
+
+NO_CHAMPION = "指定なし"
+
+# 正規化時に取り除く記号
+_STRIP_CHARS = ["・", " ", "(", ")", "（", "）", "：", ":", "　", "＝", "=", "＆", "&", ".", "'", "’"]
+
+
+def to_hiragana(s: str) -> str:
+    """NFKC 正規化・カタカナ→ひらがな・小文字化し、区切り記号を除く"""
+    if not s:
+        return ""
+    t = unicodedata.normalize("NFKC", s.strip())
+    out_chars = []
+    for ch in t:
+        code = ord(ch)
+        if 0x30A1 <= code <= 0x30F6:
+            out_chars.append(chr(code - 0x60))
+        else:
+            out_chars.append(ch)
+    norm = "".join(out_chars).lower()
+    for ch in _STRIP_CHARS:
+        norm = norm.replace(ch, "")
+    return norm
+
+
+# ---------- ローマ字変換（ひらがな → ヘボン式に近い表記） ----------
+_ROMAJI_DIGRAPHS = {
+    "きゃ": "kya", "きゅ": "kyu", "きょ": "kyo", "しゃ": "sha", "しゅ": "shu", "しょ": "sho",
+    "ちゃ": "cha", "ちゅ": "chu", "ちょ": "cho", "にゃ": "nya", "にゅ": "nyu", "にょ": "nyo",
+    "ひゃ": "hya", "ひゅ": "hyu", "ひょ": "hyo", "みゃ": "mya", "みゅ": "myu", "みょ": "myo",
+    "りゃ": "rya", "りゅ": "ryu", "りょ": "ryo", "ぎゃ": "gya", "ぎゅ": "gyu", "ぎょ": "gyo",
+    "じゃ": "ja", "じゅ": "ju", "じょ": "jo", "びゃ": "bya", "びゅ": "byu", "びょ": "byo",
+    "ぴゃ": "pya", "ぴゅ": "pyu", "ぴょ": "pyo", "しぇ": "she", "じぇ": "je", "ちぇ": "che",
+    "てぃ": "ti", "でぃ": "di", "とぅ": "tu", "どぅ": "du", "ふぁ": "fa", "ふぃ": "fi",
+    "ふぇ": "fe", "ふぉ": "fo", "うぃ": "wi", "うぇ": "we", "うぉ": "wo", "いぇ": "ye",
+    "ゔぁ": "va", "ゔぃ": "vi", "ゔぇ": "ve", "ゔぉ": "vo", "くぁ": "kwa", "ぐぁ": "gwa",
+}
+_ROMAJI_MONO = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "さ": "sa", "し": "shi", "す": "su", "せ": "se", "そ": "so",
+    "た": "ta", "ち": "chi", "つ": "tsu", "て": "te", "と": "to",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "fu", "へ": "he", "ほ": "ho",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "を": "o", "ん": "n",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "ざ": "za", "じ": "ji", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "だ": "da", "ぢ": "ji", "づ": "zu", "で": "de", "ど": "do",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ゔ": "vu", "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o",
+    "ゃ": "ya", "ゅ": "yu", "ょ": "yo",
+}
+
+
+def to_romaji(s: str) -> str:
+    """名前をローマ字（小文字・記号なし）にする。長音「ー」は省略、促音は次の子音を重ねる"""
+    kana = to_hiragana(s)
+    out = []
+    i = 0
+    double_next = False
+    while i < len(kana):
+        pair = kana[i:i + 2]
+        if pair in _ROMAJI_DIGRAPHS:
+            roma = _ROMAJI_DIGRAPHS[pair]
+            i += 2
+        else:
+            ch = kana[i]
+            i += 1
+            if ch == "っ":
+                double_next = True
+                continue
+            if ch == "ー":
+                continue
+            roma = _ROMAJI_MONO.get(ch, ch if ch.isascii() else "")
+        if double_next and roma and roma[0] not in "aiueon":
+            roma = roma[0] + roma
+        double_next = False
+        out.append(roma)
+    return "".join(out)
+
+
+# ---------- 近似一致 ----------
+def max_errors_for(length: int) -> int:
+    """名前の長さに応じた許容誤り数（短い名前は誤検出を避けるため完全一致のみ）"""
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+def approximate_find(pattern: str, text: str, max_errors: int) -> tuple[int, int] | None:
+    """text 内で pattern に最も近い部分文字列を探し、(編集距離, 終了位置) を返す（Sellers のアルゴリズム）。
+    max_errors を超える場合は None"""
+    m = len(pattern)
+    if m == 0:
+        return None
+    prev = list(range(m + 1))
+    best = None
+    for j, tc in enumerate(text, 1):
+        cur = [0] * (m + 1)
+        for i in range(1, m + 1):
+            cost = 0 if pattern[i - 1] == tc else 1
+            cur[i] = min(prev[i - 1] + cost, prev[i] + 1, cur[i - 1] + 1)
+        if cur[m] <= max_errors and (best is None or cur[m] < best[0]):
+            best = (cur[m], j)
+            if cur[m] == 0:
+                break
+        prev = cur
+    return best
+
+
+class ChampionMatcher:
+    """チャンピオン名（＋別名）のバイグラム索引"""
+
+    def __init__(self, names: list[str], aliases: dict[str, str] | None = None):
+        # 索引対象のキー: 正規化した名前・ローマ字読み・別名 → 正式名
+        keys = {}
+        for name in names:
+            if name == NO_CHAMPION:
+                continue
+            keys.setdefault(to_hiragana(name), name)
+            roma = to_romaji(name)
+            if len(roma) >= 4:
+                keys.setdefault(roma, name)
+        for alias, name in (aliases or {}).items():
+            norm = to_hiragana(alias)
+            if norm and name != NO_CHAMPION:
+                keys.setdefault(norm, name)
+
+        self._keys = list(keys.items())
+        # バイグラム → [(キー番号, キー内の位置)]
+        self._index = {}
+        for kid, (key, _name) in enumerate(self._keys):
+            for off in range(len(key) - 1):
+                self._index.setdefault(key[off:off + 2], []).append((kid, off))
+
+    def find_in_text(self, text: str) -> list[tuple[str, float]]:
+        """テキスト中のチャンピオン名を (正式名, 信頼度 0〜1) のリストで返す（出現順・重複なし）"""
+        norm = to_hiragana(text)
+        if not norm:
+            return []
+
+        # 1. テキストを 1 回走査し、一致したバイグラムを (キー, 推定開始位置) ごとに数える
+        #    推定開始位置 = テキスト上の位置 − キー内の位置（本当に出現していれば多数が同じ位置に揃う）
+        diag_hits = {}
+        for p in range(len(norm) - 1):
+            for kid, off in self._index.get(norm[p:p + 2], ()):
+                diag = (kid, p - off)
+                diag_hits[diag] = diag_hits.get(diag, 0) + 1
+
+        # 2. 許容誤り分のずれを含めて十分なバイグラムが揃った位置だけを候補にする
+        candidates = {}
+        for (kid, start), _count in diag_hits.items():
+            key = self._keys[kid][0]
+            k = max_errors_for(len(key))
+            near = sum(diag_hits.get((kid, start + d), 0) for d in range(-k, k + 1))
+            # 誤り 1 文字でバイグラムは最大 2 個失われる
+            if near >= max(1, len(key) - 1 - 2 * k):
+                candidates.setdefault(kid, []).append((near, start))
+
+        # 3. 候補の周辺だけを編集距離で検証する（名前ごとに最初に確定した一致を採用）
+        matches = []  # (開始, 終了, 信頼度, 正式名)
+        for kid, starts in candidates.items():
+            key, name = self._keys[kid]
+            length = len(key)
+            k = max_errors_for(length)
+            for _near, start in sorted(starts, reverse=True):
+                lo = max(0, start - k)
+                hi = min(len(norm), start + length + k)
+                if k == 0:
+                    found = (0, hi) if norm[lo:hi] == key else None
+                else:
+                    found = approximate_find(key, norm[lo:hi], k)
+                    if found is not None:
+                        found = (found[0], found[1] + lo)
+                if found is not None:
+                    dist, end = found
+                    matches.append((max(0, end - length), end, 1.0 - dist / length, name))
+                    break
+
+        # 4. 同じ箇所に重なる一致は、信頼度が高く長いものを優先する
+        matches.sort(key=lambda m: (-m[2], -(m[1] - m[0])))
+        taken = []
+        result = {}
+        for start, end, conf, name in matches:
+            if name in result:
+                continue
+            if any(start < t_end and t_start < end for t_start, t_end in taken):
+                continue
+            taken.append((start, end))
+            result[name] = (start, conf)
+        return [(name, conf) for name, (start, conf) in sorted(result.items(), key=lambda kv: kv[1][0])]
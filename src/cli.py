@@ -0,0 +1,257 @@
+"""コマンドラインから日記・Todo を一括操作する（GUI を起動しない。Qt も読み込まない）。
+
+使い方:
+    python src/cli.py diary list [--since 20250101] [--until 20251231]
+    python src/cli.py diary export 20250101 [-o day.json]
+    python src/cli.py diary import day.json [--date 20250101] [--merge]
+    python src/cli.py diary export-all -f csv -o diary.csv [--since ...] [--until ...] [--query ...]
+    python src/cli.py diary import-ics calendar.ics [--since ...] [--until ...] [--dry-run]
+    python src/cli.py todo list
+    python src/cli.py todo add "買い物" "掃除"         # 引数、または --file で 1 行 1 件
+    python src/cli.py search キーワード [--since ...] [--until ...]
+    python src/cli.py review [--since ...] [--until ...] [-o reviews.jsonl]   # OPENAI_API_KEY が必要
+
+日記・Todo の読み書きは GUI と同じ diary_store / todo_store を使う。
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from diary_store import (
+    DIARIES_DIR, dump_diary, event_matches, format_minutes, list_days, parse_date, parse_diary, read_day, write_day,
+)
+from todo_store import TODO_FILE, read_todos, write_todos
+
+
+def _date_arg(text: str) -> datetime.date:
+    try:
+        return parse_date(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日付は YYYYMMDD または YYYY-MM-DD で指定してください: {text}")
+
+
+def _days(args) -> list[datetime.date]:
+    return list_days(args.diaries_dir, args.since, args.until)
+
+
+# ---------- diary ----------
+def cmd_diary_list(args) -> int:
+    for date in _days(args):
+        try:
+            events = read_day(date, args.diaries_dir) or []
+        except ValueError:
+            print(f"{date:%Y%m%d}\t(JSON 形式ではありません)")
+            continue
+        print(f"{date:%Y%m%d}\t{len(events)} 件")
+    return 0
+
+
+def cmd_diary_export(args) -> int:
+    try:
+        events = read_day(args.date, args.diaries_dir)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if events is None:
+        print(f"日記がありません: {args.date:%Y%m%d}", file=sys.stderr)
+        return 1
+    content = dump_diary(events)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(content)
+    else:
+        print(content)
+    return 0
+
+
+def cmd_diary_export_all(args) -> int:
+    from diary_export import export_diaries, export_to_file
+
+    options = dict(diaries_dir=args.diaries_dir, since=args.since, until=args.until, query=args.query)
+    if args.output:
+        count = export_to_file(args.output, args.format, **options)
+        print(f"{count} 件を書き出しました: {args.output}", file=sys.stderr)
+    else:
+        export_diaries(sys.stdout, args.format or "jsonl", **options)
+    return 0
+
+
+def cmd_diary_import(args) -> int:
+    with open(args.file, "r", encoding="utf-8") as f:
+        events = parse_diary(f.read())
+    if events is None:
+        print(f"JSON 形式の日記ではありません: {args.file}", file=sys.stderr)
+        return 1
+    date = args.date
+    if date is None:
+        # ファイル名が YYYYMMDD.json ならその日付
+        try:
+            date = parse_date(os.path.splitext(os.path.basename(args.file))[0])
+        except ValueError:
+            print("--date で取り込み先の日付を指定してください", file=sys.stderr)
+            return 1
+    if args.merge:
+        existing = read_day(date, args.diaries_dir) or []
+        events = sorted(existing + events, key=lambda e: e["start"])
+    path = write_day(date, events, args.diaries_dir)
+    print(f"{len(events)} 件を書き込みました: {path}")
+    return 0
+
+
+def cmd_diary_import_ics(args) -> int:
+    from ics_import import import_ics
+
+    result = import_ics(args.file, args.diaries_dir, args.since, args.until,
+                        batch_events=args.batch_events, dry_run=args.dry_run)
+    verb = "追加できます" if args.dry_run else "追加しました"
+    print(f"{len(result.days)} 日分に {result.events} 件{verb}（重複 {result.duplicates} 件は除外）")
+    if result.skipped_days:
+        days = ", ".join(d.isoformat() for d in sorted(result.skipped_days))
+        print(f"JSON 形式でない既存の日記があるため {len(result.skipped_days)} 日分（{result.skipped_events} 件）を"
+              f"取り込みませんでした: {days}", file=sys.stderr)
+    return 0
+
+
+# ---------- todo ----------
+def cmd_todo_list(args) -> int:
+    for i, todo in enumerate(read_todos(args.todo_file), 1):
+        print(f"{i}\t{todo}")
+    return 0
+
+
+def cmd_todo_add(args) -> int:
+    new_items = list(args.items)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            new_items += [line.strip() for line in f]
+    new_items = [t for t in new_items if t]
+    if not new_items:
+        print("追加する Todo がありません", file=sys.stderr)
+        return 1
+    todos = read_todos(args.todo_file)
+    write_todos(todos + new_items, args.todo_file)
+    print(f"{len(new_items)} 件追加しました（合計 {len(todos) + len(new_items)} 件）")
+    return 0
+
+
+# ---------- search ----------
+def cmd_search(args) -> int:
+    hits = 0
+    for date in _days(args):
+        try:
+            events = read_day(date, args.diaries_dir) or []
+        except ValueError:
+            continue
+        for ev in sorted(events, key=lambda e: e["start"]):
+            if event_matches(ev, args.query):
+                hits += 1
+                print(f"{date:%Y%m%d} {format_minutes(ev['start'])}-{format_minutes(ev['end'])}\t{ev.get('title', '')}")
+    if hits == 0:
+        print("見つかりませんでした", file=sys.stderr)
+    return 0
+
+
+# ---------- review ----------
+def cmd_review(args) -> int:
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("OPENAI_API_KEY が設定されていません", file=sys.stderr)
+        return 1
+    # AI を使うときだけ読み込む（他のコマンドは openai に依存しない）
+    from ai_client import AIClient
+    from diary_review import generate_review
+
+    client = AIClient(api_key=api_key, base_url=os.environ.get("OPENAI_BASE_URL") or None)
+    out = open(args.output, "a", encoding="utf-8") if args.output else None
+    failures = 0
+    try:
+        for date in _days(args):
+            try:
+                events = read_day(date, args.diaries_dir) or []
+                if not events:
+                    continue
+                review = generate_review(client, events)
+            except Exception as e:
+                failures += 1
+                print(f"{date:%Y%m%d}: 失敗しました: {e}", file=sys.stderr)
+                continue
+            if out is not None:
+                out.write(json.dumps({"date": f"{date:%Y%m%d}", "review": review}, ensure_ascii=False) + "\n")
+                out.flush()
+            else:
+                print(f"## {date:%Y-%m-%d}\n{review}\n")
+    finally:
+        if out is not None:
+            out.close()
+        client.close()
+    usage = client.usage
+    print(f"{usage.requests} 件: 入力 {usage.prompt_tokens}（キャッシュ {usage.cached_tokens}）"
+          f" / 出力 {usage.completion_tokens} トークン　料金: ${usage.cost_usd:.4f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="diaryapp", description="日記・Todo の一括操作")
+    parser.add_argument("--diaries-dir", default=DIARIES_DIR, help="日記の保存先")
+    parser.add_argument("--todo-file", default=TODO_FILE, help="Todo の保存ファイル")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_range(p):
+        p.add_argument("--since", type=_date_arg, help="この日以降（YYYYMMDD）")
+        p.add_argument("--until", type=_date_arg, help="この日まで（YYYYMMDD）")
+
+    diary = sub.add_parser("diary", help="日記の一覧・入出力").add_subparsers(dest="diary_command", required=True)
+    p = diary.add_parser("list", help="保存済みの日付と件数")
+    add_range(p)
+    p.set_defaults(func=cmd_diary_list)
+    p = diary.add_parser("export", help="1 日分を JSON で出力")
+    p.add_argument("date", type=_date_arg)
+    p.add_argument("-o", "--output", help="出力ファイル（省略時は標準出力）")
+    p.set_defaults(func=cmd_diary_export)
+    p = diary.add_parser("export-all", help="期間内の日記を CSV / JSON Lines / Markdown で書き出す")
+    p.add_argument("-f", "--format", choices=["csv", "jsonl", "md"], help="形式（省略時は出力ファイルの拡張子から）")
+    p.add_argument("-o", "--output", help="出力ファイル（省略時は標準出力）")
+    p.add_argument("-q", "--query", help="タイトル・場所・振り返りにこの語を含むイベントだけ")
+    add_range(p)
+    p.set_defaults(func=cmd_diary_export_all)
+    p = diary.add_parser("import", help="JSON ファイルを 1 日分として取り込む")
+    p.add_argument("file")
+    p.add_argument("--date", type=_date_arg, help="取り込み先の日付（省略時はファイル名から）")
+    p.add_argument("--merge", action="store_true", help="既存のイベントに追加する（省略時は置き換え）")
+    p.set_defaults(func=cmd_diary_import)
+    p = diary.add_parser("import-ics", help="カレンダー（.ics）のイベントを日記に取り込む")
+    p.add_argument("file")
+    add_range(p)
+    p.add_argument("--batch-events", type=int, default=20000, help="まとめて書き込むイベント数（メモリ使用量の上限）")
+    p.add_argument("--dry-run", action="store_true", help="書き込まずに件数だけ表示する")
+    p.set_defaults(func=cmd_diary_import_ics)
+
+    todo = sub.add_parser("todo", help="Todo の一覧・一括追加").add_subparsers(dest="todo_command", required=True)
+    p = todo.add_parser("list")
+    p.set_defaults(func=cmd_todo_list)
+    p = todo.add_parser("add")
+    p.add_argument("items", nargs="*", help="追加する Todo")
+    p.add_argument("--file", help="1 行 1 件のテキストファイルから追加")
+    p.set_defaults(func=cmd_todo_add)
+
+    p = sub.add_parser("search", help="日記のタイトル・場所・振り返りを検索")
+    p.add_argument("query")
+    add_range(p)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("review", help="日ごとの AI コメントを一括生成")
+    add_range(p)
+    p.add_argument("-o", "--output", help="JSON Lines で追記するファイル（省略時は標準出力）")
+    p.set_defaults(func=cmd_review)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from PySide6.QtWidgets import (
+    QWidget, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QVBoxLayout,
+    QHeaderView, QFileDialog, QMessageBox, QLabel
+)
+from PySide6.QtCore import Qt, QTimer
+
+from tracing import TRACER
+
+# 統計表示の更新間隔（ミリ秒）
+REFRESH_INTERVAL_MS = 1000
+
+
+class TraceDebugPanel(QWidget):
+    """隠しデバッグパネル：スパンごとの件数と p50/p95/最大レイテンシを表示する"""
+
+    def __init__(self, tracer=TRACER, parent=None):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.setWindowTitle("デバッグ: レイテンシ")
+        self.setWindowFlags(Qt.Tool)
+        self.resize(560, 360)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["スパン", "件数", "p50 (ms)", "p95 (ms)", "最大 (ms)"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        self.clear_button = QPushButton("クリア")
+        self.export_button = QPushButton("Chrome トレース書き出し")
+
+        btn_h = QHBoxLayout()
+        btn_h.addWidget(QLabel("Ctrl+Shift+D で表示切替"))
+        btn_h.addStretch()
+        btn_h.addWidget(self.clear_button)
+        btn_h.addWidget(self.export_button)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.addWidget(self.table)
+        layout.addLayout(btn_h)
+        self.setLayout(layout)
+
+        # 表示中のみ定期更新する（非表示時はコストゼロ）
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+
+        self.clear_button.clicked.connect(self._on_clear)
+        self.export_button.clicked.connect(self._on_export)
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        stats = self.tracer.stats()
+        names = sorted(stats, key=lambda n: stats[n]["p95_ms"], reverse=True)
+        self.table.setRowCount(len(names))
+        for row, name in enumerate(names):
+            st = stats[name]
+            values = [
+                name,
+                str(st["count"]),
+                f"{st['p50_ms']:.1f}",
+                f"{st['p95_ms']:.1f}",
+                f"{st['max_ms']:.1f}",
+            ]
+            for col, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+        else:
+            self.show()
+            self.raise_()
+
+    def _on_clear(self):
+        self.tracer.clear()
+        self.refresh()
+
+    def _on_export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "トレースを書き出し", "diaryapp_trace.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.tracer.export_chrome_trace(path)
+            QMessageBox.information(self, "書き出し完了", f"トレースを書き出しました:\n{path}")
+        except Exception as e:
+            QMessageBox.critical(self, "エラー", f"書き出しに失敗しました:\n{e}")
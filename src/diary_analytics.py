@@ -0,0 +1,240 @@
+"""日記のイベントから時間の使い方を集計する（タイトル・場所・タグごとの時間、日 / 週 / 月の推移、連続日数）。
+
+全イベントを列指向の NumPy 配列で保持する（1 行 = 1 イベント）:
+    day[k]                     日付（1970-01-01 からの日数）
+    minutes[k]                 長さ（分）
+    title[k], location[k]      ラベル番号（labels["title"] / labels["location"] の添字）
+タグ（タイトル・振り返り中の「#語」）は別表 tag_day / tag_id / tag_minutes に 1 タグ 1 行で持つ。
+
+保存のたびに update_day でその日の行だけを差し替え、日記ファイル（サイズ・更新時刻）を記録しておく。
+CLI やカレンダー取り込みなど別経路で変わった日は refresh で該当ファイルだけ読み直す（全ファイルは走査しない）。
+任意期間の集計は配列の絞り込みと bincount で行う。状態は .npz に保存する。Qt には依存しない。
+"""
+import datetime
+import json
+import os
+import re
+
+import numpy as np
+
+from diary_store import DIARIES_DIR, day_path, list_days, read_day
+
+# 日記の保存先（DIARIES_DIR）と同じく、起動時のカレントディレクトリによらず src の隣に置く
+ANALYTICS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diary_analytics.npz")
+
+# 集計の単位
+GROUP_KEYS = ("title", "location", "tag")
+PERIODS = ("day", "week", "month")
+
+TAG_PATTERN = re.compile(r"#([^\s#、。，．,.!！?？]+)")
+
+_EPOCH = datetime.date(1970, 1, 1)
+_EVENT_COLUMNS = ("day", "minutes", "title", "location")
+_TAG_COLUMNS = ("tag_day", "tag_id", "tag_minutes")
+
+
+def _day_number(date: datetime.date) -> int:
+    return (date - _EPOCH).days
+
+
+def _date_of(day_number: int) -> datetime.date:
+    return _EPOCH + datetime.timedelta(days=int(day_number))
+
+
+def extract_tags(ev: dict) -> list[str]:
+    """タイトル・振り返り中の「#語」（重複は除く）"""
+    text = f"{ev.get('title', '')} {ev.get('reflection', '')}"
+    return list(dict.fromkeys(TAG_PATTERN.findall(text)))
+
+
+class DiaryAnalytics:
+    def __init__(self):
+        self.labels = {key: [] for key in GROUP_KEYS}
+        self._label_index = {key: {} for key in GROUP_KEYS}
+        self.columns = {name: np.zeros(0, dtype=np.int32) for name in _EVENT_COLUMNS + _TAG_COLUMNS}
+        self.files = {}  # ファイル名 → [サイズ, 更新時刻]
+
+    # ---------- 保存・読み込み ----------
+    @classmethod
+    def load(cls, path: str = ANALYTICS_FILE) -> "DiaryAnalytics":
+        analytics = cls()
+        if not os.path.exists(path):
+            return analytics
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                columns = {name: data[name].astype(np.int32) for name in _EVENT_COLUMNS + _TAG_COLUMNS}
+        except (OSError, ValueError, KeyError):
+            return analytics
+        analytics.columns = columns
+        analytics.files = meta.get("files", {})
+        for key in GROUP_KEYS:
+            analytics.labels[key] = list(meta.get("labels", {}).get(key, []))
+            analytics._label_index[key] = {label: i for i, label in enumerate(analytics.labels[key])}
+        return analytics
+
+    def save(self, path: str = ANALYTICS_FILE):
+        meta = json.dumps({"files": self.files, "labels": self.labels}, ensure_ascii=False)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, meta=np.array(meta), **self.columns)
+        os.replace(tmp, path)
+
+    # ---------- 更新 ----------
+    def _label_id(self, key: str, label: str) -> int:
+        index = self._label_index[key]
+        i = index.get(label)
+        if i is None:
+            i = index[label] = len(self.labels[key])
+            self.labels[key].append(label)
+        return i
+
+    def update_day(self, date: datetime.date, events: list[dict], diaries_dir: str | None = DIARIES_DIR):
+        """その日の行を events で置き換える。diaries_dir を渡すと日記ファイルを取り込み済みとして記録する"""
+        day = _day_number(date)
+        keep = self.columns["day"] != day
+        keep_tags = self.columns["tag_day"] != day
+
+        rows = {name: [] for name in _EVENT_COLUMNS + _TAG_COLUMNS}
+        for ev in events:
+            minutes = max(0, int(ev["end"]) - int(ev["start"]))
+            rows["day"].append(day)
+            rows["minutes"].append(minutes)
+            rows["title"].append(self._label_id("title", (ev.get("title") or "").strip() or "(無題)"))
+            rows["location"].append(self._label_id("location", (ev.get("location") or "").strip() or "(場所なし)"))
+            for tag in extract_tags(ev):
+                rows["tag_day"].append(day)
+                rows["tag_id"].append(self._label_id("tag", tag))
+                rows["tag_minutes"].append(minutes)
+
+        for name in _EVENT_COLUMNS:
+            self.columns[name] = np.concatenate([self.columns[name][keep], np.array(rows[name], dtype=np.int32)])
+        for name in _TAG_COLUMNS:
+            self.columns[name] = np.concatenate([self.columns[name][keep_tags], np.array(rows[name], dtype=np.int32)])
+
+        if diaries_dir is not None:
+            path = day_path(date, diaries_dir)
+            try:
+                st = os.stat(path)
+                self.files[os.path.basename(path)] = [st.st_size, st.st_mtime]
+            except OSError:
+                self.files.pop(os.path.basename(path), None)
+
+    def pending_days(self, diaries_dir: str = DIARIES_DIR) -> tuple[list[datetime.date], list[datetime.date]]:
+        """(読み直す必要のある日, ファイルが消えた日)"""
+        changed = []
+        present = set()
+        for date in list_days(diaries_dir):
+            name = os.path.basename(day_path(date, diaries_dir))
+            present.add(name)
+            try:
+                st = os.stat(os.path.join(diaries_dir, name))
+            except OSError:
+                continue
+            if self.files.get(name) != [st.st_size, st.st_mtime]:
+                changed.append(date)
+        removed = []
+        for name in self.files:
+            if name not in present:
+                removed.append(datetime.datetime.strptime(name[:8], "%Y%m%d").date())
+        return changed, removed
+
+    def refresh(self, diaries_dir: str = DIARIES_DIR, progress=None) -> int:
+        """変わった日だけ読み直し、読み直した日数を返す。progress(読んだ数, 全体数)"""
+        changed, removed = self.pending_days(diaries_dir)
+        for date in removed:
+            self.update_day(date, [], None)
+            self.files.pop(os.path.basename(day_path(date, diaries_dir)), None)
+        for done, date in enumerate(changed, 1):
+            try:
+                events = read_day(date, diaries_dir) or []
+            except (OSError, ValueError):
+                events = []
+            self.update_day(date, events, diaries_dir)
+            if progress is not None:
+                progress(done, len(changed))
+        return len(changed) + len(removed)
+
+    # ---------- 参照 ----------
+    @property
+    def event_count(self) -> int:
+        return len(self.columns["day"])
+
+    def _columns_for(self, by: str):
+        """(日, 分, ラベル番号) の配列。by="tag" はタグ表"""
+        if by == "tag":
+            return self.columns["tag_day"], self.columns["tag_minutes"], self.columns["tag_id"]
+        return self.columns["day"], self.columns["minutes"], self.columns[by]
+
+    def _select(self, by: str, since, until, label: str | None):
+        days, minutes, ids = self._columns_for(by)
+        mask = np.ones(len(days), dtype=bool)
+        if since is not None:
+            mask &= days >= _day_number(since)
+        if until is not None:
+            mask &= days <= _day_number(until)
+        if label is not None:
+            label_id = self._label_index[by].get(label)
+            if label_id is None:
+                mask[:] = False
+            else:
+                mask &= ids == label_id
+        return days[mask], minutes[mask], ids[mask]
+
+    def totals(self, by: str = "title", since: datetime.date | None = None, until: datetime.date | None = None,
+               limit: int | None = None) -> list[tuple[str, int]]:
+        """ラベルごとの合計時間（分）を多い順に"""
+        _days, minutes, ids = self._select(by, since, until, None)
+        sums = np.bincount(ids, weights=minutes, minlength=len(self.labels[by]))
+        order = np.argsort(-sums, kind="stable")
+        order = order[sums[order] > 0][:limit]
+        return [(self.labels[by][i], int(sums[i])) for i in order]
+
+    def series(self, period: str = "day", by: str = "title", label: str | None = None,
+               since: datetime.date | None = None, until: datetime.date | None = None) -> list[tuple[datetime.date, int]]:
+        """期間（日 / 週（月曜始まり）/ 月）ごとの合計時間。label を指定するとそのラベルだけ"""
+        days, minutes, _ids = self._select(by, since, until, label)
+        if len(days) == 0:
+            return []
+        if period == "week":
+            # 1970-01-01 は木曜なので 3 日ずらして月曜始まりにそろえる
+            keys = days - (days + 3) % 7
+        elif period == "month":
+            keys = days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        else:
+            keys = days
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=minutes)
+        return [(_date_of(k), int(s)) for k, s in zip(unique, sums)]
+
+    def streaks(self, by: str = "title", label: str | None = None,
+                today: datetime.date | None = None) -> tuple[int, int]:
+        """(現在の連続日数, 最長の連続日数)。label が None なら日記をつけた日"""
+        days, _minutes, _ids = self._select(by, None, None, label)
+        days = np.unique(days)
+        if len(days) == 0:
+            return 0, 0
+        # 連続が途切れる位置で区切り、区間の長さを求める
+        breaks = np.flatnonzero(np.diff(days) != 1)
+        starts = np.concatenate([[0], breaks + 1])
+        ends = np.concatenate([breaks + 1, [len(days)]])
+        longest = int((ends - starts).max())
+        today_number = _day_number(today or datetime.date.today())
+        # 今日（まだ書いていなければ昨日）まで続いている区間が現在の連続
+        current = int(ends[-1] - starts[-1]) if days[-1] >= today_number - 1 else 0
+        return current, longest
+
+    def trends(self, by: str = "title", days: int = 7, today: datetime.date | None = None,
+               limit: int = 10) -> list[tuple[str, int, int]]:
+        """直近 days 日と、その前の days 日の合計時間を比べ、増減の大きい順に (ラベル, 直近, 前) を返す"""
+        today = today or datetime.date.today()
+        recent_since = today - datetime.timedelta(days=days - 1)
+        previous_since = recent_since - datetime.timedelta(days=days)
+        n = len(self.labels[by])
+        _d, m, ids = self._select(by, recent_since, today, None)
+        recent = np.bincount(ids, weights=m, minlength=n)
+        _d, m, ids = self._select(by, previous_since, recent_since - datetime.timedelta(days=1), None)
+        previous = np.bincount(ids, weights=m, minlength=n)
+        change = np.abs(recent - previous)
+        order = np.argsort(-change, kind="stable")
+        order = order[change[order] > 0][:limit]
+        return [(self.labels[by][i], int(recent[i]), int(previous[i])) for i in order]
@@ -0,0 +1,118 @@
+"""日記の時間集計ダイアログ（期間・単位を選んで、ラベル別の合計・推移・連続日数・増減を表示）。"""
+import datetime
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QComboBox, QDialog, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QTextEdit, QVBoxLayout,
+)
+
+from diary_analytics import DiaryAnalytics
+
+# 表示名 → 集計単位
+GROUP_CHOICES = (("タイトル", "title"), ("場所", "location"), ("タグ", "tag"))
+# 表示名 → (開始日を決める関数, 推移の単位)
+RANGE_CHOICES = (
+    ("直近 7 日", lambda today: today - datetime.timedelta(days=6), "day"),
+    ("直近 30 日", lambda today: today - datetime.timedelta(days=29), "day"),
+    ("直近 1 年", lambda today: today - datetime.timedelta(days=364), "week"),
+    ("全期間", lambda today: None, "month"),
+)
+# 一覧に表示する最大件数
+LIST_LIMIT = 50
+# 推移の棒の最大の長さ（文字数）
+BAR_WIDTH = 30
+
+
+def format_duration(minutes: int) -> str:
+    return f"{minutes // 60}時間{minutes % 60:02d}分" if minutes >= 60 else f"{minutes}分"
+
+
+class DiaryAnalyticsDialog(QDialog):
+    def __init__(self, analytics: DiaryAnalytics, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("時間の集計")
+        self.resize(760, 540)
+        self.analytics = analytics
+
+        self.range_combo = QComboBox()
+        for label, _since, _period in RANGE_CHOICES:
+            self.range_combo.addItem(label)
+        self.group_combo = QComboBox()
+        for label, key in GROUP_CHOICES:
+            self.group_combo.addItem(label, key)
+        self.range_combo.currentIndexChanged.connect(lambda _i: self.reload())
+        self.group_combo.currentIndexChanged.connect(lambda _i: self.reload())
+
+        self.list_widget = QListWidget()
+        self.list_widget.currentItemChanged.connect(lambda _cur, _prev: self._show_detail())
+        self.detail_box = QTextEdit()
+        self.detail_box.setReadOnly(True)
+        self.summary_label = QLabel("")
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("期間"))
+        controls.addWidget(self.range_combo)
+        controls.addWidget(QLabel("単位"))
+        controls.addWidget(self.group_combo)
+        controls.addStretch()
+
+        body = QHBoxLayout()
+        body.addWidget(self.list_widget, 2)
+        body.addWidget(self.detail_box, 3)
+
+        layout = QVBoxLayout()
+        layout.addLayout(controls)
+        layout.addWidget(self.summary_label)
+        layout.addLayout(body)
+        self.setLayout(layout)
+
+        self.reload()
+
+    def _range(self):
+        _label, since_of, period = RANGE_CHOICES[self.range_combo.currentIndex()]
+        today = datetime.date.today()
+        return since_of(today), today, period
+
+    def reload(self):
+        since, until, _period = self._range()
+        by = self.group_combo.currentData()
+        self.list_widget.clear()
+        totals = self.analytics.totals(by, since, until, limit=LIST_LIMIT)
+        for label, minutes in totals:
+            item = QListWidgetItem(f"{label}　{format_duration(minutes)}")
+            item.setData(Qt.UserRole, label)
+            self.list_widget.addItem(item)
+
+        current, longest = self.analytics.streaks()
+        overall = sum(minutes for _d, minutes in self.analytics.series("day", since=since, until=until))
+        self.summary_label.setText(
+            f"記録 {format_duration(overall)}　連続記録 {current} 日（最長 {longest} 日）"
+        )
+        self._show_detail()
+
+    def _show_detail(self):
+        """選んだラベル（未選択なら全体）の推移と、直近 7 日の増減"""
+        since, until, period = self._range()
+        by = self.group_combo.currentData()
+        item = self.list_widget.currentItem()
+        label = item.data(Qt.UserRole) if item is not None else None
+
+        lines = []
+        if label is not None:
+            current, longest = self.analytics.streaks(by, label)
+            lines.append(f"{label}: 連続 {current} 日（最長 {longest} 日）")
+            lines.append("")
+        series = self.analytics.series(period, by, label, since, until)
+        peak = max((minutes for _d, minutes in series), default=0)
+        fmt = {"day": "%m/%d", "week": "%m/%d〜", "month": "%Y/%m"}[period]
+        for date, minutes in series:
+            bar = "█" * max(1, round(BAR_WIDTH * minutes / peak)) if peak else ""
+            lines.append(f"{date.strftime(fmt):>8} {bar} {format_duration(minutes)}")
+
+        trends = self.analytics.trends(by, days=7)
+        if trends:
+            lines += ["", "直近 7 日の増減（前の 7 日と比べて）:"]
+            for name, recent, previous in trends:
+                sign = "+" if recent >= previous else "-"
+                lines.append(f"  {name}: {format_duration(recent)}（{sign}{format_duration(abs(recent - previous))}）")
+        self.detail_box.setPlainText("\n".join(lines))
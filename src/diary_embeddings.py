@@ -0,0 +1,288 @@
+"""日記の意味検索（振り返りなどの文章を埋め込みベクトルにして、問い合わせに近いイベントを探す）。
+
+イベントごとに「タイトル・場所・振り返り」の文章のハッシュを取り、同じ文章のベクトルは 1 回だけ計算する。
+ベクトルは float32 の行列として 1 ファイル（.f32、行 = ベクトル）に追記していき、検索時は
+メモリマップで読んで全件との内積（事前に正規化しているのでコサイン類似度）から上位 k 件を取る。
+索引（.json）には ハッシュ → 行番号、日付 → その日のイベントの文章のハッシュ、取り込み済みの日記ファイル
+（サイズ・更新時刻）だけを持つ（イベント本体は持たず、検索で当たった日の日記だけを読み直す）。
+sync では変わった日の日記だけを読み、まだベクトルの無い文章だけを埋め込み、最後に索引を 1 回だけ保存する。
+
+埋め込みは AIClient.embeddings（OpenAI）か、API キーが無いときは文字 n-gram を使うローカルの HashingEmbedder。
+埋め込み方ごとに別のファイルに（日記の保存先と同じく src の隣に）保存する。Qt には依存しない。
+"""
+import datetime
+import hashlib
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+from diary_store import DIARIES_DIR, day_path, list_days, read_day
+
+# 日記の保存先（DIARIES_DIR）と同じく、起動時のカレントディレクトリによらず src の隣に置く
+EMBEDDINGS_PREFIX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diary_embeddings")
+
+# 1 回の API 呼び出しで送る文章数
+EMBED_BATCH_SIZE = 128
+# 使われなくなった行がこの割合を超えたら行列を詰め直す
+COMPACT_GARBAGE_RATIO = 0.5
+
+
+def event_text(ev: dict) -> str:
+    return "\n".join(str(ev.get(key) or "").strip() for key in ("title", "location", "reflection")).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class HashingEmbedder:
+    """API を使わないローカルの埋め込み。文字 2-gram・3-gram を次元に振り分けて数える（語の重なりに近い）"""
+
+    name = "local-hashing"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            text = re.sub(r"\s+", " ", text.casefold())
+            for n in (2, 3):
+                for i in range(len(text) - n + 1):
+                    h = zlib.crc32(text[i:i + n].encode("utf-8"))
+                    # 上位ビットで符号を決めて衝突の偏りを打ち消す
+                    out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return out
+
+
+class OpenAIEmbedder:
+    """AIClient.embeddings を EMBED_BATCH_SIZE 件ずつ呼ぶ"""
+
+    def __init__(self, client, model: str | None = None):
+        from ai_client import DEFAULT_EMBEDDING_MODEL
+
+        self.client = client
+        self.model = model or DEFAULT_EMBEDDING_MODEL
+        self.name = self.model
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = []
+        for i in range(0, len(texts), EMBED_BATCH_SIZE):
+            vectors += self.client.embeddings(texts[i:i + EMBED_BATCH_SIZE], model=self.model)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class SearchHit:
+    def __init__(self, score: float, date: datetime.date, event: dict):
+        self.score = score
+        self.date = date
+        self.event = event
+
+    def __repr__(self):
+        return f"SearchHit({self.score:.3f}, {self.date}, {self.event.get('title', '')!r})"
+
+
+class EmbeddingIndex:
+    def __init__(self, embedder, prefix: str | None = None):
+        self.embedder = embedder
+        safe_name = re.sub(r"[^0-9A-Za-z_.-]", "_", embedder.name)
+        prefix = prefix or f"{EMBEDDINGS_PREFIX}_{safe_name}"
+        self.matrix_path = prefix + ".f32"
+        self.index_path = prefix + ".json"
+        self.dim = None
+        self.rows = {}  # 文章のハッシュ → 行番号
+        self.days = {}  # "YYYYMMDD" → [ハッシュ, ...]（その日の文章のあるイベントの順）
+        self.files = {}  # ファイル名 → [サイズ, 更新時刻]
+        self._matrix = None  # np.memmap（読み取り専用）
+        self._row_days = None  # 行番号 → (ハッシュ, [日付キー, ...])（検索用、sync で作り直す）
+        self._load()
+
+    # ---------- 保存・読み込み ----------
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        rows = meta.get("rows", {})
+        dim = meta.get("dim")
+        # 行列ファイルが索引より短い（書き込み途中で終了した）場合は作り直す
+        expected = len(rows) and dim and len(rows) * dim * 4
+        if expected and (not os.path.exists(self.matrix_path) or os.path.getsize(self.matrix_path) < expected):
+            return
+        self.dim = dim
+        self.rows = rows
+        # 以前の形式（[[ハッシュ, イベント], ...]）の索引はハッシュだけにして読む
+        self.days = {key: [h[0] if isinstance(h, list) else h for h in hashes]
+                     for key, hashes in meta.get("days", {}).items()}
+        self.files = meta.get("files", {})
+
+    def _save_index(self):
+        meta = {"embedder": self.embedder.name, "dim": self.dim, "rows": self.rows, "days": self.days, "files": self.files}
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    def _open_matrix(self) -> np.ndarray:
+        if not self.rows:
+            return np.zeros((0, self.dim or 1), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != len(self.rows):
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(len(self.rows), self.dim))
+        return self._matrix
+
+    def _append_vectors(self, hashes: list[str], vectors: np.ndarray):
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        # 検索で開いたメモリマップを先に閉じる（Windows ではマップ中のファイルを切り詰められない）
+        self._matrix = None
+        # 索引に載っていない末尾（前回の中断分）を切り捨ててから追記する
+        mode = "r+b" if os.path.exists(self.matrix_path) else "wb"
+        with open(self.matrix_path, mode) as f:
+            f.seek(len(self.rows) * self.dim * 4)
+            f.truncate()
+            f.write(_normalize(vectors).tobytes())
+        for h in hashes:
+            self.rows[h] = len(self.rows)
+
+    # ---------- 更新 ----------
+    def pending_days(self, diaries_dir: str = DIARIES_DIR) -> tuple[list[datetime.date], list[str]]:
+        """(読み直す必要のある日, ファイルが消えた日のキー)"""
+        changed = []
+        present = set()
+        for date in list_days(diaries_dir):
+            name = os.path.basename(day_path(date, diaries_dir))
+            present.add(name)
+            try:
+                st = os.stat(os.path.join(diaries_dir, name))
+            except OSError:
+                continue
+            if self.files.get(name) != [st.st_size, st.st_mtime]:
+                changed.append(date)
+        removed = [name for name in self.files if name not in present]
+        return changed, removed
+
+    def sync(self, diaries_dir: str = DIARIES_DIR, progress=None) -> int:
+        """変わった日を読み直し、まだベクトルの無い文章だけを埋め込む。埋め込んだ文章数を返す。
+        progress(埋め込んだ数, 埋め込む総数)"""
+        changed, removed = self.pending_days(diaries_dir)
+        for name in removed:
+            self.files.pop(name, None)
+            self.days.pop(name[:8], None)
+
+        new_texts = {}  # ハッシュ → 文章
+        for date in changed:
+            try:
+                events = read_day(date, diaries_dir) or []
+            except (OSError, ValueError):
+                events = []
+            hashes = []
+            for ev in events:
+                text = event_text(ev)
+                if not text:
+                    continue
+                h = text_hash(text)
+                hashes.append(h)
+                if h not in self.rows:
+                    new_texts[h] = text
+            key = date.strftime("%Y%m%d")
+            if hashes:
+                self.days[key] = hashes
+            else:
+                self.days.pop(key, None)
+
+        hashes = list(new_texts)
+        for i in range(0, len(hashes), EMBED_BATCH_SIZE):
+            chunk = hashes[i:i + EMBED_BATCH_SIZE]
+            self._append_vectors(chunk, self.embedder.embed([new_texts[h] for h in chunk]))
+            if progress is not None:
+                progress(min(i + EMBED_BATCH_SIZE, len(hashes)), len(hashes))
+
+        # 日記ファイルの記録と索引は埋め込みが全部終わってから保存する（途中で失敗したら次回やり直す。
+        # 索引に載らなかった行列の末尾は次回の _append_vectors が切り捨てる）
+        for date in changed:
+            name = os.path.basename(day_path(date, diaries_dir))
+            try:
+                st = os.stat(os.path.join(diaries_dir, name))
+                self.files[name] = [st.st_size, st.st_mtime]
+            except OSError:
+                pass
+        self._compact_if_needed()
+        self._save_index()
+        self._row_days = None
+        return len(hashes)
+
+    def _compact_if_needed(self):
+        """どのイベントからも参照されない行が多くなったら、使われている行だけの行列に書き直す"""
+        used = {h for hashes in self.days.values() for h in hashes}
+        if not self.rows or len(used) >= len(self.rows) * (1 - COMPACT_GARBAGE_RATIO):
+            return
+        matrix = self._open_matrix()
+        keep = [h for h in self.rows if h in used]
+        kept = np.array(matrix[[self.rows[h] for h in keep]]) if keep else np.zeros((0, self.dim), dtype=np.float32)
+        self._matrix = None
+        del matrix
+        tmp = self.matrix_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(kept.astype(np.float32).tobytes())
+        os.replace(tmp, self.matrix_path)
+        self.rows = {h: i for i, h in enumerate(keep)}
+
+    # ---------- 検索 ----------
+    def _days_by_row(self) -> dict:
+        # 同じ文章のイベントが複数の日にあれば全部返すため、行ごとの日付の一覧を持つ
+        if self._row_days is None:
+            days_by_row = {}
+            for key, hashes in self.days.items():
+                for h in dict.fromkeys(hashes):
+                    row = self.rows.get(h)
+                    if row is not None:
+                        days_by_row.setdefault(row, (h, []))[1].append(key)
+            self._row_days = days_by_row
+        return self._row_days
+
+    def search(self, query: str, k: int = 20, diaries_dir: str = DIARIES_DIR) -> list[SearchHit]:
+        """問い合わせに近いイベントを類似度の高い順に最大 k 件。イベントは当たった日の日記ファイルから読む
+        （sync の後で変わった・消えたイベントは結果に含めない）"""
+        if not query.strip() or not self.rows:
+            return []
+        q = _normalize(self.embedder.embed([query]))[0]
+        scores = self._open_matrix() @ q
+        days_by_row = self._days_by_row()
+        rows = np.fromiter(days_by_row, dtype=np.intp, count=len(days_by_row))
+        if len(rows) == 0:
+            return []
+        candidate_scores = scores[rows]
+        top = min(k, len(rows))
+        best = np.argpartition(-candidate_scores, top - 1)[:top]
+        best = best[np.argsort(-candidate_scores[best], kind="stable")]
+        day_events = {}  # 日付キー → [(ハッシュ, イベント), ...]（この検索の間だけ持つ）
+        hits = []
+        for i in best:
+            h, keys = days_by_row[int(rows[i])]
+            for key in keys:
+                if key not in day_events:
+                    day_events[key] = self._read_day_events(key, diaries_dir)
+                date = datetime.datetime.strptime(key, "%Y%m%d").date()
+                hits += [SearchHit(float(candidate_scores[i]), date, ev)
+                         for ev_hash, ev in day_events[key] if ev_hash == h]
+                if len(hits) >= k:
+                    return hits[:k]
+        return hits
+
+    @staticmethod
+    def _read_day_events(key: str, diaries_dir: str) -> list[tuple[str, dict]]:
+        try:
+            events = read_day(datetime.datetime.strptime(key, "%Y%m%d").date(), diaries_dir) or []
+        except (OSError, ValueError):
+            return []
+        return [(text_hash(event_text(ev)), ev) for ev in events if event_text(ev)]
@@ -0,0 +1,103 @@
+"""日記の履歴を CSV / JSON Lines / Markdown に書き出す。
+
+日付の一覧だけを先に取り、1 日ずつ読んでは書き出すので、何年分でも使用メモリは 1 日分で済む。
+期間と検索語で絞り込める。CLI と日記タブ（バックグラウンドスレッド）の両方から使う。Qt には依存しない。
+"""
+import csv
+import datetime
+import json
+
+from diary_store import DIARIES_DIR, event_matches, format_minutes, list_days, read_day
+
+# 形式名 → 拡張子
+EXPORT_FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "md": ".md"}
+
+CSV_COLUMNS = ["date", "start", "end", "title", "location", "reflection"]
+
+
+def iter_events(diaries_dir: str = DIARIES_DIR, since: datetime.date | None = None,
+                until: datetime.date | None = None, query: str | None = None, progress=None):
+    """(日付, イベント) を日付・開始時刻順に返す。progress(読んだ日数, 全日数) を 1 日ごとに呼ぶ"""
+    days = list_days(diaries_dir, since, until)
+    for done, date in enumerate(days, 1):
+        try:
+            events = read_day(date, diaries_dir) or []
+        except ValueError:
+            events = []
+        for ev in sorted(events, key=lambda e: e["start"]):
+            if query and not event_matches(ev, query):
+                continue
+            yield date, ev
+        if progress is not None:
+            progress(done, len(days))
+
+
+class _CsvWriter:
+    def __init__(self, out):
+        self._writer = csv.writer(out)
+        self._writer.writerow(CSV_COLUMNS)
+
+    def write(self, date, ev):
+        self._writer.writerow([
+            date.isoformat(), format_minutes(ev["start"]), format_minutes(ev["end"]),
+            ev.get("title", ""), ev.get("location", ""), ev.get("reflection", ""),
+        ])
+
+
+class _JsonlWriter:
+    def __init__(self, out):
+        self._out = out
+
+    def write(self, date, ev):
+        self._out.write(json.dumps({"date": date.isoformat(), **ev}, ensure_ascii=False) + "\n")
+
+
+class _MarkdownWriter:
+    """日付ごとの見出しの下に「- HH:MM–HH:MM タイトル（場所）」と振り返りを並べる"""
+
+    def __init__(self, out):
+        self._out = out
+        self._current = None
+
+    def write(self, date, ev):
+        if date != self._current:
+            if self._current is not None:
+                self._out.write("\n")
+            self._out.write(f"## {date.isoformat()}\n\n")
+            self._current = date
+        line = f"- {format_minutes(ev['start'])}–{format_minutes(ev['end'])} {ev.get('title') or '(無題)'}"
+        if ev.get("location"):
+            line += f"（{ev['location']}）"
+        self._out.write(line + "\n")
+        for reflection_line in (ev.get("reflection") or "").splitlines():
+            self._out.write(f"    {reflection_line}\n")
+
+
+_WRITERS = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "md": _MarkdownWriter}
+
+
+def export_diaries(out, fmt: str, diaries_dir: str = DIARIES_DIR, since: datetime.date | None = None,
+                   until: datetime.date | None = None, query: str | None = None,
+                   progress=None, cancelled=None) -> int:
+    """out（テキストストリーム）に書き出し、書き出したイベント数を返す。
+    cancelled() が True を返したら途中で止める"""
+    if fmt not in _WRITERS:
+        raise ValueError(f"未対応の形式です: {fmt}（{', '.join(EXPORT_FORMATS)}）")
+    writer = _WRITERS[fmt](out)
+    count = 0
+    for date, ev in iter_events(diaries_dir, since, until, query, progress):
+        if cancelled is not None and cancelled():
+            break
+        writer.write(date, ev)
+        count += 1
+    return count
+
+
+def export_to_file(path: str, fmt: str | None = None, **kwargs) -> int:
+    """ファイルに書き出す。fmt を省略すると拡張子から決める"""
+    if fmt is None:
+        fmt = next((name for name, ext in EXPORT_FORMATS.items() if path.lower().endswith(ext)), "jsonl")
+    # CSV は Excel で開けるよう BOM 付き
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+    with open(path, "w", encoding=encoding, newline="") as f:
+        return export_diaries(f, fmt, **kwargs)
@@ -0,0 +1,183 @@
+"""日記の編集ジャーナル（先行書き込みログ）。
+
+詳細パネルやタイムラインでの編集を 1 操作 1 行の JSON として Diaries/YYYYMMDD.journal.jsonl に追記する。
+日記ファイル（YYYYMMDD.json）全体を書き直さずに済み、fsync は FSYNC_INTERVAL_S ごとにまとめて行う。
+起動時（読み込み時）はジャーナルを日記ファイルの内容に再生して、保存前に終了した編集を復元する。
+定期的に（または保存時に）日記ファイルへ書き込んでジャーナルを消す（チェックポイント）。
+
+1 行目は基準にした日記ファイルのハッシュと、そのファイルの各イベントの ID（EventStore の ID、ファイルの並び順）。
+チェックポイントで日記ファイルを書いた直後に異常終了してジャーナルが残っても、ハッシュが合わないので二重に再生しない。
+
+操作（id は EventStore の ID。削除や並べ替えがあっても変わらない）:
+    {"op": "add", "id": 7, "event": {...}}
+    {"op": "set", "id": 3, "fields": {"title": "..."}}
+    {"op": "remove", "id": 3}
+Qt には依存しない。
+"""
+import datetime
+import hashlib
+import json
+import os
+import time
+
+from diary_store import DIARIES_DIR, day_path, parse_diary, write_day
+from event_store import ChangeSet, EventStore
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+# fsync の間隔（秒）。この間に異常終了すると直近の編集だけ失われうる
+FSYNC_INTERVAL_S = 1.0
+
+
+def journal_path(date: datetime.date, diaries_dir: str = DIARIES_DIR) -> str:
+    return os.path.join(diaries_dir, date.strftime("%Y%m%d") + JOURNAL_SUFFIX)
+
+
+def _content_hash(content: str | None) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest() if content is not None else ""
+
+
+def _read_text(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_journal(path: str) -> tuple[dict | None, list[dict]]:
+    """(基準の行, 操作一覧)。書きかけの最終行など読めない行があればそこで打ち切る"""
+    base = None
+    ops = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                if not isinstance(op, dict):
+                    break
+                if op.get("op") == "base":
+                    base = op
+                else:
+                    ops.append(op)
+    except FileNotFoundError:
+        pass
+    return base, ops
+
+
+def apply_op(store: EventStore, op: dict):
+    """操作を 1 つ store に適用する（存在しない ID への操作は無視）"""
+    kind = op.get("op")
+    event_id = op.get("id")
+    if not isinstance(event_id, int):
+        return
+    if kind == "add" and isinstance(op.get("event"), dict):
+        store.insert(op["event"], event_id)
+    elif kind == "set":
+        store.update(event_id, **(op.get("fields") or {}))
+    elif kind == "remove":
+        store.remove(event_id)
+
+
+def ops_for_changes(changes: ChangeSet, store: EventStore) -> list[dict]:
+    """EventStore の変更通知をジャーナルの操作に変換する（全体の入れ替えは記録しない）"""
+    if changes.reset:
+        return []
+    ops = [{"op": "remove", "id": event_id} for event_id in changes.removed]
+    for event_id, fields in changes.updated.items():
+        ev = store.get(event_id)
+        if ev is not None:
+            ops.append({"op": "set", "id": event_id, "fields": {k: ev[k] for k in sorted(fields)}})
+    for event_id in changes.inserted:
+        ev = store.get(event_id)
+        if ev is not None:
+            ops.append({"op": "add", "id": event_id, "event": dict(ev)})
+    return ops
+
+
+def recover_day(date: datetime.date, diaries_dir: str = DIARIES_DIR) -> tuple[list[dict] | None, list[int], int]:
+    """日記ファイルにジャーナルを再生した (イベント一覧, 各イベントの ID, 再生した操作数) を返す。
+    どちらも無ければ (None, [], 0)。日記ファイルが JSON でなければ ValueError。
+    基準が合わない（チェックポイント済みの）ジャーナルは消す"""
+    content = _read_text(day_path(date, diaries_dir))
+    events = None
+    if content is not None:
+        events = parse_diary(content)
+        if events is None:
+            raise ValueError(f"JSON 形式の日記ではありません: {day_path(date, diaries_dir)}")
+    path = journal_path(date, diaries_dir)
+    base, ops = read_journal(path)
+    base_ids = base.get("ids") if base is not None else None
+    if base is None or base.get("sha1") != _content_hash(content) or (
+            base_ids is not None and len(base_ids) != len(events or [])):
+        if os.path.exists(path):
+            os.remove(path)
+        return events, list(range(len(events or []))), 0
+    store = EventStore()
+    store.reset(events or [], base_ids)
+    for op in ops:
+        apply_op(store, op)
+    return store.events(), store.ids(), len(ops)
+
+
+class EditJournal:
+    """1 日分の編集ジャーナル。record で追記し、sync で fsync、checkpoint で日記ファイルに反映する"""
+
+    def __init__(self, date: datetime.date, diaries_dir: str = DIARIES_DIR):
+        self.date = date
+        self.diaries_dir = diaries_dir
+        self.path = journal_path(date, diaries_dir)
+        # 日記ファイルの各イベントの ID（ファイルの並び順）。ジャーナルの 1 行目に書く
+        self.base_ids = []
+        self.pending = 0  # 日記ファイルに反映していない操作数
+        self._file = None
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def record(self, op: dict):
+        if self._file is None:
+            os.makedirs(self.diaries_dir, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() == 0:
+                base = _content_hash(_read_text(day_path(self.date, self.diaries_dir)))
+                self._file.write(json.dumps({"op": "base", "sha1": base, "ids": self.base_ids}) + "\n")
+        self._file.write(json.dumps(op, ensure_ascii=False) + "\n")
+        self.pending += 1
+        self._dirty = True
+        if time.monotonic() - self._last_sync >= FSYNC_INTERVAL_S:
+            self.sync()
+
+    def sync(self):
+        """書いた操作をディスクに確定させる（前回から追記が無ければ何もしない）"""
+        if self._file is None or not self._dirty:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def checkpoint(self, events: list[dict], ids: list[int]) -> str:
+        """日記ファイルに書き込んでジャーナルを消し、日記ファイルのパスを返す。ids は events の各 ID"""
+        path = write_day(self.date, events, self.diaries_dir)
+        self.discard()
+        self.base_ids = list(ids)
+        return path
+
+    def discard(self):
+        self._close_file()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.pending = 0
+
+    def close(self):
+        """終了時に呼ぶ。ジャーナルは残し、次回の読み込みで再生する"""
+        self.sync()
+        self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._dirty = False
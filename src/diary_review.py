@@ -0,0 +1,25 @@
+"""日記への AI コメント（振り返り）の生成。日記タブと CLI の両方から使う。Qt には依存しない。"""
+from diary_store import text_summary
+from tracing import span
+
+# AI コメント生成の応答待ちタイムアウト（秒）
+AI_COMMENT_TIMEOUT_S = 30.0
+
+REVIEW_SYSTEM_PROMPT = "あなたは優しい日記コーチとして、日本語で短くコメントを返してください。"
+
+
+def build_review_messages(summary: str) -> list[dict]:
+    return [
+        {"role": "system", "content": REVIEW_SYSTEM_PROMPT},
+        {"role": "user", "content": f"今日の出来事タイムラインです:\n{summary}\nこの内容にコメントしてください。"},
+    ]
+
+
+def generate_review(client, events: list[dict], timeout: float = AI_COMMENT_TIMEOUT_S) -> str:
+    """イベント一覧から AI コメントを生成する。イベントが無ければ ValueError"""
+    summary = text_summary(events)
+    if not summary.strip():
+        raise ValueError("イベントがありません。")
+    with span("api.diary_comment"):
+        response = client.chat_completion(timeout=timeout, messages=build_review_messages(summary))
+    return response.choices[0].message.content or ""
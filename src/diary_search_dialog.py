@@ -0,0 +1,123 @@
+"""日記の意味検索ダイアログ。検索の前に、変わった日記だけ埋め込みを更新する（バックグラウンドスレッド）。"""
+import threading
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem, QPushButton, QTextEdit, QVBoxLayout,
+)
+
+from diary_embeddings import EmbeddingIndex
+from diary_store import format_minutes
+
+# 表示する件数
+RESULT_LIMIT = 30
+
+
+class DiarySearchDialog(QDialog):
+    # 検索結果（ワーカースレッド → GUI スレッド）: list[SearchHit] または Exception
+    search_finished = Signal(object)
+    # 埋め込みの更新の途中経過: (埋め込んだ数, 総数)
+    sync_progress = Signal(int, int)
+
+    def __init__(self, index: EmbeddingIndex, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("日記の意味検索")
+        self.resize(760, 520)
+        self.index = index
+        # 結果をダブルクリックすると呼ばれる: open_day_callback(date)
+        self.open_day_callback = None
+        # 検索の前に（GUI スレッドで）呼ばれる: 開いている日の編集を日記ファイルへ反映するため
+        self.before_search_callback = None
+        self._thread = None
+        # sync と search は同じ索引を触るので 1 つずつ実行する
+        self._lock = threading.Lock()
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("例: 友達と出かけて楽しかった日")
+        self.query_edit.returnPressed.connect(self.start_search)
+        self.search_button = QPushButton("検索")
+        self.search_button.clicked.connect(self.start_search)
+        self.status_label = QLabel(f"埋め込み: {index.embedder.name}")
+        self.list_widget = QListWidget()
+        self.list_widget.currentItemChanged.connect(self._on_current_changed)
+        self.list_widget.itemDoubleClicked.connect(self._on_open)
+        self.detail_box = QTextEdit()
+        self.detail_box.setReadOnly(True)
+
+        query_row = QHBoxLayout()
+        query_row.addWidget(self.query_edit)
+        query_row.addWidget(self.search_button)
+
+        body = QHBoxLayout()
+        body.addWidget(self.list_widget, 3)
+        body.addWidget(self.detail_box, 2)
+
+        layout = QVBoxLayout()
+        layout.addLayout(query_row)
+        layout.addWidget(self.status_label)
+        layout.addLayout(body)
+        self.setLayout(layout)
+
+        self.search_finished.connect(self._on_search_finished)
+        self.sync_progress.connect(self._on_sync_progress)
+
+    def start_search(self):
+        query = self.query_edit.text().strip()
+        if not query or self._thread is not None:
+            return
+        if self.before_search_callback is not None:
+            self.before_search_callback()
+        self.search_button.setEnabled(False)
+        self.status_label.setText("検索しています...")
+
+        def work():
+            try:
+                with self._lock:
+                    # 前回から変わった日記の文章だけを埋め込む
+                    self.index.sync(progress=self.sync_progress.emit)
+                    result = self.index.search(query, RESULT_LIMIT)
+            except Exception as e:
+                result = e
+            self.search_finished.emit(result)
+
+        self._thread = threading.Thread(target=work, name="diary-search", daemon=True)
+        self._thread.start()
+
+    def _on_sync_progress(self, done: int, total: int):
+        self.status_label.setText(f"新しい日記を埋め込んでいます... {done} / {total}")
+
+    def _on_search_finished(self, result):
+        self._thread = None
+        self.search_button.setEnabled(True)
+        self.list_widget.clear()
+        self.detail_box.clear()
+        if isinstance(result, Exception):
+            self.status_label.setText(f"検索に失敗しました: {result}")
+            return
+        self.status_label.setText(f"{len(result)} 件（埋め込み: {self.index.embedder.name}）")
+        for hit in result:
+            ev = hit.event
+            text = (f"{hit.date:%Y/%m/%d} {format_minutes(ev['start'])}-{format_minutes(ev['end'])}"
+                    f" {ev.get('title') or '(無題)'}　{hit.score:.2f}")
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, hit)
+            self.list_widget.addItem(item)
+
+    def _on_current_changed(self, current, _previous):
+        hit = current.data(Qt.UserRole) if current is not None else None
+        if hit is None:
+            self.detail_box.clear()
+            return
+        ev = hit.event
+        lines = [f"{hit.date:%Y/%m/%d} {format_minutes(ev['start'])}-{format_minutes(ev['end'])}",
+                 f"タイトル: {ev.get('title') or '(無題)'}"]
+        if ev.get("location"):
+            lines.append(f"場所: {ev['location']}")
+        if ev.get("reflection"):
+            lines += ["", ev["reflection"]]
+        self.detail_box.setPlainText("\n".join(lines))
+
+    def _on_open(self, item):
+        hit = item.data(Qt.UserRole)
+        if hit is not None and self.open_day_callback is not None:
+            self.open_day_callback(hit.date)
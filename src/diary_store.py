@@ -0,0 +1,171 @@
+"""日記（1 日分のタイムライン）の保存形式の読み書き。Qt に依存しないため CLI などからも利用できる。
+
+1 日分は Diaries/YYYYMMDD.json に {"events": [...]} として保存する。イベントは
+{"start": 分, "end": 分, "title": str, "location": str, "reflection": str} で、
+分は 0:00 からの経過分（06:00 始まりの 24 時間なので 360〜1800）。
+"""
+import datetime
+import json
+import os
+
+DIARIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Diaries")
+
+# タイムラインの範囲: 06:00 〜 翌日 06:00、15 分単位
+DAY_START_MIN = 6 * 60
+DAY_TOTAL_MINUTES = 24 * 60
+SLOT_MINUTES = 15
+
+EVENT_TEXT_FIELDS = ("title", "location", "reflection")
+
+
+def _to_minutes(value, default: int) -> int:
+    try:
+        return int(value)
+    except Exception:
+        try:
+            return int(float(value))
+        except Exception:
+            return default
+
+
+def normalize_events(raw_events, start_min: int = DAY_START_MIN, total_minutes: int = DAY_TOTAL_MINUTES,
+                     slot_minutes: int = SLOT_MINUTES) -> list[dict]:
+    """イベントの一覧を検証・補正する（範囲外は切り詰め、完全に範囲外のものは捨てる）"""
+    cleaned = []
+    min_t = start_min
+    max_t = start_min + total_minutes
+    for item in raw_events:
+        if not isinstance(item, dict):
+            continue
+        start = _to_minutes(item.get("start", start_min), start_min)
+        end = _to_minutes(item.get("end", start + slot_minutes), start + slot_minutes)
+        if end <= start:
+            end = start + slot_minutes
+        if start < min_t:
+            start = min_t
+        if end > max_t:
+            end = max_t
+        if start >= max_t:
+            # skip events completely outside range
+            continue
+        ev = {"start": start, "end": end}
+        for key in EVENT_TEXT_FIELDS:
+            ev[key] = item.get(key, "") or ""
+        cleaned.append(ev)
+    return cleaned
+
+
+def parse_diary(content: str, **range_kwargs) -> list[dict] | None:
+    """JSON 文字列（{"events": [...]} またはイベントの配列）を読み、補正したイベント一覧を返す。
+    形式が違う場合は None"""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and isinstance(data.get("events"), list):
+        raw_events = data["events"]
+    elif isinstance(data, list):
+        raw_events = data
+    else:
+        return None
+    return normalize_events(raw_events, **range_kwargs)
+
+
+def dump_diary(events: list[dict]) -> str:
+    return json.dumps({"events": events}, ensure_ascii=False, indent=2)
+
+
+def day_path(date: datetime.date, diaries_dir: str = DIARIES_DIR) -> str:
+    return os.path.join(diaries_dir, date.strftime("%Y%m%d") + ".json")
+
+
+def read_day(date: datetime.date, diaries_dir: str = DIARIES_DIR) -> list[dict] | None:
+    """その日の日記を読む。ファイルが無ければ None。JSON 形式でなければ ValueError"""
+    path = day_path(date, diaries_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        events = parse_diary(f.read())
+    if events is None:
+        raise ValueError(f"JSON 形式の日記ではありません: {path}")
+    return events
+
+
+def write_day(date: datetime.date, events: list[dict], diaries_dir: str = DIARIES_DIR) -> str:
+    """その日の日記を書き込み、パスを返す（一時ファイルに書いてから置き換える）"""
+    os.makedirs(diaries_dir, exist_ok=True)
+    path = day_path(date, diaries_dir)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(dump_diary(events))
+    os.replace(tmp, path)
+    return path
+
+
+def write_days(days: dict[datetime.date, list[dict]], diaries_dir: str = DIARIES_DIR) -> list[str]:
+    """複数日をまとめて書き込む。全日分の一時ファイルを書き終えてから置き換えるので、
+    途中で失敗しても既存の日記は書きかけにならない"""
+    os.makedirs(diaries_dir, exist_ok=True)
+    staged = []
+    try:
+        for date, events in days.items():
+            path = day_path(date, diaries_dir)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(dump_diary(events))
+            staged.append(path)
+    except Exception:
+        for path in staged:
+            try:
+                os.remove(path + ".tmp")
+            except OSError:
+                pass
+        raise
+    for path in staged:
+        os.replace(path + ".tmp", path)
+    return staged
+
+
+def parse_date(text: str) -> datetime.date:
+    """YYYYMMDD または YYYY-MM-DD"""
+    text = text.strip()
+    fmt = "%Y-%m-%d" if "-" in text else "%Y%m%d"
+    return datetime.datetime.strptime(text, fmt).date()
+
+
+def list_days(diaries_dir: str = DIARIES_DIR, since: datetime.date | None = None,
+              until: datetime.date | None = None) -> list[datetime.date]:
+    """保存済みの日付を昇順で返す（since 以上 until 以下）"""
+    if not os.path.isdir(diaries_dir):
+        return []
+    days = []
+    for name in os.listdir(diaries_dir):
+        stem, ext = os.path.splitext(name)
+        if ext != ".json" or len(stem) != 8 or not stem.isdigit():
+            continue
+        try:
+            date = datetime.datetime.strptime(stem, "%Y%m%d").date()
+        except ValueError:
+            continue
+        if (since is None or date >= since) and (until is None or date <= until):
+            days.append(date)
+    return sorted(days)
+
+
+def event_matches(ev: dict, query: str) -> bool:
+    """タイトル・場所・振り返りのどれかに query が含まれるか（大文字小文字を区別しない）"""
+    q = query.casefold()
+    return any(q in str(ev.get(key, "")).casefold() for key in EVENT_TEXT_FIELDS)
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{(minutes // 60) % 24:02d}:{minutes % 60:02d}"
+
+
+def text_summary(events: list[dict]) -> str:
+    """AI に渡す「HH:MM-HH:MM タイトル」形式の要約"""
+    if not events:
+        return ""
+    parts = []
+    for ev in sorted(events, key=lambda e: e["start"]):
+        parts.append(f"{format_minutes(ev['start'])}-{format_minutes(ev['end'])} {ev.get('title','(無題)')}")
+    return "\n".join(parts)
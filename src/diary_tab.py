@@ -13,20 +13,53 @@ from PySide6.QtWidgets import (
     QTimeEdit,
     QSizePolicy,
     QGraphicsDropShadowEffect,
+    QFileDialog,
+    QProgressDialog,
+    QComboBox,
+    QStackedWidget,
 )
-from PySide6.QtCore import Qt, QRect, QTime
-import os
+from PySide6.QtCore import Qt, QRect, QTime, QTimer, Signal
 import datetime
-from PySide6.QtGui import QPainter, QColor, QFont, QPen
-from openai import OpenAI
-import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from PySide6.QtGui import QPainter, QColor, QFont, QPen, QGuiApplication, QCursor
+
+from ai_client import AIClient
+from diary_analytics import DiaryAnalytics
+from diary_analytics_dialog import DiaryAnalyticsDialog
+from diary_embeddings import EmbeddingIndex, HashingEmbedder, OpenAIEmbedder
+from diary_export import EXPORT_FORMATS, export_to_file
+from diary_journal import FSYNC_INTERVAL_S, EditJournal, ops_for_changes, recover_day
+from diary_review import generate_review
+from diary_search_dialog import DiarySearchDialog
+from diary_store import day_path, dump_diary, parse_diary, text_summary
+from edit_coalescer import EditCoalescer
+from event_store import EventStore
+from tracing import span
+from week_view import DayCache, MultiDayView, month_range, week_range
 
 DIARY_FILE = "diary.txt"
 
+# 編集ジャーナルを日記ファイルへ反映する間隔（ミリ秒）
+CHECKPOINT_INTERVAL_MS = 60 * 1000
+
+# タイムラインの目盛り（分）と表示倍率の選択肢
+SLOT_GRANULARITIES = (5, 10, 15, 30, 60)
+ZOOM_LEVELS = (0.5, 0.75, 1.0, 1.5, 2.0, 3.0)
+# 倍率 1.0 のときの 1 分あたりの高さ（15 分 = 12px）
+BASE_PIXELS_PER_MINUTE = 12 / 15
+# 目盛り 1 つの最小の高さ（これ未満にはしない）
+MIN_SLOT_HEIGHT = 4
+
+# 表示モード（日 / 週 / 月）
+VIEW_MODES = ("日", "週", "月")
+
 
 class TimelineWidget(QWidget):
-    """06:00 〜 翌日 06:00 のタイムライン。15分単位のスロットでイベントを作成・編集できます。
+    """06:00 〜 翌日 06:00 のタイムライン。スロット単位（既定 15 分、5〜60 分で変更可）でイベントを作成・編集できます。
     描画や操作のロジックは従来の実装を踏襲していますが、見た目を白基調・丸みのあるスタイルに合わせています。
+    目盛りや倍率を変えたときに座標の表を作り直し、描画は表示中の範囲（スクロール領域の可視部分）だけ行います。
+    イベントは開始時刻順の表をストアの変更通知で保ち、描画時は表示範囲に掛かる部分を二分探索で取り出します。
     """
 
     def __init__(self, parent=None):
@@ -34,24 +67,27 @@ class TimelineWidget(QWidget):
         self.start_min = 6 * 60  # 06:00
         self.total_minutes = 24 * 60
         self.slot_minutes = 15
-        self.slots = self.total_minutes // self.slot_minutes  # 96
-        self.slot_height = 12
+        self.zoom = 1.0
         self.left_margin = 60
         self.min_width = 500
-        self.setMinimumSize(self.min_width, self.slot_height * self.slots)
+        self._rebuild_geometry()
 
-        self.events = []
+        # イベントは ID で管理し、変更はストアから通知される
+        self.store = EventStore()
+        self._start_order = []  # (開始分, ID) の昇順
+        self._max_duration = 0  # イベントの長さ（分）の最大値。削除では縮めない（描画範囲を広めに取るだけ）
+        self.store.subscribe(self._on_store_changed)
 
         # 選択・編集 state
         self.selecting = False
         self.sel_start_y = 0
         self.sel_end_y = 0
         self.mode = None
-        self.edit_index = None
+        self.edit_id = None
         self.move_anchor_y = 0
         self.resize_anchor_y = 0
         self._orig_event = None
-        self.selected_index = None
+        self.selected_id = None
 
         # 見た目用フォント
         self._label_font = QFont("Yu Gothic UI", 9)
@@ -59,69 +95,83 @@ class TimelineWidget(QWidget):
     def sizeHint(self):
         return self.minimumSize()
 
+    # ---------- 目盛り・倍率 ----------
+    def set_granularity(self, slot_minutes: int):
+        """スロットの分数を変える（5 / 10 / 15 / 30 / 60）"""
+        if slot_minutes not in SLOT_GRANULARITIES or slot_minutes == self.slot_minutes:
+            return
+        self.slot_minutes = slot_minutes
+        self._rebuild_geometry()
+
+    def set_zoom(self, zoom: float):
+        zoom = max(ZOOM_LEVELS[0], min(ZOOM_LEVELS[-1], zoom))
+        if zoom == self.zoom:
+            return
+        self.zoom = zoom
+        self._rebuild_geometry()
+
+    def _rebuild_geometry(self):
+        """目盛り・倍率から座標の表を作る（描画やヒットテストのたびに計算しない）"""
+        self.slots = self.total_minutes // self.slot_minutes
+        self.slot_height = max(MIN_SLOT_HEIGHT, int(round(self.slot_minutes * BASE_PIXELS_PER_MINUTE * self.zoom)))
+        # 開始からの経過分 → y 座標（0 〜 total_minutes）
+        px_per_min = self.slot_height / self.slot_minutes
+        self._minute_y = [int(round(m * px_per_min)) for m in range(self.total_minutes + 1)]
+        # 時刻ラベル（1 時間ごと、目盛りが 1 時間より粗い場合は目盛りごと）
+        self._hour_labels = []
+        for m in range(0, self.total_minutes + 1, max(60, self.slot_minutes)):
+            hour = ((self.start_min + m) // 60) % 24
+            self._hour_labels.append((self._minute_y[m], f"{hour:02d}:00"))
+        self.setMinimumSize(self.min_width, self.slot_height * self.slots)
+        self.updateGeometry()
+        self.update()
+
+    def _y_for_minutes(self, minutes: int) -> int:
+        """絶対時刻（分）→ y 座標（範囲外は端に寄せる）"""
+        offset = max(0, min(self.total_minutes, minutes - self.start_min))
+        return self._minute_y[offset]
+
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor("#ffffff"))
+        # スクロール領域から見えている部分だけが再描画範囲として渡される
+        exposed = event.rect()
+        painter.fillRect(exposed, QColor("#ffffff"))
 
         w = self.width()
+        top, bottom = exposed.top(), exposed.bottom()
+        first_slot = max(0, top // self.slot_height)
+        last_slot = min(self.slots, bottom // self.slot_height + 1)
 
         # グリッド線
         pen = QPen(QColor("#f0f0f0"))
         painter.setPen(pen)
-        for i in range(self.slots + 1):
+        for i in range(first_slot, last_slot + 1):
             y = i * self.slot_height
             painter.drawLine(self.left_margin, y, w, y)
 
         # 時刻ラベル（1時間ごと）
         painter.setFont(self._label_font)
         painter.setPen(QColor("#666666"))
-        for i in range(0, self.slots + 1, 4):
-            minutes = self.start_min + i * self.slot_minutes
-            hour = (minutes // 60) % 24
-            label = f"{hour:02d}:00"
-            y = i * self.slot_height
-            painter.drawText(8, y + (self.slot_height // 2) + 5, label)
-
-        # イベント描画
-        for ev in sorted(self.events, key=lambda e: e["start"]):
-            top_min = max(ev["start"] - self.start_min, 0)
-            bottom_min = min(ev["end"] - self.start_min, self.total_minutes)
-            if bottom_min <= 0 or top_min >= self.total_minutes:
-                continue
-            top_slot = int(round(top_min / self.slot_minutes))
-            bottom_slot = int(round(bottom_min / self.slot_minutes))
-            top_y = top_slot * self.slot_height
-            height = max(2, (bottom_slot - top_slot) * self.slot_height - 1)
-
-            rect = QRect(self.left_margin + 8, top_y + 2, w - self.left_margin - 16, height)
-            painter.setPen(QPen(QColor("#66a3ff")))
-            painter.setBrush(QColor(102, 163, 255, 220))
-            painter.drawRoundedRect(rect, 6, 6)
+        label_offset = (self.slot_height // 2) + 5
+        for y, label in self._hour_labels:
+            if top - 20 <= y <= bottom + 20:
+                painter.drawText(8, y + label_offset, label)
 
-            # テキスト
-            painter.setPen(QColor("#ffffff"))
-            fm = painter.fontMetrics()
-            title = ev.get("title", "(無題)")
-            start_h = (ev["start"] // 60) % 24
-            start_m = ev["start"] % 60
-            end_h = (ev["end"] // 60) % 24
-            end_m = ev["end"] % 60
-            time_label = f"{start_h:02d}:{start_m:02d}-{end_h:02d}:{end_m:02d}"
-            text = f"{time_label} {title}"
-            elided = fm.elidedText(text, Qt.ElideRight, rect.width() - 10)
-            painter.drawText(rect.adjusted(6, 0, -6, 0), Qt.AlignVCenter | Qt.AlignLeft, elided)
-
-            # 選択時の境界線
-            if self.selected_index is not None:
-                sel_ev = (
-                    self.events[self.selected_index]
-                    if 0 <= self.selected_index < len(self.events)
-                    else None
-                )
-                if sel_ev is ev:
-                    painter.setPen(QPen(QColor("#ffb74d"), 2))
-                    painter.setBrush(Qt.NoBrush)
-                    painter.drawRoundedRect(rect, 6, 6)
+        # イベント描画（表示範囲に掛かるものだけ）。
+        # 開始時刻順の表から、表示範囲の下端より前に始まり、上端から最長の長さ以内に始まったものだけを取り出す
+        selected = self.get_event(self.selected_id)
+        fm = painter.fontMetrics()
+        lo_min = self.start_min + bisect_left(self._minute_y, top) - 1 - self._max_duration
+        hi_min = self.start_min + bisect_right(self._minute_y, bottom)
+        lo = bisect_left(self._start_order, (lo_min,))
+        hi = bisect_left(self._start_order, (hi_min + 1,), lo)
+        # ドラッグ中の変更は離すまで通知されず表の位置が古いので、そのイベントは最後に別に描く
+        dragging = self.edit_id if self.mode in ("moving", "resize_top", "resize_bottom") else None
+        for _start, event_id in self._start_order[lo:hi]:
+            if event_id != dragging:
+                self._paint_event(painter, fm, self.store.get(event_id), selected, top, bottom)
+        if dragging is not None and dragging in self.store:
+            self._paint_event(painter, fm, self.store.get(dragging), selected, top, bottom)
 
         # 現在選択中のドラッグ矩形
         if self.selecting:
@@ -132,7 +182,48 @@ class TimelineWidget(QWidget):
             painter.setBrush(QColor(165, 214, 167, 120))
             painter.drawRoundedRect(sel_rect, 6, 6)
 
-    # 以下マウス操作・編集ロジックは既存の挙動を保つ
+    def _paint_event(self, painter, fm, ev, selected, top: int, bottom: int):
+        """イベント 1 件を描く（表示範囲に掛からなければ何もしない）"""
+        if ev["end"] <= self.start_min or ev["start"] >= self.start_min + self.total_minutes:
+            return
+        rect = self._event_rect(ev)
+        if rect.bottom() < top or rect.top() > bottom:
+            return
+        painter.setPen(QPen(QColor("#66a3ff")))
+        painter.setBrush(QColor(102, 163, 255, 220))
+        painter.drawRoundedRect(rect, 6, 6)
+
+        # テキスト
+        painter.setPen(QColor("#ffffff"))
+        title = ev.get("title", "(無題)")
+        start_h = (ev["start"] // 60) % 24
+        start_m = ev["start"] % 60
+        end_h = (ev["end"] // 60) % 24
+        end_m = ev["end"] % 60
+        time_label = f"{start_h:02d}:{start_m:02d}-{end_h:02d}:{end_m:02d}"
+        text = f"{time_label} {title}"
+        elided = fm.elidedText(text, Qt.ElideRight, rect.width() - 10)
+        painter.drawText(rect.adjusted(6, 0, -6, 0), Qt.AlignVCenter | Qt.AlignLeft, elided)
+
+        # 選択時の境界線
+        if selected is ev:
+            painter.setPen(QPen(QColor("#ffb74d"), 2))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(rect, 6, 6)
+
+    def wheelEvent(self, event):
+        """Ctrl + ホイールで表示倍率を変える"""
+        if event.modifiers() & Qt.ControlModifier:
+            step = 1 if event.angleDelta().y() > 0 else -1
+            i = min(range(len(ZOOM_LEVELS)), key=lambda k: abs(ZOOM_LEVELS[k] - self.zoom))
+            self.set_zoom(ZOOM_LEVELS[max(0, min(len(ZOOM_LEVELS) - 1, i + step))])
+            if hasattr(self, "zoom_changed_callback") and self.zoom_changed_callback:
+                self.zoom_changed_callback(self.zoom)
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    # 以下マウス操作・編集ロジックは既存の挙動を保つ（イベントは ID で扱う）
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             posy = max(0, min(self.height(), event.pos().y()))
@@ -143,20 +234,20 @@ class TimelineWidget(QWidget):
                 self.sel_start_y = posy
                 self.sel_end_y = posy
             else:
-                kind, idx = hit
-                self.edit_index = idx
+                kind, event_id = hit
+                self.edit_id = event_id
+                self._orig_event = dict(self.store.get(event_id))
                 if kind == "inside":
                     self.mode = "moving"
                     self.move_anchor_y = posy
-                    self._orig_event = dict(self.events[idx])
                 elif kind == "top":
                     self.mode = "resize_top"
                     self.resize_anchor_y = posy
-                    self._orig_event = dict(self.events[idx])
                 elif kind == "bottom":
                     self.mode = "resize_bottom"
                     self.resize_anchor_y = posy
-                    self._orig_event = dict(self.events[idx])
+                # ドラッグ中の移動は離したときに 1 回の変更として通知する
+                self.store.begin_batch()
             self.update()
 
     def mouseMoveEvent(self, event):
@@ -164,7 +255,7 @@ class TimelineWidget(QWidget):
         if self.mode == "creating" and self.selecting:
             self.sel_end_y = posy
             self.update()
-        elif self.mode == "moving" and self.edit_index is not None:
+        elif self.mode == "moving" and self.edit_id is not None:
             dy = posy - self.move_anchor_y
             dslots = int(round(dy / self.slot_height))
             dminutes = dslots * self.slot_minutes
@@ -180,49 +271,39 @@ class TimelineWidget(QWidget):
             if new_end > max_end:
                 new_end = max_end
                 new_start = new_end - duration
-            self.events[self.edit_index]["start"] = new_start
-            self.events[self.edit_index]["end"] = new_end
-            self.update()
-            # notify detail panel if this is the selected event
-            try:
-                if (
-                    hasattr(self, "selection_changed_callback")
-                    and self.selection_changed_callback
-                    and self.selected_index == self.edit_index
-                ):
-                    self.selection_changed_callback(self.selected_index)
-            except Exception:
-                pass
-        elif self.mode in ("resize_top", "resize_bottom") and self.edit_index is not None:
+            self._drag_update(start=new_start, end=new_end)
+        elif self.mode in ("resize_top", "resize_bottom") and self.edit_id is not None:
             orig = self._orig_event
+            dy = posy - self.resize_anchor_y
+            dslots = int(round(dy / self.slot_height))
+            dminutes = dslots * self.slot_minutes
             if self.mode == "resize_top":
-                dy = posy - self.resize_anchor_y
-                dslots = int(round(dy / self.slot_height))
-                dminutes = dslots * self.slot_minutes
                 new_start = orig["start"] + dminutes
                 min_start = self.start_min
                 max_start = orig["end"] - self.slot_minutes
-                new_start = max(min_start, min(max_start, new_start))
-                self.events[self.edit_index]["start"] = new_start
+                self._drag_update(start=max(min_start, min(max_start, new_start)))
             else:
-                dy = posy - self.resize_anchor_y
-                dslots = int(round(dy / self.slot_height))
-                dminutes = dslots * self.slot_minutes
                 new_end = orig["end"] + dminutes
                 min_end = orig["start"] + self.slot_minutes
                 max_end = self.start_min + self.total_minutes
-                new_end = max(min_end, min(max_end, new_end))
-                self.events[self.edit_index]["end"] = new_end
-            self.update()
-            try:
-                if (
-                    hasattr(self, "selection_changed_callback")
-                    and self.selection_changed_callback
-                    and self.selected_index == self.edit_index
-                ):
-                    self.selection_changed_callback(self.selected_index)
-            except Exception:
-                pass
+                self._drag_update(end=max(min_end, min(max_end, new_end)))
+
+    def _drag_update(self, **fields):
+        """ドラッグ中の位置を反映し、選択中のイベントなら詳細パネルにも知らせる"""
+        ev = self.store.get(self.edit_id)
+        old_rect = self._event_rect(ev)
+        if not self.store.update(self.edit_id, **fields):
+            return
+        self.update(old_rect.united(self._event_rect(ev)).adjusted(-3, -3, 3, 3))
+        try:
+            if (
+                hasattr(self, "selection_changed_callback")
+                and self.selection_changed_callback
+                and self.selected_id == self.edit_id
+            ):
+                self.selection_changed_callback(self.selected_id)
+        except Exception:
+            pass
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -250,72 +331,91 @@ class TimelineWidget(QWidget):
                         "location": "",
                         "reflection": "",
                     }
-                    self.events.append(ev)
-                    self.select_event(len(self.events) - 1)
+                    self.select_event(self.store.insert(ev))
+            elif self.mode in ("moving", "resize_top", "resize_bottom"):
+                self.store.end_batch()
             if not self.selecting:
                 hit = self._hit_test(event.pos())
                 if hit is not None:
-                    kind, idx = hit
-                    self.select_event(idx)
+                    kind, event_id = hit
+                    self.select_event(event_id)
             self.mode = None
-            self.edit_index = None
+            self.edit_id = None
             self._orig_event = None
             self.move_anchor_y = 0
             self.resize_anchor_y = 0
             self.update()
 
-    def select_event(self, index: int | None):
-        if index is None:
-            self.selected_index = None
-        elif 0 <= index < len(self.events):
-            self.selected_index = index
-        else:
-            self.selected_index = None
+    def select_event(self, event_id: int | None):
+        self.selected_id = event_id if event_id in self.store else None
         self.update()
         try:
             if hasattr(self, "selection_changed_callback") and self.selection_changed_callback:
-                self.selection_changed_callback(self.selected_index)
+                self.selection_changed_callback(self.selected_id)
         except Exception:
             pass
 
-    def get_event(self, index: int):
-        if 0 <= index < len(self.events):
-            return self.events[index]
-        return None
+    def get_event(self, event_id: int | None):
+        return self.store.get(event_id)
 
-    def update_event(self, index: int, notify: bool = True, **kwargs):
-        if 0 <= index < len(self.events):
-            ev = self.events[index]
-            for k, v in kwargs.items():
-                if k in ("start", "end"):
-                    ev[k] = int(v)
-                else:
-                    ev[k] = v
-            self.update()
+    def update_event(self, event_id: int, notify: bool = True, **kwargs):
+        fields = {k: int(v) if k in ("start", "end") else v for k, v in kwargs.items()}
+        # 再描画は _on_store_changed が変わったイベントの範囲だけ行う
+        if self.store.update(event_id, **fields):
             try:
                 if (
                     notify
                     and hasattr(self, "selection_changed_callback")
                     and self.selection_changed_callback
-                    and self.selected_index == index
+                    and self.selected_id == event_id
                 ):
-                    self.selection_changed_callback(self.selected_index)
+                    self.selection_changed_callback(self.selected_id)
             except Exception:
                 pass
 
+    def remove_event(self, event_id: int):
+        self.store.remove(event_id)
+
+    def _on_store_changed(self, changes):
+        """ストアの変更のうち、表示に関係する部分だけ描き直す"""
+        if changes.reset:
+            if self.selected_id not in self.store:
+                self.selected_id = None
+            self._start_order = sorted((ev["start"], event_id) for event_id, ev in self.store.items())
+            self._max_duration = max((ev["end"] - ev["start"] for ev in self.store.events()), default=0)
+            self.update()
+            return
+        # 開始時刻順の表を差分で更新する（古い位置を消してから新しい位置に入れる）
+        for event_id, ev in list(changes.previous.items()) + list(changes.removed.items()):
+            i = bisect_left(self._start_order, (ev["start"], event_id))
+            if i < len(self._start_order) and self._start_order[i] == (ev["start"], event_id):
+                del self._start_order[i]
+        for event_id in list(changes.inserted) + list(changes.updated):
+            ev = self.store.get(event_id)
+            if ev is not None:
+                insort(self._start_order, (ev["start"], event_id))
+                self._max_duration = max(self._max_duration, ev["end"] - ev["start"])
+        dirty = QRect()
+        for ev in list(changes.previous.values()) + list(changes.removed.values()):
+            dirty = dirty.united(self._event_rect(ev))
+        for event_id in list(changes.inserted) + list(changes.updated):
+            ev = self.store.get(event_id)
+            if ev is not None:
+                dirty = dirty.united(self._event_rect(ev))
+        if self.selected_id in changes.removed:
+            self.selected_id = None
+        if not dirty.isNull():
+            # 選択枠（太さ 2）の分だけ広げる
+            self.update(dirty.adjusted(-3, -3, 3, 3))
+
     def _event_rect(self, ev):
         w = self.width()
-        top_min = max(ev["start"] - self.start_min, 0)
-        bottom_min = min(ev["end"] - self.start_min, self.total_minutes)
-        top_slot = int(round(top_min / self.slot_minutes))
-        bottom_slot = int(round(bottom_min / self.slot_minutes))
-        top_y = top_slot * self.slot_height
-        height = max(2, (bottom_slot - top_slot) * self.slot_height - 1)
+        top_y = self._y_for_minutes(ev["start"])
+        height = max(2, self._y_for_minutes(ev["end"]) - top_y - 1)
         return QRect(self.left_margin + 8, top_y + 2, w - self.left_margin - 16, height)
 
     def _hit_test(self, qpoint):
-        for idx in range(len(self.events) - 1, -1, -1):
-            ev = self.events[idx]
+        for event_id, ev in reversed(self.store.items()):
             rect = self._event_rect(ev)
             if rect.contains(qpoint):
                 y = qpoint.y()
@@ -323,91 +423,55 @@ class TimelineWidget(QWidget):
                 bottom_edge = rect.bottom()
                 margin = max(6, int(self.slot_height / 2))
                 if abs(y - top_edge) <= margin:
-                    return ("top", idx)
+                    return ("top", event_id)
                 if abs(y - bottom_edge) <= margin:
-                    return ("bottom", idx)
-                return ("inside", idx)
+                    return ("bottom", event_id)
+                return ("inside", event_id)
         return None
 
+    @property
+    def events(self) -> list[dict]:
+        return self.store.events()
+
+    @events.setter
+    def events(self, events: list[dict]):
+        self.store.reset(events)
+
     def to_json(self):
-        return json.dumps({"events": self.events}, ensure_ascii=False, indent=2)
+        return dump_diary(self.events)
 
     def from_json(self, content: str):
         try:
-            data = json.loads(content)
-            raw_events = None
-            if isinstance(data, dict) and "events" in data and isinstance(data["events"], list):
-                raw_events = data["events"]
-            elif isinstance(data, list):
-                raw_events = data
-            if raw_events is None:
+            events = parse_diary(
+                content, start_min=self.start_min, total_minutes=self.total_minutes, slot_minutes=self.slot_minutes
+            )
+            if events is None:
                 return False
-            cleaned = []
-            for item in raw_events:
-                if not isinstance(item, dict):
-                    continue
-                try:
-                    start = int(item.get("start", self.start_min))
-                except Exception:
-                    try:
-                        start = int(float(item.get("start", self.start_min)))
-                    except Exception:
-                        start = self.start_min
-                try:
-                    end = int(item.get("end", start + self.slot_minutes))
-                except Exception:
-                    try:
-                        end = int(float(item.get("end", start + self.slot_minutes)))
-                    except Exception:
-                        end = start + self.slot_minutes
-                if end <= start:
-                    end = start + self.slot_minutes
-                min_t = self.start_min
-                max_t = self.start_min + self.total_minutes
-                if start < min_t:
-                    start = min_t
-                if end > max_t:
-                    end = max_t
-                if start >= max_t:
-                    # skip events completely outside range
-                    continue
-                title = item.get("title", "") or ""
-                location = item.get("location", "") or ""
-                reflection = item.get("reflection", "") or ""
-                cleaned.append(
-                    {
-                        "start": start,
-                        "end": end,
-                        "title": title,
-                        "location": location,
-                        "reflection": reflection,
-                    }
-                )
-            self.events = cleaned
-            self.update()
+            self.events = events
             return True
         except Exception:
             return False
 
     def get_text_summary(self) -> str:
-        if not self.events:
-            return ""
-        parts = []
-        for ev in sorted(self.events, key=lambda e: e["start"]):
-            sh = (ev["start"] // 60) % 24
-            sm = ev["start"] % 60
-            eh = (ev["end"] // 60) % 24
-            em = ev["end"] % 60
-            parts.append(f"{sh:02d}:{sm:02d}-{eh:02d}:{em:02d} {ev.get('title','(無題)')}")
-        return "\n".join(parts)
+        return text_summary(self.events)
 
 
 class DiaryTab(QWidget):
     """日記タブのメイン UI。見た目を lol_pick_support_tab に合わせて白基調・丸み・ポップで上品にします。"""
 
-    def __init__(self, client: OpenAI | None = None, parent=None):
+    # 書き出しの進捗・完了（ワーカースレッド → GUI スレッド）
+    export_progress = Signal(int, int)
+    export_finished = Signal(object)
+
+    def __init__(self, client: AIClient | None = None, parent=None):
         super().__init__(parent)
         self.client = client
+        # 表示・保存の対象日（週・月表示から別の日を開ける）。タイムラインとジャーナルは常にこの日のもの
+        self.current_date = datetime.date.today()
+        # 週・月表示で見ている期間の基準日（◀/▶ で動くのはこちらだけで、開いている日は変わらない）
+        self.view_date = self.current_date
+        # 保存前の編集を追記していくジャーナル（異常終了しても次回の読み込みで復元する）
+        self.journal = EditJournal(self.current_date)
 
         # フォント設定（ナチュラルでポピュラーなフォント）
         ui_font = QFont("Yu Gothic UI", 10)
@@ -421,10 +485,48 @@ class DiaryTab(QWidget):
         self.scroll.setWidgetResizable(True)
         self.scroll.setMinimumHeight(400)
 
+        # 表示の目盛り・倍率
+        self.granularity_combo = QComboBox()
+        for minutes in SLOT_GRANULARITIES:
+            self.granularity_combo.addItem(f"{minutes}分", minutes)
+        self.granularity_combo.setCurrentIndex(SLOT_GRANULARITIES.index(self.timeline.slot_minutes))
+        self.zoom_combo = QComboBox()
+        for zoom in ZOOM_LEVELS:
+            self.zoom_combo.addItem(f"{int(zoom * 100)}%", zoom)
+        self.zoom_combo.setCurrentIndex(ZOOM_LEVELS.index(self.timeline.zoom))
+
+        # 週・月表示（日記は表示される日の分だけ読み込む）
+        self.day_cache = DayCache()
+        self.multi_day_view = MultiDayView(self.day_cache)
+        self.multi_day_view.set_scale(self.timeline.slot_minutes, self.timeline.slot_height)
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.scroll)
+        self.view_stack.addWidget(self.multi_day_view)
+        self.view_mode_combo = QComboBox()
+        self.view_mode_combo.addItems(VIEW_MODES)
+        self.prev_button = QPushButton("◀")
+        self.today_button = QPushButton("今日")
+        self.next_button = QPushButton("▶")
+        for button in (self.prev_button, self.next_button):
+            button.setFixedWidth(32)
+        self.date_label = QLabel()
+
         # ボタン群
         self.save_button = QPushButton("保存")
         self.load_button = QPushButton("読み込み")
         self.ai_button = QPushButton("AIコメント生成")
+        self.export_button = QPushButton("書き出し")
+        self.analytics_button = QPushButton("集計")
+        # 時間の集計（保存のたびにその日の分だけ更新する）
+        self.analytics = DiaryAnalytics.load()
+        self._analytics_dialog = None
+        self.search_button = QPushButton("意味検索")
+        # 埋め込みの索引は最初に検索したときに開く
+        self.embedding_index = None
+        self._search_dialog = None
+        self._export_thread = None
+        self._export_progress_dialog = None
+        self._export_cancel = threading.Event()
         if self.client is None:
             self.ai_button.setEnabled(False)
 
@@ -433,10 +535,26 @@ class DiaryTab(QWidget):
         h_layout.addWidget(self.load_button)
         h_layout.addWidget(self.save_button)
         h_layout.addWidget(self.ai_button)
+        h_layout.addWidget(self.export_button)
+        h_layout.addWidget(self.analytics_button)
+        h_layout.addWidget(self.search_button)
+
+        view_layout = QHBoxLayout()
+        view_layout.addWidget(self.view_mode_combo)
+        view_layout.addWidget(self.prev_button)
+        view_layout.addWidget(self.today_button)
+        view_layout.addWidget(self.next_button)
+        view_layout.addWidget(self.date_label)
+        view_layout.addStretch()
+        view_layout.addWidget(QLabel("目盛り"))
+        view_layout.addWidget(self.granularity_combo)
+        view_layout.addWidget(QLabel("倍率"))
+        view_layout.addWidget(self.zoom_combo)
 
         left_layout = QVBoxLayout()
         left_layout.setSpacing(8)
-        left_layout.addWidget(self.scroll)
+        left_layout.addLayout(view_layout)
+        left_layout.addWidget(self.view_stack)
         left_layout.addLayout(h_layout)
 
         # 右側: 詳細パネル
@@ -496,10 +614,35 @@ class DiaryTab(QWidget):
 
         # シグナル接続
         self.save_button.clicked.connect(self.save_diary)
-        self.load_button.clicked.connect(self.load_diary)
+        self.load_button.clicked.connect(lambda: self.load_diary())
         self.ai_button.clicked.connect(self.generate_ai_comment)
+        self.export_button.clicked.connect(self.export_history)
+        self.analytics_button.clicked.connect(self.show_analytics)
+        self.search_button.clicked.connect(self.show_search)
+        self.export_progress.connect(self._on_export_progress)
+        self.export_finished.connect(self._on_export_finished)
         self.timeline.selection_changed_callback = self.on_timeline_selection_changed
+        self.timeline.zoom_changed_callback = self._on_timeline_zoomed
+        self.timeline.store.subscribe(self._record_edit)
+        self.granularity_combo.currentIndexChanged.connect(self._on_granularity_changed)
+        self.zoom_combo.currentIndexChanged.connect(self._on_zoom_changed)
+        self.view_mode_combo.currentIndexChanged.connect(self._on_view_mode_changed)
+        self.prev_button.clicked.connect(lambda: self._step_view(-1))
+        self.next_button.clicked.connect(lambda: self._step_view(1))
+        self.today_button.clicked.connect(lambda: self._open_day(datetime.date.today()))
+        self.multi_day_view.day_activated_callback = self._open_day
+        self._update_date_label()
+
+        # 詳細パネルの編集はフレームごと（振り返りは入力が止まってから）にまとめて反映する
+        self._edits = EditCoalescer(
+            lambda event_id, fields: self.timeline.update_event(event_id, notify=False, **fields),
+            self.timeline.store, parent=self,
+        )
+        # 詳細パネルに表示中のイベントと、振り返り欄に入っている文章（toPlainText を避けるため控えておく）
+        self._detail_event_id = None
+        self._detail_reflection = ""
 
+        self.title_edit.textEdited.connect(lambda _text: self._on_title_changed())
         self.title_edit.editingFinished.connect(self._on_title_changed)
         self.start_time_edit.timeChanged.connect(self._on_start_time_changed)
         self.end_time_edit.timeChanged.connect(self._on_end_time_changed)
@@ -560,67 +703,325 @@ class DiaryTab(QWidget):
         self.save_button.setObjectName("secondary")
         self.ai_button.setObjectName("primary")
         self.load_button.setObjectName("secondary")
+        self.export_button.setObjectName("secondary")
         self.delete_button.setObjectName("secondary")
 
+        # ジャーナルの fsync はまとめて行い、定期的に日記ファイルへ反映する
+        self._journal_sync_timer = QTimer(self)
+        self._journal_sync_timer.setInterval(int(FSYNC_INTERVAL_S * 1000))
+        self._journal_sync_timer.timeout.connect(self.journal_sync)
+        self._journal_sync_timer.start()
+        self._checkpoint_timer = QTimer(self)
+        self._checkpoint_timer.setInterval(CHECKPOINT_INTERVAL_MS)
+        self._checkpoint_timer.timeout.connect(self.checkpoint)
+        self._checkpoint_timer.start()
+
         # 自動で今日のファイルを読み込む（サイレント）
-        self.load_diary(silent=True)
+        self.load_diary(silent=True, recover=True)
 
     # ---------- 既存の保存/読み込み/AI 関連処理 ----------
     def save_diary(self):
-        content = self.timeline.to_json()
         try:
-            diaries_dir = os.path.join(os.path.dirname(__file__), "Diaries")
-            os.makedirs(diaries_dir, exist_ok=True)
-            filename = datetime.date.today().strftime("%Y%m%d") + ".json"
-            filepath = os.path.join(diaries_dir, filename)
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(content)
+            filepath = self._write_current_day()
             QMessageBox.information(self, "保存完了", f"日記（タイムライン）を保存しました:\n{filepath}")
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"保存に失敗しました:\n{e}")
 
-    def load_diary(self, silent: bool = False):
-        diaries_dir = os.path.join(os.path.dirname(__file__), "Diaries")
-        filename = datetime.date.today().strftime("%Y%m%d") + ".json"
-        filepath = os.path.join(diaries_dir, filename)
-        if not os.path.exists(filepath):
-            if not silent:
-                QMessageBox.information(self, "情報", f"日記ファイルがありません:\n{filepath}")
+    def _write_current_day(self) -> str:
+        """日記ファイルに書き込み（ジャーナルは消える）、週・月表示と集計に反映する"""
+        self._edits.flush()
+        store = self.timeline.store
+        filepath = self.journal.checkpoint(store.events(), store.ids())
+        self.day_cache.invalidate(self.current_date)
+        try:
+            self.analytics.update_day(self.current_date, self.timeline.events)
+            self.analytics.save()
+        except Exception:
+            # 集計は次回 show_analytics の refresh で作り直せるので保存の失敗扱いにしない
+            pass
+        return filepath
+
+    # ---------- 編集ジャーナル ----------
+    def _record_edit(self, changes):
+        try:
+            for op in ops_for_changes(changes, self.timeline.store):
+                self.journal.record(op)
+        except OSError:
+            # ジャーナルに書けなくても編集自体は続けられる（手動保存で反映される）
+            pass
+
+    def journal_sync(self):
+        try:
+            self.journal.sync()
+        except OSError:
+            pass
+
+    def checkpoint(self):
+        """ジャーナルに溜まった編集を日記ファイルへ反映する（編集が無ければ何もしない）"""
+        self._edits.flush()
+        if not self.journal.pending:
             return
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-            if self.timeline.from_json(content):
-                if not silent:
-                    QMessageBox.information(self, "読み込み完了", f"日記（タイムライン）を読み込みました:\n{filepath}")
+            self._write_current_day()
+        except Exception:
+            # 次の周期で再試行する。ジャーナルは残っているので編集は失われない
+            pass
+
+    def shutdown(self):
+        """アプリ終了時に呼ぶ: ジャーナルを確定させる（日記ファイルへの反映は次回の読み込み時）"""
+        self._journal_sync_timer.stop()
+        self._checkpoint_timer.stop()
+        self._edits.flush()
+        self.journal.close()
+
+    def show_analytics(self):
+        """時間の集計を表示する。CLI・カレンダー取り込みなど別経路で変わった日だけ読み直す"""
+        self.checkpoint()
+        QGuiApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
+        try:
+            if self.analytics.refresh():
+                self.analytics.save()
+        except Exception as e:
+            QMessageBox.warning(self, "集計", f"集計の更新に失敗しました:\n{e}")
+        finally:
+            QGuiApplication.restoreOverrideCursor()
+        if self._analytics_dialog is None:
+            self._analytics_dialog = DiaryAnalyticsDialog(self.analytics, self)
+        else:
+            self._analytics_dialog.reload()
+        self._analytics_dialog.show()
+        self._analytics_dialog.raise_()
+
+    def load_diary(self, silent: bool = False, recover: bool = False):
+        """日記ファイルから読み直す。recover=False（読み込みボタン）では保存していない編集を破棄するので、
+        編集があれば先に確認する。recover=True（起動時）は前回保存せずに終了した編集をジャーナルから復元する"""
+        self._edits.flush()
+        if not recover and self.journal.pending and not silent:
+            answer = QMessageBox.question(
+                self, "読み込み",
+                f"保存していない編集が {self.journal.pending} 件あります。破棄して日記ファイルから読み込み直しますか？",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No,
+            )
+            if answer != QMessageBox.Yes:
+                return
+        with span("diary.load_diary"):
+            self._load_diary(silent, recover)
+
+    def _load_diary(self, silent: bool, recover: bool = True):
+        filepath = day_path(self.current_date)
+        try:
+            if recover:
+                # 保存前に終了した編集がジャーナルに残っていれば再生する
+                self.journal.close()
             else:
+                self.journal.discard()
+            events, ids, replayed = recover_day(self.current_date)
+            # 再生した編集は下でチェックポイントし、再生しなかった（基準が合わず捨てた）ジャーナルはもう無い
+            self.journal.pending = 0
+            if events is None:
+                # 日記ファイルが無い日のジャーナルは空の状態を基準にする
+                self.journal.base_ids = []
+                if not silent:
+                    QMessageBox.information(self, "情報", f"日記ファイルがありません:\n{filepath}")
+                return
+            self.timeline.store.reset(events, ids)
+            self.journal.base_ids = ids
+            if replayed:
+                self._write_current_day()
                 if not silent:
-                    QMessageBox.information(self, "読み込み完了", "ファイルは JSON 形式ではありません。内容は表示されません。")
+                    QMessageBox.information(self, "復元", f"保存されていなかった編集 {replayed} 件を復元しました。")
+            elif not silent:
+                QMessageBox.information(self, "読み込み完了", f"日記（タイムライン）を読み込みました:\n{filepath}")
+        except ValueError:
+            if not silent:
+                QMessageBox.information(self, "読み込み完了", "ファイルは JSON 形式ではありません。内容は表示されません。")
         except Exception as e:
             if not silent:
                 QMessageBox.critical(self, "エラー", f"読み込みに失敗しました:\n{e}")
 
+    def show_search(self):
+        """振り返りなどの意味検索。API キーがあり送信を了承されたら OpenAI の埋め込み、それ以外はローカルの近似を使う"""
+        self.checkpoint()
+        if self._search_dialog is None:
+            use_openai = self.client is not None and QMessageBox.question(
+                self, "意味検索",
+                "OpenAI の埋め込みを使うと、全期間の日記のタイトル・場所・振り返りが OpenAI に送信されます。\n"
+                "送信してよいですか？\n\n「いいえ」を選ぶと送信せず、ローカルの簡易的な検索を使います。",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No,
+            ) == QMessageBox.Yes
+            embedder = OpenAIEmbedder(self.client) if use_openai else HashingEmbedder()
+            self.embedding_index = EmbeddingIndex(embedder)
+            self._search_dialog = DiarySearchDialog(self.embedding_index, self)
+            self._search_dialog.open_day_callback = self._open_day
+            self._search_dialog.before_search_callback = self.checkpoint
+        self._search_dialog.show()
+        self._search_dialog.raise_()
+
     def generate_ai_comment(self):
         if self.client is None:
             QMessageBox.warning(self, "API未設定", "OPENAI_API_KEY が設定されていません。環境変数を設定してください。")
             return
-        summary = self.timeline.get_text_summary()
-        if not summary.strip():
+        self._edits.flush()
+        if not self.timeline.get_text_summary().strip():
             QMessageBox.warning(self, "エラー", "イベントがありません。")
             return
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "あなたは優しい日記コーチとして、日本語で短くコメントを返してください。"},
-                    {"role": "user", "content": f"今日の出来事タイムラインです:\n{summary}\nこの内容にコメントしてください。"},
-                ],
-            )
-            ai_comment = response.choices[0].message["content"]
+            ai_comment = generate_review(self.client, self.timeline.events)
             QMessageBox.information(self, "AI コメント", ai_comment)
         except Exception as e:
             QMessageBox.critical(self, "エラー", f"APIエラー:\n{e}")
 
+    def export_history(self):
+        """全期間の日記を CSV / JSON Lines / Markdown に書き出す（バックグラウンドで 1 日ずつ）"""
+        if self._export_thread is not None:
+            return
+        path, selected = QFileDialog.getSaveFileName(
+            self, "日記の書き出し", "diary_export.csv",
+            "CSV (*.csv);;JSON Lines (*.jsonl);;Markdown (*.md)",
+        )
+        if not path:
+            return
+        # 形式は拡張子から決め、拡張子が無ければ選んだフィルタの拡張子を付ける
+        fmt = next((name for name, ext in EXPORT_FORMATS.items() if path.lower().endswith(ext)), None)
+        if fmt is None:
+            fmt = next((name for name, ext in EXPORT_FORMATS.items() if f"*{ext}" in (selected or "")), "csv")
+            path += EXPORT_FORMATS[fmt]
+        # 書き出しは日記ファイルを読むので、ジャーナルにだけある編集を先に反映する
+        self.checkpoint()
+
+        self._export_cancel = threading.Event()
+        self._export_progress_dialog = QProgressDialog("日記を書き出しています...", "中止", 0, 0, self)
+        self._export_progress_dialog.setWindowTitle("書き出し")
+        self._export_progress_dialog.setMinimumDuration(300)
+        self._export_progress_dialog.canceled.connect(self._export_cancel.set)
+        self.export_button.setEnabled(False)
+
+        def work():
+            try:
+                result = export_to_file(path, fmt, progress=self.export_progress.emit,
+                                        cancelled=self._export_cancel.is_set)
+                result = (path, result)
+            except Exception as e:
+                result = e
+            self.export_finished.emit(result)
+
+        self._export_thread = threading.Thread(target=work, name="diary-export", daemon=True)
+        self._export_thread.start()
+
+    def _on_export_progress(self, done: int, total: int):
+        if self._export_progress_dialog is not None:
+            self._export_progress_dialog.setMaximum(total)
+            self._export_progress_dialog.setValue(done)
+
+    def _on_export_finished(self, result):
+        self._export_thread = None
+        self.export_button.setEnabled(True)
+        cancelled = self._export_cancel.is_set()
+        if self._export_progress_dialog is not None:
+            self._export_progress_dialog.close()
+            self._export_progress_dialog = None
+        if isinstance(result, Exception):
+            QMessageBox.critical(self, "エラー", f"書き出しに失敗しました:\n{result}")
+            return
+        path, count = result
+        if cancelled:
+            QMessageBox.information(self, "書き出し", f"中止しました（{count} 件まで書き出し済み）:\n{path}")
+        else:
+            QMessageBox.information(self, "書き出し完了", f"{count} 件を書き出しました:\n{path}")
+
+    # ---------- 目盛り・倍率 ----------
+    def _apply_timeline_view(self, change):
+        """表示中の中央の時刻を保ったまま目盛り・倍率を変える"""
+        bar = self.scroll.verticalScrollBar()
+        center_y = bar.value() + self.scroll.viewport().height() // 2
+        center_min = self.timeline.start_min + center_y * self.timeline.slot_minutes // max(1, self.timeline.slot_height)
+        change()
+        # 新しい高さがレイアウトに反映されてからスクロール位置を戻す
+        self.timeline.adjustSize()
+        bar.setValue(self.timeline._y_for_minutes(center_min) - self.scroll.viewport().height() // 2)
+        self.multi_day_view.set_scale(self.timeline.slot_minutes, self.timeline.slot_height)
+
+    def _on_granularity_changed(self, index: int):
+        minutes = self.granularity_combo.itemData(index)
+        if minutes:
+            self._apply_timeline_view(lambda: self.timeline.set_granularity(minutes))
+
+    def _on_zoom_changed(self, index: int):
+        zoom = self.zoom_combo.itemData(index)
+        if zoom:
+            self._apply_timeline_view(lambda: self.timeline.set_zoom(zoom))
+
+    def _on_timeline_zoomed(self, zoom: float):
+        # Ctrl + ホイールで変わった倍率をコンボボックスに反映する
+        self.zoom_combo.blockSignals(True)
+        self.zoom_combo.setCurrentIndex(ZOOM_LEVELS.index(zoom))
+        self.zoom_combo.blockSignals(False)
+        self.multi_day_view.set_scale(self.timeline.slot_minutes, self.timeline.slot_height)
+
+    # ---------- 日 / 週 / 月表示 ----------
+    def _on_view_mode_changed(self, index: int):
+        if index == 0:
+            self.view_stack.setCurrentWidget(self.scroll)
+        else:
+            if self.view_stack.currentWidget() is self.scroll:
+                # 日表示から切り替えたときは開いている日を含む期間を見せる
+                self.view_date = self.current_date
+            self._refresh_multi_day_view()
+            # 日のタイムラインと同じ時間帯を見せる
+            self.multi_day_view.verticalScrollBar().setValue(self.scroll.verticalScrollBar().value())
+            self.view_stack.setCurrentWidget(self.multi_day_view)
+        self._update_date_label()
+
+    def _refresh_multi_day_view(self):
+        # 週・月表示は日記ファイルを読むので、開いている日の編集を先に反映する（DayCache も更新される）
+        self.checkpoint()
+        first, days = (week_range if self.view_mode_combo.currentIndex() == 1 else month_range)(self.view_date)
+        self.multi_day_view.set_range(first, days)
+
+    def _step_view(self, direction: int):
+        """前後の日 / 週 / 月へ移動する"""
+        mode = self.view_mode_combo.currentIndex()
+        if mode == 0:
+            self._open_day(self.current_date + datetime.timedelta(days=direction))
+            return
+        if mode == 1:
+            self.view_date += datetime.timedelta(days=7 * direction)
+        else:
+            first = self.view_date.replace(day=1)
+            if direction > 0:
+                self.view_date = (first + datetime.timedelta(days=32)).replace(day=1)
+            else:
+                self.view_date = (first - datetime.timedelta(days=1)).replace(day=1)
+        self._refresh_multi_day_view()
+        self._update_date_label()
+
+    def _open_day(self, date: datetime.date):
+        """その日の日記を日表示で開く（開いていた日の編集は日記ファイルへ反映してから切り替える）"""
+        self.checkpoint()
+        self.journal.close()
+        self.current_date = date
+        self.view_date = date
+        self.journal = EditJournal(date)
+        self.timeline.events = []
+        self.timeline.select_event(None)
+        self.on_timeline_selection_changed(None)
+        self._load_diary(silent=True)
+        if self.view_mode_combo.currentIndex() != 0:
+            self.view_mode_combo.setCurrentIndex(0)
+        else:
+            self._update_date_label()
+
+    def _update_date_label(self):
+        mode = self.view_mode_combo.currentIndex()
+        if mode == 0:
+            text = f"{self.current_date:%Y/%m/%d}"
+        elif mode == 1:
+            first, _ = week_range(self.view_date)
+            text = f"{first:%Y/%m/%d} 〜 {first + datetime.timedelta(days=6):%m/%d}"
+        else:
+            text = f"{self.view_date:%Y年%m月}"
+        self.date_label.setText(text)
+
     # ---------- detail panel handlers ----------
     def _minutes_to_qtime(self, minutes: int) -> QTime:
         h = (minutes // 60) % 24
@@ -630,8 +1031,12 @@ class DiaryTab(QWidget):
     def _qtime_to_minutes(self, qtime: QTime) -> int:
         return qtime.hour() * 60 + qtime.minute()
 
-    def on_timeline_selection_changed(self, index: int | None):
-        if index is None:
+    def on_timeline_selection_changed(self, event_id: int | None):
+        # 前のイベントへの入力を反映してから表示を切り替える（振り返り欄の文章はまだ前のイベントのもの）
+        self._edits.flush()
+        if event_id is None:
+            self._detail_event_id = None
+            self._detail_reflection = ""
             self.title_edit.setText("")
             self.start_time_edit.setTime(QTime(6, 0))
             self.end_time_edit.setTime(QTime(7, 0))
@@ -644,7 +1049,7 @@ class DiaryTab(QWidget):
             self.reflection_edit.setEnabled(False)
             self.delete_button.setEnabled(False)
             return
-        ev = self.timeline.get_event(index)
+        ev = self.timeline.get_event(event_id)
         if ev is None:
             return
         self.title_edit.setEnabled(True)
@@ -653,17 +1058,25 @@ class DiaryTab(QWidget):
         self.location_edit.setEnabled(True)
         self.reflection_edit.setEnabled(True)
         self.delete_button.setEnabled(True)
-        self.title_edit.setText(ev.get("title", ""))
+        same_event = event_id == self._detail_event_id
+        self._detail_event_id = event_id
+        if self.title_edit.text() != ev.get("title", ""):
+            self.title_edit.setText(ev.get("title", ""))
         self.start_time_edit.blockSignals(True)
         self.start_time_edit.setTime(self._minutes_to_qtime(ev.get("start", self.timeline.start_min)))
         self.start_time_edit.blockSignals(False)
         self.end_time_edit.blockSignals(True)
         self.end_time_edit.setTime(self._minutes_to_qtime(ev.get("end", self.timeline.start_min + self.timeline.slot_minutes)))
         self.end_time_edit.blockSignals(False)
-        self.location_edit.setText(ev.get("location", ""))
-        self.reflection_edit.blockSignals(True)
-        self.reflection_edit.setPlainText(ev.get("reflection", ""))
-        self.reflection_edit.blockSignals(False)
+        if self.location_edit.text() != ev.get("location", ""):
+            self.location_edit.setText(ev.get("location", ""))
+        # ドラッグ中は同じイベントの通知が続くので、振り返りは変わったときだけ入れ直す（長文の再レイアウトを避ける）
+        reflection = ev.get("reflection", "")
+        if not same_event or reflection != self._detail_reflection:
+            self.reflection_edit.blockSignals(True)
+            self.reflection_edit.setPlainText(reflection)
+            self.reflection_edit.blockSignals(False)
+            self._detail_reflection = reflection
 
     def _snap_to_slot(self, minutes: int) -> int:
         slot = self.timeline.slot_minutes
@@ -673,64 +1086,69 @@ class DiaryTab(QWidget):
         return max(min_m, min(max_m, snapped))
 
     def _on_title_changed(self):
-        idx = self.timeline.selected_index
-        if idx is None:
+        event_id = self.timeline.selected_id
+        if event_id is None:
             return
-        text = self.title_edit.text()
-        self.timeline.update_event(idx, notify=False, title=text)
+        self._edits.stage(event_id, title=self.title_edit.text())
 
     def _on_start_time_changed(self, qtime: QTime):
-        idx = self.timeline.selected_index
-        if idx is None:
+        event_id = self.timeline.selected_id
+        if event_id is None:
             return
         minutes = self._qtime_to_minutes(qtime)
         minutes = self._snap_to_slot(minutes)
-        ev = self.timeline.get_event(idx)
+        ev = self.timeline.get_event(event_id)
         if ev is None:
             return
+        # まだ反映していない変更も踏まえて終了時刻を決める
+        ev = {**ev, **self._edits.pending(event_id)}
         end = ev.get("end", minutes + self.timeline.slot_minutes)
         if minutes >= end:
             end = minutes + self.timeline.slot_minutes
         max_end = self.timeline.start_min + self.timeline.total_minutes
         if end > max_end:
             end = max_end
-        self.timeline.update_event(idx, notify=False, start=minutes, end=end)
+        self._edits.stage(event_id, start=minutes, end=end)
 
     def _on_end_time_changed(self, qtime: QTime):
-        idx = self.timeline.selected_index
-        if idx is None:
+        event_id = self.timeline.selected_id
+        if event_id is None:
             return
         minutes = self._qtime_to_minutes(qtime)
         minutes = self._snap_to_slot(minutes)
-        ev = self.timeline.get_event(idx)
+        ev = self.timeline.get_event(event_id)
         if ev is None:
             return
+        ev = {**ev, **self._edits.pending(event_id)}
         start = ev.get("start", minutes - self.timeline.slot_minutes)
         if minutes <= start:
             start = minutes - self.timeline.slot_minutes
         min_start = self.timeline.start_min
         if start < min_start:
             start = min_start
-        self.timeline.update_event(idx, notify=False, start=start, end=minutes)
+        self._edits.stage(event_id, start=start, end=minutes)
 
     def _on_location_changed(self):
-        idx = self.timeline.selected_index
-        if idx is None:
+        event_id = self.timeline.selected_id
+        if event_id is None:
             return
-        self.timeline.update_event(idx, notify=False, location=self.location_edit.text())
+        self._edits.stage(event_id, location=self.location_edit.text())
 
     def _on_reflection_changed(self):
-        idx = self.timeline.selected_index
-        if idx is None:
+        event_id = self.timeline.selected_id
+        if event_id is None:
             return
-        self.timeline.update_event(idx, notify=False, reflection=self.reflection_edit.toPlainText())
+        # 文章の取り出しは入力が止まってから 1 回だけ行う
+        self._edits.stage(event_id, idle=True, reflection=self._current_reflection)
+
+    def _current_reflection(self) -> str:
+        self._detail_reflection = self.reflection_edit.toPlainText()
+        return self._detail_reflection
 
     def _on_delete_event(self):
-        idx = self.timeline.selected_index
-        if idx is None:
+        event_id = self.timeline.selected_id
+        if event_id is None:
             return
-        try:
-            self.timeline.events.pop(idx)
-        except Exception:
-            pass
+        self._edits.discard(event_id)
+        self.timeline.remove_event(event_id)
         self.timeline.select_event(None)
@@ -0,0 +1,114 @@
+"""キャプチャ画像からドラフト（バン・ピック）のどの枠に誰がいるかを推定する。
+
+OCR（pytesseract.image_to_data）の行ごとの位置と信頼度を使い、チャンピオン選択画面の
+レイアウトに基づいて枠を割り当てる。Qt には依存しない。
+"""
+
+# 検出を採用する最低信頼度（0〜1）
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+
+# チャンピオン選択画面のレイアウト（キャプチャ矩形に対する 0〜1 の正規化座標）
+# 上端の帯にバン、左列に味方ピック、右列に敵ピックが並ぶ
+BAN_BAND_BOTTOM = 0.12
+PICK_BAND_TOP = 0.12
+PICK_BAND_BOTTOM = 0.75
+ALLY_COLUMN_RIGHT = 0.25
+ENEMY_COLUMN_LEFT = 0.75
+PICKS_PER_TEAM = 5
+BANS_PER_TEAM = 5
+
+
+class Detection:
+    """OCR で見つかったチャンピオン名 1 件（座標はキャプチャ矩形内の正規化中心座標）"""
+
+    __slots__ = ("name", "confidence", "x", "y")
+
+    def __init__(self, name: str, confidence: float, x: float, y: float):
+        self.name = name
+        self.confidence = confidence
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"Detection({self.name!r}, {self.confidence:.2f}, x={self.x:.2f}, y={self.y:.2f})"
+
+
+def slot_for_position(x: float, y: float) -> tuple[str, int] | None:
+    """正規化座標から枠 ("ban" | "ally" | "enemy", 番号) を求める。枠外なら None"""
+    if y < BAN_BAND_BOTTOM:
+        # 左半分が味方バン（0〜4）、右半分が敵バン（5〜9）
+        if x < 0.5:
+            return ("ban", min(BANS_PER_TEAM - 1, int(x / 0.5 * BANS_PER_TEAM)))
+        return ("ban", BANS_PER_TEAM + min(BANS_PER_TEAM - 1, int((x - 0.5) / 0.5 * BANS_PER_TEAM)))
+    if PICK_BAND_TOP <= y < PICK_BAND_BOTTOM:
+        row = min(PICKS_PER_TEAM - 1, int((y - PICK_BAND_TOP) / (PICK_BAND_BOTTOM - PICK_BAND_TOP) * PICKS_PER_TEAM))
+        if x < ALLY_COLUMN_RIGHT:
+            return ("ally", row)
+        if x >= ENEMY_COLUMN_LEFT:
+            return ("enemy", row)
+    return None
+
+
+def assign_slots(detections: list[Detection],
+                 threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> dict[tuple[str, int], str]:
+    """信頼度が閾値以上の検出を枠に割り当てる。同じ枠・同じチャンピオンは信頼度の高い方を採る"""
+    best_by_slot = {}
+    for det in sorted(detections, key=lambda d: d.confidence, reverse=True):
+        if det.confidence < threshold:
+            break
+        slot = slot_for_position(det.x, det.y)
+        if slot is None or slot in best_by_slot:
+            continue
+        if any(name == det.name for name in best_by_slot.values()):
+            continue
+        best_by_slot[slot] = det.name
+    return best_by_slot
+
+
+def ocr_lines(image) -> list[tuple[str, float, float, float]]:
+    """pytesseract で行単位の (テキスト, 信頼度 0〜1, 中心 x, 中心 y) を返す（座標は正規化済み）。
+    pytesseract が無い場合は ImportError を送出する。"""
+    import pytesseract
+
+    try:
+        data = pytesseract.image_to_data(image, lang="jpn", output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractError:
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+
+    width, height = image.size
+    lines = {}
+    for i, text in enumerate(data["text"]):
+        text = (text or "").strip()
+        conf = float(data["conf"][i])
+        if not text or conf < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        left, top = data["left"][i], data["top"][i]
+        right, bottom = left + data["width"][i], top + data["height"][i]
+        line = lines.get(key)
+        if line is None:
+            lines[key] = [[text], [conf], left, top, right, bottom]
+        else:
+            line[0].append(text)
+            line[1].append(conf)
+            line[2] = min(line[2], left)
+            line[3] = min(line[3], top)
+            line[4] = max(line[4], right)
+            line[5] = max(line[5], bottom)
+
+    result = []
+    for texts, confs, left, top, right, bottom in lines.values():
+        cx = (left + right) / 2 / max(1, width)
+        cy = (top + bottom) / 2 / max(1, height)
+        result.append(("".join(texts), sum(confs) / len(confs) / 100.0, cx, cy))
+    return result
+
+
+def detect_champions(lines, match_names) -> list[Detection]:
+    """OCR 行ごとに match_names(text) -> [(名前, 一致度 0〜1)] を適用して検出一覧を作る。
+    検出の信頼度は OCR の信頼度 × 名前の一致度（誤認識を補正した一致ほど低くなる）"""
+    detections = []
+    for text, conf, cx, cy in lines:
+        for name, match_conf in match_names(text):
+            detections.append(Detection(name, conf * match_conf, cx, cy))
+    return detections
@@ -0,0 +1,170 @@
+"""ピック提案の履歴（SQLite）。
+
+提案を出すたびにドラフト状態（バン・ピック・ロール）、ローカル候補、AI の提案文、所要時間を 1 件追記する。
+チャンピオンごとの出現は draft_champions に 1 行ずつ持ち、チャンピオン・日時の索引で
+「Y が敵にいるとき X が何回提案されたか」のような集計を SQL だけで行う（全件をメモリに読まない）。
+Qt には依存しない。
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+# 日記の保存先（diary_store.DIARIES_DIR）と同じく、起動時のカレントディレクトリによらず src の隣に置く
+HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "draft_history.sqlite3")
+
+# draft_champions.side の値
+SIDE_BAN = "ban"
+SIDE_ALLY = "ally"
+SIDE_ENEMY = "enemy"
+SIDE_SUGGESTED = "suggested"  # AI の提案文に出てきたチャンピオン
+SIDE_LOCAL = "local"  # ローカル集計の上位候補
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    role TEXT NOT NULL,
+    bans TEXT NOT NULL,
+    allies TEXT NOT NULL,
+    enemies TEXT NOT NULL,
+    local_candidates TEXT NOT NULL,
+    suggestion TEXT NOT NULL,
+    prefetched INTEGER NOT NULL DEFAULT 0,
+    wait_ms REAL,
+    api_ms REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cost_usd REAL
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_created_at ON drafts(created_at);
+CREATE TABLE IF NOT EXISTS draft_champions (
+    draft_id INTEGER NOT NULL REFERENCES drafts(id) ON DELETE CASCADE,
+    side TEXT NOT NULL,
+    champion TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_draft_champions_champion ON draft_champions(champion, side, draft_id);
+CREATE INDEX IF NOT EXISTS idx_draft_champions_draft ON draft_champions(draft_id);
+"""
+
+
+class DraftRecord:
+    """履歴 1 件（一覧表示・再現に使う）"""
+
+    __slots__ = ("id", "created_at", "role", "bans", "allies", "enemies",
+                 "local_candidates", "suggestion", "prefetched", "wait_ms")
+
+    def __init__(self, row):
+        (self.id, self.created_at, self.role, bans, allies, enemies,
+         local_candidates, self.suggestion, prefetched, self.wait_ms) = row
+        self.bans = json.loads(bans)
+        self.allies = json.loads(allies)
+        self.enemies = json.loads(enemies)
+        self.local_candidates = [tuple(c) for c in json.loads(local_candidates)]
+        self.prefetched = bool(prefetched)
+
+    def summary(self) -> str:
+        allies = ", ".join(self.allies.values()) or "-"
+        enemies = ", ".join(self.enemies) or "-"
+        return f"{self.created_at[:16].replace('T', ' ')}  [{self.role}]  味方: {allies} / 敵: {enemies}"
+
+
+_RECORD_COLUMNS = ("id, created_at, role, bans, allies, enemies, "
+                   "local_candidates, suggestion, prefetched, wait_ms")
+
+
+class DraftHistory:
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def add(self, role: str, bans: list[str], allies: dict[str, str], enemies: list[str],
+            local_candidates: list[tuple[str, float]], suggestion: str = "",
+            suggested: list[str] | None = None, prefetched: bool = False,
+            wait_ms: float | None = None, report: dict | None = None,
+            api_ms: float | None = None, created_at: str | None = None) -> int:
+        """1 件追記して ID を返す。suggested は AI の提案文に含まれたチャンピオン名（集計用）。
+        local_candidates は suggested とは別に SIDE_LOCAL として記録する"""
+        report = report or {}
+        created_at = created_at or datetime.now().isoformat(timespec="seconds")
+        with self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO drafts (created_at, role, bans, allies, enemies, local_candidates, suggestion,"
+                " prefetched, wait_ms, api_ms, prompt_tokens, completion_tokens, cost_usd)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    created_at, role,
+                    json.dumps(bans, ensure_ascii=False),
+                    json.dumps(allies, ensure_ascii=False),
+                    json.dumps(enemies, ensure_ascii=False),
+                    json.dumps([[n, round(float(s), 3)] for n, s in local_candidates], ensure_ascii=False),
+                    suggestion, int(prefetched), wait_ms, api_ms,
+                    report.get("prompt_tokens"), report.get("completion_tokens"), report.get("cost_usd"),
+                ),
+            )
+            draft_id = cur.lastrowid
+            rows = [(draft_id, SIDE_BAN, c) for c in bans]
+            rows += [(draft_id, SIDE_ALLY, c) for c in allies.values()]
+            rows += [(draft_id, SIDE_ENEMY, c) for c in enemies]
+            rows += [(draft_id, SIDE_SUGGESTED, c) for c in dict.fromkeys(suggested or [])]
+            rows += [(draft_id, SIDE_LOCAL, c) for c in dict.fromkeys(n for n, _s in local_candidates)]
+            self._conn.executemany("INSERT INTO draft_champions (draft_id, side, champion) VALUES (?, ?, ?)", rows)
+        return draft_id
+
+    def get(self, draft_id: int) -> DraftRecord | None:
+        row = self._conn.execute(f"SELECT {_RECORD_COLUMNS} FROM drafts WHERE id = ?", (draft_id,)).fetchone()
+        return DraftRecord(row) if row else None
+
+    def recent(self, limit: int = 200, champion: str | None = None,
+               since: str | None = None, until: str | None = None) -> list[DraftRecord]:
+        """新しい順に最大 limit 件。champion を指定するとその名前がどこかに含まれる履歴だけ。
+        since / until は ISO 形式の日時（文字列比較）"""
+        where, params = [], []
+        if champion:
+            where.append("id IN (SELECT draft_id FROM draft_champions WHERE champion = ?)")
+            params.append(champion)
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("created_at < ?")
+            params.append(until)
+        sql = f"SELECT {_RECORD_COLUMNS} FROM drafts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [DraftRecord(row) for row in self._conn.execute(sql, params)]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+    def count_suggested_against(self, suggested: str, enemy: str) -> tuple[int, int]:
+        """enemy が敵にいた履歴の件数と、そのうち suggested が AI に提案された件数を返す"""
+        total = self._conn.execute(
+            "SELECT COUNT(DISTINCT draft_id) FROM draft_champions WHERE champion = ? AND side = ?",
+            (enemy, SIDE_ENEMY),
+        ).fetchone()[0]
+        hits = self._conn.execute(
+            "SELECT COUNT(DISTINCT e.draft_id) FROM draft_champions e"
+            " JOIN draft_champions s ON s.draft_id = e.draft_id"
+            " WHERE e.champion = ? AND e.side = ? AND s.champion = ? AND s.side = ?",
+            (enemy, SIDE_ENEMY, suggested, SIDE_SUGGESTED),
+        ).fetchone()[0]
+        return hits, total
+
+    def top_suggested_against(self, enemy: str, limit: int = 10) -> list[tuple[str, int]]:
+        """enemy が敵にいたときに AI が提案したチャンピオンを回数の多い順に返す"""
+        return self._conn.execute(
+            "SELECT s.champion, COUNT(*) AS n FROM draft_champions e"
+            " JOIN draft_champions s ON s.draft_id = e.draft_id"
+            " WHERE e.champion = ? AND e.side = ? AND s.side = ?"
+            " GROUP BY s.champion ORDER BY n DESC, s.champion LIMIT ?",
+            (enemy, SIDE_ENEMY, SIDE_SUGGESTED, limit),
+        ).fetchall()
@@ -0,0 +1,119 @@
+"""ピック提案履歴の一覧ダイアログ。選んだ履歴をピック支援タブのコンボへ再現できる。"""
+from PySide6.QtWidgets import (
+    QDialog, QLabel, QLineEdit, QListWidget, QListWidgetItem, QPushButton, QTextEdit,
+    QHBoxLayout, QVBoxLayout,
+)
+from PySide6.QtCore import Qt
+
+from draft_history import DraftHistory, DraftRecord
+
+# 一覧に表示する最大件数（古い履歴はチャンピオンで絞り込んで探す）
+LIST_LIMIT = 200
+
+
+class DraftHistoryDialog(QDialog):
+    def __init__(self, history: DraftHistory, canonical_name=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("ピック提案の履歴")
+        self.resize(760, 520)
+        self.history = history
+        self.canonical_name = canonical_name or (lambda s: s.strip())
+        # 再現ボタンで呼ばれる: replay_callback(DraftRecord)
+        self.replay_callback = None
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("チャンピオンで絞り込み（空欄で全件）")
+        self.filter_edit.returnPressed.connect(self.reload)
+        self.list_widget = QListWidget()
+        self.list_widget.currentItemChanged.connect(self._on_current_changed)
+        self.list_widget.itemDoubleClicked.connect(lambda _item: self._on_replay())
+        self.detail_box = QTextEdit()
+        self.detail_box.setReadOnly(True)
+        self.replay_button = QPushButton("コンボに再現")
+        self.replay_button.clicked.connect(self._on_replay)
+
+        # 「Y が敵のとき X が提案された回数」の集計
+        self.suggested_edit = QLineEdit()
+        self.suggested_edit.setPlaceholderText("提案されたチャンピオン")
+        self.enemy_edit = QLineEdit()
+        self.enemy_edit.setPlaceholderText("敵チャンピオン")
+        count_button = QPushButton("集計")
+        count_button.clicked.connect(self._on_count)
+        self.count_label = QLabel("")
+
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(self.filter_edit)
+        search_button = QPushButton("検索")
+        search_button.clicked.connect(self.reload)
+        filter_row.addWidget(search_button)
+
+        body = QHBoxLayout()
+        body.addWidget(self.list_widget, 3)
+        body.addWidget(self.detail_box, 2)
+
+        count_row = QHBoxLayout()
+        count_row.addWidget(self.suggested_edit)
+        count_row.addWidget(QLabel("を、敵に"))
+        count_row.addWidget(self.enemy_edit)
+        count_row.addWidget(QLabel("がいるとき"))
+        count_row.addWidget(count_button)
+        count_row.addWidget(self.count_label, 1)
+
+        layout = QVBoxLayout()
+        layout.addLayout(filter_row)
+        layout.addLayout(body)
+        layout.addLayout(count_row)
+        layout.addWidget(self.replay_button, alignment=Qt.AlignRight)
+        self.setLayout(layout)
+
+        self.reload()
+
+    def reload(self):
+        champion = self.canonical_name(self.filter_edit.text()) or None
+        self.list_widget.clear()
+        self.detail_box.clear()
+        for record in self.history.recent(LIST_LIMIT, champion=champion):
+            item = QListWidgetItem(record.summary())
+            item.setData(Qt.UserRole, record)
+            self.list_widget.addItem(item)
+        self.replay_button.setEnabled(self.list_widget.count() > 0)
+
+    def _current_record(self) -> DraftRecord | None:
+        item = self.list_widget.currentItem()
+        return item.data(Qt.UserRole) if item is not None else None
+
+    def _on_current_changed(self, _current, _previous):
+        record = self._current_record()
+        if record is None:
+            self.detail_box.clear()
+            return
+        lines = [
+            f"日時: {record.created_at.replace('T', ' ')}",
+            f"ロール: {record.role}",
+            "バン: " + (", ".join(record.bans) or "-"),
+            "味方: " + (", ".join(f"{r}={c}" for r, c in record.allies.items()) or "-"),
+            "敵: " + (", ".join(record.enemies) or "-"),
+            "ローカル候補: " + (", ".join(f"{n}（{s:.1f}）" for n, s in record.local_candidates) or "-"),
+        ]
+        if record.wait_ms is not None:
+            lines.append(f"表示までの時間: {record.wait_ms:.0f} ms" + ("（先読み済み）" if record.prefetched else ""))
+        if record.suggestion:
+            lines += ["", record.suggestion]
+        self.detail_box.setPlainText("\n".join(lines))
+
+    def _on_replay(self):
+        record = self._current_record()
+        if record is not None and self.replay_callback is not None:
+            self.replay_callback(record)
+
+    def _on_count(self):
+        suggested = self.canonical_name(self.suggested_edit.text())
+        enemy = self.canonical_name(self.enemy_edit.text())
+        if not suggested or not enemy:
+            self.count_label.setText("両方入力してください")
+            return
+        hits, total = self.history.count_suggested_against(suggested, enemy)
+        if total == 0:
+            self.count_label.setText(f"{enemy} が敵にいた履歴はありません")
+        else:
+            self.count_label.setText(f"{total} 件中 {hits} 件（{hits / total:.0%}）")
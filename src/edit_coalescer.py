@@ -0,0 +1,85 @@
+"""詳細パネルの編集をまとめてタイムライン（EventStore）へ反映する。
+
+キー入力やスピンのたびに反映すると、そのたびに再描画とジャーナルへの追記が走る。
+stage で溜めた変更は次のフレーム（FRAME_MS 後）にまとめて 1 回だけ反映し、
+振り返りのような長い文章は入力が止まってから（IDLE_MS 後）反映する。
+値には関数も渡せ、反映するときに呼んで値を得る（QTextEdit.toPlainText をキー入力ごとに呼ばないため）。
+"""
+from PySide6.QtCore import QObject, QTimer
+
+# 1 フレーム（約 60fps）
+FRAME_MS = 16
+# 入力が止まったとみなすまでの時間
+IDLE_MS = 400
+
+
+class EditCoalescer(QObject):
+    def __init__(self, apply, store=None, frame_ms: int = FRAME_MS, idle_ms: int = IDLE_MS, parent=None):
+        """apply(イベント ID, {項目: 値}) で反映する。store（EventStore）を渡すと 1 回の反映を 1 つの変更通知にまとめる"""
+        super().__init__(parent)
+        self.apply = apply
+        self.store = store
+        self._frame = {}  # ID → {項目: 値}（次のフレームで反映）
+        self._idle = {}  # ID → {項目: 値 または 関数}（入力が止まったら反映）
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(frame_ms)
+        self._frame_timer.timeout.connect(self.flush_frame)
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(idle_ms)
+        self._idle_timer.timeout.connect(self.flush)
+
+    def stage(self, event_id, idle: bool = False, **fields):
+        """変更を溜める。idle=True なら入力が止まるまで待つ（待っている間に来た入力で延長する）"""
+        if idle:
+            self._idle.setdefault(event_id, {}).update(fields)
+            self._idle_timer.start()
+        else:
+            self._frame.setdefault(event_id, {}).update(fields)
+            if not self._frame_timer.isActive():
+                self._frame_timer.start()
+
+    def pending(self, event_id) -> dict:
+        """まだ反映していない値（関数で渡したものは除く）"""
+        values = {k: v for k, v in self._idle.get(event_id, {}).items() if not callable(v)}
+        values.update(self._frame.get(event_id, {}))
+        return values
+
+    def flush_frame(self):
+        self._frame_timer.stop()
+        # 反映中の通知から flush が呼ばれても二重に反映しないよう、先に空にしておく
+        changes, self._frame = self._frame, {}
+        self._apply(changes)
+
+    def flush(self):
+        """溜まっている変更をすべて反映する（保存・選択の切り替え・終了の前に呼ぶ）"""
+        self._frame_timer.stop()
+        self._idle_timer.stop()
+        merged = {}
+        for source in (self._idle, self._frame):
+            for event_id, fields in source.items():
+                merged.setdefault(event_id, {}).update(fields)
+        self._idle, self._frame = {}, {}
+        self._apply(merged)
+
+    def discard(self, event_id=None):
+        """反映せずに捨てる（削除したイベントなど）。None なら全部"""
+        if event_id is None:
+            self._frame, self._idle = {}, {}
+        else:
+            self._frame.pop(event_id, None)
+            self._idle.pop(event_id, None)
+
+    def _apply(self, changes: dict):
+        if not changes:
+            return
+        if self.store is not None:
+            self.store.begin_batch()
+        try:
+            for event_id, fields in changes.items():
+                values = {k: v() if callable(v) else v for k, v in fields.items()}
+                self.apply(event_id, values)
+        finally:
+            if self.store is not None:
+                self.store.end_batch()
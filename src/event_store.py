@@ -0,0 +1,165 @@
+"""1 日分のイベントを保持する観測可能なストア。
+
+イベントには追加順の ID（整数）を振り、削除や並べ替えがあっても ID は変わらない。
+変更（追加・更新・削除）は ChangeSet として購読者に通知する。batch() の中の変更は 1 つの ChangeSet に
+まとめて最後に 1 回だけ通知する（追加してから更新したイベントは「追加」だけ、追加して削除したものは通知しない）。
+タイムライン・詳細パネル・ジャーナル・索引はそれぞれ ChangeSet から自分に関係する分だけを更新する。
+Qt には依存しない。
+"""
+from contextlib import contextmanager
+
+
+class ChangeSet:
+    def __init__(self, reset: bool = False):
+        self.reset = reset  # 全体を入れ替えた（個別の差分は無い）
+        self.inserted = []  # 追加された ID（追加順）
+        self.updated = {}  # ID → 変わった項目名の集合
+        self.removed = {}  # ID → 削除直前のイベント
+        self.previous = {}  # ID → 最初の更新前のイベント（再描画で元の位置を消すため）
+
+    def is_empty(self) -> bool:
+        return not (self.reset or self.inserted or self.updated or self.removed)
+
+    def affected_range(self, store: "EventStore") -> tuple[int, int] | None:
+        """変更で描き直しが必要な時間帯 (開始分, 終了分)。無ければ None"""
+        spans = []
+        for event_id in list(self.inserted) + list(self.updated):
+            ev = store.get(event_id)
+            if ev is not None:
+                spans.append((ev["start"], ev["end"]))
+        for ev in list(self.previous.values()) + list(self.removed.values()):
+            spans.append((ev["start"], ev["end"]))
+        if not spans:
+            return None
+        return min(s for s, _e in spans), max(e for _s, e in spans)
+
+    def __repr__(self):
+        return (f"ChangeSet(reset={self.reset}, inserted={self.inserted}, updated={self.updated}, "
+                f"removed={list(self.removed)})")
+
+
+class EventStore:
+    def __init__(self, events=()):
+        self._events = {}  # ID → イベント
+        self._order = []  # ID（保存時の並び）
+        self._next_id = 0
+        self._listeners = []
+        self._batch_depth = 0
+        self._pending = None
+        self.reset(events)
+
+    # ---------- 購読 ----------
+    def subscribe(self, listener):
+        """listener(ChangeSet) を登録する"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def batch(self):
+        """中の変更をまとめて 1 回だけ通知する（入れ子可）"""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    def begin_batch(self):
+        """with で囲めない場合（マウスのドラッグ中など）用。end_batch と対で呼ぶ"""
+        self._batch_depth += 1
+
+    def end_batch(self):
+        if self._batch_depth == 0:
+            return
+        self._batch_depth -= 1
+        self._flush_if_unbatched()
+
+    def _changes(self) -> ChangeSet:
+        if self._pending is None:
+            self._pending = ChangeSet()
+        return self._pending
+
+    def _flush_if_unbatched(self):
+        if self._batch_depth == 0 and self._pending is not None:
+            changes, self._pending = self._pending, None
+            self._emit(changes)
+
+    def _emit(self, changes: ChangeSet):
+        if changes.is_empty():
+            return
+        for listener in list(self._listeners):
+            listener(changes)
+
+    # ---------- 参照 ----------
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, event_id) -> bool:
+        return event_id in self._events
+
+    def get(self, event_id) -> dict | None:
+        return self._events.get(event_id)
+
+    def ids(self) -> list[int]:
+        return list(self._order)
+
+    def events(self) -> list[dict]:
+        """イベント一覧（保存用の並び）。要素はストア内のイベントそのものなので書き換えないこと"""
+        return [self._events[i] for i in self._order]
+
+    def items(self):
+        return [(i, self._events[i]) for i in self._order]
+
+    # ---------- 変更 ----------
+    def reset(self, events=(), ids=None):
+        """全体を入れ替える。ids を省略すると 0 から振り直す（保存ファイルの並び = ID 順）"""
+        events = [dict(ev) for ev in events]
+        ids = list(ids) if ids is not None else list(range(len(events)))
+        self._events = dict(zip(ids, events))
+        self._order = ids
+        self._next_id = max(ids, default=-1) + 1
+        self._pending = None
+        self._emit(ChangeSet(reset=True))
+
+    def insert(self, event: dict, event_id: int | None = None) -> int:
+        if event_id is None or event_id in self._events:
+            event_id = self._next_id
+        self._next_id = max(self._next_id, event_id + 1)
+        self._events[event_id] = dict(event)
+        self._order.append(event_id)
+        self._changes().inserted.append(event_id)
+        self._flush_if_unbatched()
+        return event_id
+
+    def update(self, event_id, **fields) -> dict:
+        """項目を更新し、実際に変わった項目を返す（変化が無ければ通知しない）"""
+        ev = self._events.get(event_id)
+        if ev is None:
+            return {}
+        changed = {k: v for k, v in fields.items() if ev.get(k) != v}
+        if not changed:
+            return {}
+        changes = self._changes()
+        if event_id not in changes.inserted:
+            changes.previous.setdefault(event_id, dict(ev))
+            changes.updated.setdefault(event_id, set()).update(changed)
+        ev.update(changed)
+        self._flush_if_unbatched()
+        return changed
+
+    def remove(self, event_id) -> dict | None:
+        ev = self._events.pop(event_id, None)
+        if ev is None:
+            return None
+        self._order.remove(event_id)
+        changes = self._changes()
+        if event_id in changes.inserted:
+            # 同じまとまりの中で追加したものは、追加ごと無かったことにする
+            changes.inserted.remove(event_id)
+        else:
+            changes.updated.pop(event_id, None)
+            changes.removed[event_id] = changes.previous.pop(event_id, ev)
+        self._flush_if_unbatched()
+        return ev
@@ -0,0 +1,89 @@
+"""キャプチャ画像（QImage）と NumPy 配列の相互変換、デバッグ用フレームの保存。
+
+PNG へのエンコード／デコードを経由せず、QImage のピクセルバッファをそのまま NumPy で参照する。
+"""
+import os
+import tempfile
+from collections import deque
+
+import numpy as np
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+# デバッグ用フレーム保存: 環境変数に保存枚数を指定すると有効になる（例: DIARYAPP_DEBUG_FRAMES=20）
+DEBUG_FRAMES_ENV = "DIARYAPP_DEBUG_FRAMES"
+DEBUG_FRAMES_DIR = os.path.join(tempfile.gettempdir(), "diaryapp_frames")
+# 保存フレームの合計サイズ上限（バイト）
+DEBUG_FRAMES_MAX_BYTES = 50 * 1024 * 1024
+
+
+def qimage_view(image: QImage) -> np.ndarray:
+    """QImage のピクセルバッファをコピーせずに (高さ, 幅, チャンネル) の配列として参照する。
+    返した配列は image が生きている間だけ有効なので、呼び出し側で image を保持すること。
+    32bit 形式はメモリ上 BGRA（リトルエンディアン）、Grayscale8 は 1 チャンネル。"""
+    if image.format() == QImage.Format_Grayscale8:
+        channels = 1
+    elif image.format() in (QImage.Format_RGB32, QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied):
+        channels = 4
+    else:
+        raise ValueError(f"未対応の画像形式です: {image.format()}")
+    h, w, stride = image.height(), image.width(), image.bytesPerLine()
+    buf = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+    # 行末のパディングを除いた領域をビューで切り出す
+    arr = buf.reshape(h, stride)[:, : w * channels].reshape(h, w, channels)
+    return arr[:, :, 0] if channels == 1 else arr
+
+
+def capture_to_rgb(image: QImage) -> np.ndarray:
+    """32bit の QImage から OCR 用の連続した RGB 配列（1 回だけコピー）を作る"""
+    if image.format() not in (QImage.Format_RGB32, QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied):
+        image = image.convertToFormat(QImage.Format_RGB32)
+    bgra = qimage_view(image)
+    return np.ascontiguousarray(bgra[:, :, 2::-1])
+
+
+def grayscale_thumbnail(image: QImage, width: int, height: int) -> np.ndarray:
+    """変化検出用の縮小グレースケール配列を返す（縮小は Qt 側で行い、変換後のみコピーする）"""
+    small = image.scaled(width, height, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+    gray = small.convertToFormat(QImage.Format_Grayscale8)
+    return qimage_view(gray).copy()
+
+
+class DebugFrameRing:
+    """デバッグ用にキャプチャを一時ディレクトリへ保存する。枚数と合計サイズの上限を超えたら古い順に削除する"""
+
+    def __init__(self, max_frames: int, directory: str = DEBUG_FRAMES_DIR,
+                 max_bytes: int = DEBUG_FRAMES_MAX_BYTES):
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._frames = deque()  # (パス, サイズ)
+        self._total_bytes = 0
+        self._seq = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "DebugFrameRing | None":
+        """環境変数で有効化されていればインスタンスを返す"""
+        try:
+            max_frames = int(os.environ.get(DEBUG_FRAMES_ENV, "0"))
+        except ValueError:
+            max_frames = 0
+        return cls(max_frames) if max_frames > 0 else None
+
+    def save(self, image: QImage) -> str | None:
+        self._seq += 1
+        path = os.path.join(self.directory, f"frame_{os.getpid()}_{self._seq:06d}.png")
+        if not image.save(path, "PNG"):
+            return None
+        size = os.path.getsize(path)
+        self._frames.append((path, size))
+        self._total_bytes += size
+        while self._frames and (len(self._frames) > self.max_frames or self._total_bytes > self.max_bytes):
+            old_path, old_size = self._frames.popleft()
+            self._total_bytes -= old_size
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        return path
@@ -0,0 +1,76 @@
+"""チャンピオンアイコンのスプライトアトラス。
+
+utils/build_icon_atlas.py が champion_icons/ の PNG を 1 枚の画像（champion_icons_atlas.png）と
+位置の索引（champion_icons_atlas.json）にまとめる。アプリは最初に必要になったときにアトラスを 1 回だけ
+デコードし、要求されたアイコンを切り出して縮小した QPixmap を小さな LRU に保持する。
+
+champion_icons_atlas.json の形式:
+    {"cell": 48, "icons": {"Ahri": [x, y], ...}}   # キーは Data Dragon の英語 ID
+"""
+import json
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QImage, QPixmap
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ATLAS_PNG = os.path.join(ROOT_DIR, "champion_icons_atlas.png")
+ATLAS_JSON = os.path.join(ROOT_DIR, "champion_icons_atlas.json")
+
+# 縮小済み QPixmap の保持数（コンボ・補完で表示される分を賄える程度）
+PIXMAP_CACHE_SIZE = 256
+
+
+class IconAtlas:
+    """アトラス画像からアイコンを切り出す"""
+
+    def __init__(self, png_path: str, cell: int, offsets: dict[str, tuple[int, int]],
+                 cache_size: int = PIXMAP_CACHE_SIZE):
+        self.png_path = png_path
+        self.cell = cell
+        self.offsets = offsets
+        self.cache_size = cache_size
+        self._image = None  # 最初の要求時にデコードする
+        self._cache = OrderedDict()  # (ID, サイズ) → QPixmap
+
+    @classmethod
+    def load(cls, png_path: str = ATLAS_PNG, json_path: str = ATLAS_JSON) -> "IconAtlas | None":
+        """索引を読み込む（画像はまだ読まない）。アトラスが無い場合は None"""
+        if not os.path.exists(png_path):
+            return None
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            offsets = {key: (int(x), int(y)) for key, (x, y) in data["icons"].items()}
+            return cls(png_path, int(data["cell"]), offsets)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def __contains__(self, champ_id: str) -> bool:
+        return champ_id in self.offsets
+
+    def pixmap(self, champ_id: str, size: int) -> QPixmap | None:
+        """size×size に縮小したアイコンを返す。アトラスに無い ID は None"""
+        offset = self.offsets.get(champ_id)
+        if offset is None:
+            return None
+        key = (champ_id, size)
+        pm = self._cache.get(key)
+        if pm is not None:
+            self._cache.move_to_end(key)
+            return pm
+
+        if self._image is None:
+            self._image = QImage(self.png_path)
+        if self._image.isNull():
+            return None
+        x, y = offset
+        tile = self._image.copy(QRect(x, y, self.cell, self.cell))
+        if size != self.cell:
+            tile = tile.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pm = QPixmap.fromImage(tile)
+        self._cache[key] = pm
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return pm
@@ -0,0 +1,220 @@
+"""カレンダー（iCalendar / .ics）から日記のタイムラインへイベントを取り込む。
+
+ファイルは 1 行ずつ読み、VEVENT を 1 件ずつ生成する（全体をメモリに読まない）。各イベントは
+日記の 1 日（06:00 〜 翌日 06:00）に割り当て、15 分単位に丸める。日をまたぐイベントは日ごとに分割する。
+書き込みは一定件数ごとにまとめて行い、既存の日記には重複を除いて追加する（同じファイルを再度取り込んでも増えない）。
+Qt には依存しない。
+
+未対応: 終日イベント（DATE のみ）はタイムラインに載せないため読み飛ばす。RRULE（繰り返し）は展開しない。
+"""
+import datetime
+
+from diary_store import (
+    DAY_START_MIN, DAY_TOTAL_MINUTES, DIARIES_DIR, SLOT_MINUTES, normalize_events, read_day, write_days,
+)
+
+# まとめて書き込むイベント数（メモリに保持する上限）。
+# カレンダーの書き出しは日付順とは限らないため、日数ではなくイベント数で区切り、同じ日を何度も書き直さないようにする
+DEFAULT_BATCH_EVENTS = 20000
+
+
+def unfold_lines(lines):
+    """RFC 5545 の折り返し（次の行が空白で始まる）を戻した論理行を順に返す"""
+    current = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _split_property(line: str) -> tuple[str, dict, str]:
+    """'NAME;PARAM=V:value' → (NAME, {PARAM: V}, value)"""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    param_dict = {}
+    for p in params:
+        key, _, val = p.partition("=")
+        param_dict[key.upper()] = val.strip('"')
+    return name.upper(), param_dict, value
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            out.append("\n" if nxt in "nN" else nxt)
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def iter_vevents(lines):
+    """VEVENT ごとに {プロパティ名: (パラメータ, 値)} を返す"""
+    event = None
+    for line in unfold_lines(lines):
+        if not line:
+            continue
+        name, params, value = _split_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT":
+            if event is not None:
+                yield event
+            event = None
+        elif event is not None and name not in event:
+            event[name] = (params, value)
+
+
+def parse_ics_datetime(value: str, params: dict) -> datetime.datetime | None:
+    """ローカル時刻の naive datetime を返す。日付のみ（終日）や解釈できない値は None"""
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or "T" not in value:
+        return None
+    utc = value.endswith("Z")
+    # strptime は遅いので固定桁を直接読む（YYYYMMDDTHHMMSS）
+    v = value.rstrip("Z")
+    try:
+        dt = datetime.datetime(int(v[0:4]), int(v[4:6]), int(v[6:8]), int(v[9:11]), int(v[11:13]), int(v[13:15] or 0))
+    except ValueError:
+        return None
+    if utc:
+        return dt.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            from zoneinfo import ZoneInfo
+
+            return dt.replace(tzinfo=ZoneInfo(tzid)).astimezone().replace(tzinfo=None)
+        except Exception:
+            pass
+    # タイムゾーン指定なし（floating）はローカル時刻として扱う
+    return dt
+
+
+def diary_day_of(dt: datetime.datetime) -> datetime.date:
+    """その時刻が属する日記の日付（06:00 より前は前日）"""
+    return (dt - datetime.timedelta(minutes=DAY_START_MIN)).date()
+
+
+def split_into_days(start: datetime.datetime, end: datetime.datetime):
+    """(日付, 開始分, 終了分) を日ごとに返す。分は日付の 0:00 からの経過分で 15 分単位に丸める"""
+    if end <= start:
+        end = start + datetime.timedelta(minutes=SLOT_MINUTES)
+    day = diary_day_of(start)
+    while True:
+        midnight = datetime.datetime.combine(day, datetime.time())
+        day_end = midnight + datetime.timedelta(minutes=DAY_START_MIN + DAY_TOTAL_MINUTES)
+        seg_start = max(start, midnight + datetime.timedelta(minutes=DAY_START_MIN))
+        seg_end = min(end, day_end)
+        s = int((seg_start - midnight).total_seconds() // 60)
+        e = int(-(-(seg_end - midnight).total_seconds() // 60))
+        s -= s % SLOT_MINUTES  # 開始は切り下げ
+        e += -e % SLOT_MINUTES  # 終了は切り上げ
+        if e > s:
+            yield day, s, min(e, DAY_START_MIN + DAY_TOTAL_MINUTES)
+        if end <= day_end:
+            break
+        day += datetime.timedelta(days=1)
+
+
+def iter_day_events(lines, since: datetime.date | None = None, until: datetime.date | None = None):
+    """ICS の行から (日付, イベント) を順に返す"""
+    for props in iter_vevents(lines):
+        if "DTSTART" not in props:
+            continue
+        start = parse_ics_datetime(props["DTSTART"][1], props["DTSTART"][0])
+        if start is None:
+            continue
+        end = None
+        if "DTEND" in props:
+            end = parse_ics_datetime(props["DTEND"][1], props["DTEND"][0])
+        if end is None:
+            end = start + datetime.timedelta(minutes=SLOT_MINUTES)
+        title = _unescape(props.get("SUMMARY", ({}, ""))[1])
+        location = _unescape(props.get("LOCATION", ({}, ""))[1])
+        description = _unescape(props.get("DESCRIPTION", ({}, ""))[1])
+        for day, s, e in split_into_days(start, end):
+            if (since and day < since) or (until and day > until):
+                continue
+            yield day, {"start": s, "end": e, "title": title, "location": location, "reflection": description}
+
+
+def _event_key(ev: dict) -> tuple:
+    return (ev["start"], ev["end"], ev.get("title", ""), ev.get("location", ""))
+
+
+class ImportResult:
+    def __init__(self):
+        self.events = 0  # 新しく追加したイベント数
+        self.duplicates = 0  # 既にあったため追加しなかった数
+        self.days = set()
+        self.skipped_days = set()  # 既存ファイルが JSON 形式の日記でないため取り込まなかった日
+        self.skipped_events = 0  # そのため追加しなかったイベント数
+
+    def __repr__(self):
+        return (f"ImportResult(events={self.events}, duplicates={self.duplicates}, days={len(self.days)}, "
+                f"skipped_days={len(self.skipped_days)})")
+
+
+def import_ics(path: str, diaries_dir: str = DIARIES_DIR, since: datetime.date | None = None,
+               until: datetime.date | None = None, batch_events: int = DEFAULT_BATCH_EVENTS,
+               dry_run: bool = False, progress=None) -> ImportResult:
+    """ICS ファイルを取り込む。batch_events 件たまるごとに既存の日記と統合してまとめて書き込む。
+    progress(これまでに書き込んだ日数) を渡すと書き込みのたびに通知する"""
+    result = ImportResult()
+    pending = {}  # 日付 → 追加するイベント
+    buffered = 0
+
+    def flush():
+        nonlocal buffered
+        merged = {}
+        for day, new_events in pending.items():
+            try:
+                existing = read_day(day, diaries_dir) or []
+            except ValueError:
+                # JSON でない既存ファイルは上書きしない（取り込まなかった日として結果に残す）
+                result.skipped_days.add(day)
+                result.skipped_events += len(new_events)
+                continue
+            seen = {_event_key(ev) for ev in existing}
+            added = []
+            for ev in new_events:
+                key = _event_key(ev)
+                if key in seen:
+                    result.duplicates += 1
+                    continue
+                seen.add(key)
+                added.append(ev)
+            if added:
+                merged[day] = normalize_events(sorted(existing + added, key=lambda ev: ev["start"]))
+                result.events += len(added)
+                result.days.add(day)
+        if merged and not dry_run:
+            write_days(merged, diaries_dir)
+        pending.clear()
+        buffered = 0
+        if progress is not None:
+            progress(len(result.days))
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for day, ev in iter_day_events(f, since, until):
+            pending.setdefault(day, []).append(ev)
+            buffered += 1
+            if buffered >= batch_events:
+                flush()
+    if pending:
+        flush()
+    return result
@@ -1,27 +1,51 @@
 import os
 import json
-import unicodedata
+import threading
+import time
 from PySide6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QTextEdit, QPushButton,
     QComboBox, QVBoxLayout, QHBoxLayout, QGridLayout, QMessageBox,
-    QCompleter, QGraphicsDropShadowEffect
+    QCompleter, QGraphicsDropShadowEffect, QCheckBox
 )
-from PySide6.QtCore import Qt, QStringListModel, QTimer, QByteArray, QBuffer, QRect
-from PySide6.QtGui import QFont, QColor, QPixmap, QGuiApplication, QPainter, QPen
-import tempfile
-import time
-from io import BytesIO
-from openai import OpenAI
-
-CHAMPION_JSON = os.path.join(os.path.dirname(__file__), "champion_names_ja.json")
+from PySide6.QtCore import Qt, QTimer, QRect, QSize, Signal
+from PySide6.QtGui import QFont, QColor, QPixmap, QPainter, QPen
+
+from ai_client import AIClient
+from capture_geometry import CaptureGeometry
+from capture_scheduler import AdaptiveCaptureScheduler
+from champion_aliases import ChampionAliases
+from champion_list_model import ICON_SIZE, ChampionListModel
+from champion_matcher import ChampionMatcher, to_hiragana
+from frame_convert import DebugFrameRing, capture_to_rgb, grayscale_thumbnail
+from icon_atlas import IconAtlas
+from draft_history import DraftHistory
+from draft_history_dialog import DraftHistoryDialog
+from draft_detection import DEFAULT_CONFIDENCE_THRESHOLD, assign_slots, detect_champions, ocr_lines
+from match_stats import MATCH_HISTORY_DIR, MatchStats
+from pick_prefetch import SuggestionPrefetcher
+from pick_prompt import build_pick_messages
+from pick_recommender import CHAMPION_JSON, PickRecommender
+from token_accounting import estimate_messages_tokens, format_usage
+from tracing import span
+
+# ピック提案の応答待ちタイムアウト（秒）。ピック時間 30 秒に収まるようにする
+PICK_SUGGESTION_TIMEOUT_S = 20.0
+# ローカル推薦で表示・AI に渡す候補数
+LOCAL_TOP_K = 5
+# 変化検出用の縮小画像サイズ（16:9）
+PROBE_WIDTH = 64
+PROBE_HEIGHT = 36
+# 先読み: コンボ入力が止まってから問い合わせを始めるまでの待ち時間（ミリ秒）
+PREFETCH_DEBOUNCE_MS = 700
 
 # --- 画面中央に枠線を描画する透過オーバーレイウィジェット ---
 class ScreenOverlay(QWidget):
-    """デスクトップ上に透過のオーバーレイを表示し、中央に指定サイズの枠線を描画する。"""
-    def __init__(self, width: int = 1280, height: int = 720, parent=None):
+    """デスクトップ上に透過のオーバーレイを表示し、キャプチャ対象の矩形に枠線を描画する。
+    矩形の計算は CaptureGeometry に任せ、キャプチャ処理と常に同じ領域を示す。"""
+    def __init__(self, geometry: CaptureGeometry, parent=None):
         super().__init__(parent)
-        self._rect_w = width
-        self._rect_h = height
+        self._geometry = geometry
+        self._frame_rect = QRect()
 
         # ウィンドウは枠のみ表示する透明ウィンドウにする
         flags = Qt.FramelessWindowHint | Qt.Tool | Qt.WindowStaysOnTopHint
@@ -29,17 +53,28 @@ class ScreenOverlay(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         # マウスイベントは下のアプリに透過（クリック等を妨げない）
         self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self.sync_to_target()
 
-        # サイズはスクリーン全体に合わせる
-        screen = QGuiApplication.primaryScreen()
-        if screen:
-            geom = screen.geometry()
-            self.setGeometry(geom)
-        else:
+    def sync_to_target(self):
+        """対象スクリーン全体に重ね、枠の位置を更新する（変化が無ければ何もしない）"""
+        screen, game_rect = self._geometry.target()
+        if screen is None:
             self.resize(1920, 1080)
+            return
+        geom = screen.geometry()
+        if self.geometry() != geom:
+            self.setGeometry(geom)
+        frame = self._geometry.capture_rect(screen, game_rect).translated(-geom.topLeft())
+        if frame != self._frame_rect:
+            self._frame_rect = frame
+            self.update()
+
+    def showEvent(self, event):
+        self.sync_to_target()
+        super().showEvent(event)
 
     def paintEvent(self, event):
-        """中央に枠線（長方形）を描画する。枠は白基調デザインに合わせた柔らかい色。"""
+        """キャプチャ矩形に枠線（長方形）を描画する。枠は白基調デザインに合わせた柔らかい色。"""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         # 半透明に薄くスクリーン全体を暗くする（視認性のため、必要なければコメントアウト可）
@@ -51,24 +86,47 @@ class ScreenOverlay(QWidget):
         painter.setPen(pen)
         painter.setBrush(Qt.NoBrush)
 
-        # 中央位置を計算して長方形を描く
-        sw = self.width()
-        sh = self.height()
-        rw = min(self._rect_w, sw - 40)
-        rh = min(self._rect_h, sh - 40)
-        rx = (sw - rw) // 2
-        ry = (sh - rh) // 2
         # 角を丸く描画（丸みを持たせる）
-        painter.drawRoundedRect(rx, ry, rw, rh, 12, 12)
+        painter.drawRoundedRect(self._frame_rect, 12, 12)
 
 class LolPickSupportTab(QWidget):
-    def __init__(self, client: OpenAI | None = None, parent=None):
+    # 対戦履歴の取り込み完了（ワーカースレッド → GUI スレッド）
+    match_import_finished = Signal(object)
+    match_import_progress = Signal(int, int)
+
+    def __init__(self, client: AIClient | None = None, parent=None):
         super().__init__(parent)
         self.client = client
         self.champions = self._load_champions()
+        # 別名表（英語名・ローマ字・通称 → 日本語名）。補完と OCR 検索の両方で使う
+        self.aliases = ChampionAliases.load(self.champions)
+        # OCR テキスト用のあいまい検索索引（誤認識 1〜2 文字や英語表記も拾う）
+        self.matcher = ChampionMatcher(self.champions, self.aliases.matcher_aliases())
+        # ローカル推薦エンジン（オフラインでも即座に候補を出せる）
+        try:
+            self.recommender = PickRecommender.load()
+        except Exception:
+            self.recommender = PickRecommender(self.champions)
         # スクリーンオーバーレイ（中央に 960x540 枠を表示）
-        self._overlay = ScreenOverlay(1280, 720)
+        self.capture_geometry = CaptureGeometry(1280, 720, anchor_widget=self)
+        self._overlay = ScreenOverlay(self.capture_geometry)
         self._overlay.hide()
+        # 自動取得の検出結果をコンボへ反映する最低信頼度
+        self._detect_threshold = DEFAULT_CONFIDENCE_THRESHOLD
+        # デバッグ用フレーム保存（環境変数で有効化した場合のみ、枚数・容量上限付き）
+        self._debug_frames = DebugFrameRing.from_env()
+        # アイコン付きのチャンピオン一覧（全コンボで共有。アイコンはアトラスから表示時に切り出す）
+        self.icon_atlas = IconAtlas.load()
+        self._champion_model = ChampionListModel(self.champions, self.icon_atlas, self.aliases.icon_id, self)
+        # 提案履歴（SQLite）。開けない場合は履歴なしで動く
+        try:
+            self.history = DraftHistory()
+        except Exception:
+            self.history = None
+        self._history_dialog = None
+        # 対戦履歴から集計した勝率表（新しいファイルだけを追加で取り込む）
+        self.match_stats = MatchStats.load(self.champions, self.aliases.lookup)
+        self._match_import_thread = None
 
         # UI フォント設定（Windows でポピュラーなフォントを優先）
         ui_font = QFont("Yu Gothic UI", 10)
@@ -77,7 +135,6 @@ class LolPickSupportTab(QWidget):
         # バン：10個（5×2段）
         self.ban_combos = [QComboBox() for _ in range(10)]
         for cb in self.ban_combos:
-            cb.addItems(self.champions)
             self._make_editable_with_completer(cb)
 
         # 味方ピック：5体（上に固定ロールラベルを表示）
@@ -85,14 +142,12 @@ class LolPickSupportTab(QWidget):
         self.our_picks_combos = []
         for _ in range(5):
             champ_cb = QComboBox()
-            champ_cb.addItems(self.champions)
             self._make_editable_with_completer(champ_cb)
             self.our_picks_combos.append(champ_cb)
 
         # 敵ピック：5
         self.enemy_picks_combos = [QComboBox() for _ in range(5)]
         for cb in self.enemy_picks_combos:
-            cb.addItems(self.champions)
             self._make_editable_with_completer(cb)
 
         # ロール（自分のロール）
@@ -105,6 +160,15 @@ class LolPickSupportTab(QWidget):
         self.generate_button.setObjectName("primaryButton")
         self.clear_button = QPushButton("クリア")
         self.clear_button.setObjectName("clearButton")
+        self.history_button = QPushButton("履歴")
+        self.history_button.setObjectName("clearButton")
+        self.import_matches_button = QPushButton("戦績取込")
+        self.import_matches_button.setObjectName("clearButton")
+        self.import_matches_button.setToolTip(f"{MATCH_HISTORY_DIR} フォルダの対戦履歴 JSON（match-v5 形式）から勝率を集計します")
+        self.speculative_check = QCheckBox("先読み")
+        self.speculative_check.setToolTip("入力が落ち着いた時点で AI 提案を先に取得します（API 呼び出しが増えます）")
+        self.speculative_check.setChecked(True)
+        self.speculative_check.setEnabled(self.client is not None)
 
         self.result_box = QTextEdit()
         self.result_box.setReadOnly(True)
@@ -153,9 +217,12 @@ class LolPickSupportTab(QWidget):
         h3.addWidget(QLabel("自分のロール:"))
         h3.addWidget(self.role_combo)
         h3.addStretch()
+        h3.addWidget(self.speculative_check)
         h3.addWidget(self.auto_get_button)
         h3.addWidget(self.generate_button)
         h3.addWidget(self.clear_button)
+        h3.addWidget(self.history_button)
+        h3.addWidget(self.import_matches_button)
         layout.addLayout(h3)
 
         layout.addWidget(QLabel("AI提案:"))
@@ -227,6 +294,35 @@ class LolPickSupportTab(QWidget):
         self.auto_get_button.clicked.connect(self.on_auto_get)
         self.generate_button.clicked.connect(self.on_generate)
         self.clear_button.clicked.connect(self.on_clear)
+        self.history_button.clicked.connect(self.on_show_history)
+        self.import_matches_button.clicked.connect(self.on_import_matches)
+        self.match_import_finished.connect(self._on_match_import_finished)
+        self.match_import_progress.connect(self._on_match_import_progress)
+
+        # 先読み: コンボの変更をデバウンスしてバックグラウンドで問い合わせる
+        self._awaiting = None
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_DEBOUNCE_MS)
+        self._prefetch_timer.timeout.connect(self._on_draft_settled)
+        self._prefetcher = None
+        if self.client is not None:
+            self._prefetcher = SuggestionPrefetcher(self.client, PICK_SUGGESTION_TIMEOUT_S, self)
+            self._prefetcher.ready.connect(self._on_suggestion_ready)
+            self._prefetcher.failed.connect(self._on_suggestion_failed)
+        for cb in self.ban_combos + self.our_picks_combos + self.enemy_picks_combos + [self.role_combo]:
+            cb.currentTextChanged.connect(self._on_draft_edited)
+
+        if self.aliases.is_fallback:
+            self.result_box.append(
+                "champion_aliases.json がありません。英語名での入力・アイコン・戦績取込の名前解決は使えません。\n"
+                "utils/get_all_champion_images.py と utils/build_champion_aliases.py を実行してください（README 参照）。"
+            )
+        if self.icon_atlas is None:
+            self.result_box.append(
+                "アイコンのアトラス（champion_icons_atlas.png）がありません。コンボはアイコンなしで表示します。\n"
+                "utils/build_icon_atlas.py を実行してください（README 参照）。"
+            )
 
     def _load_champions(self):
         try:
@@ -239,24 +335,15 @@ class LolPickSupportTab(QWidget):
             return ["指定なし", "Aatrox", "Ahri", "Akali"]
 
     def _to_hiragana(self, s: str) -> str:
-        if not s:
-            return ""
-        t = unicodedata.normalize("NFKC", s.strip())
-        out_chars = []
-        for ch in t:
-            code = ord(ch)
-            if 0x30A1 <= code <= 0x30F6:
-                out_chars.append(chr(code - 0x60))
-            else:
-                out_chars.append(ch)
-        norm = "".join(out_chars).lower()
-        for ch in ["・", " ", "(", ")", "（", "）", "：", ":", "　"]:
-            norm = norm.replace(ch, "")
-        return norm
+        return to_hiragana(s)
 
     def _make_editable_with_completer(self, combo: QComboBox):
+        combo.setModel(self._champion_model)
+        combo.setIconSize(QSize(ICON_SIZE, ICON_SIZE))
         combo.setEditable(True)
-        model = QStringListModel(self.champions, combo)
+        # 共有モデルなので、入力した文字列を一覧に追加させない
+        combo.setInsertPolicy(QComboBox.NoInsert)
+        model = ChampionListModel(self.champions, self.icon_atlas, self.aliases.icon_id, combo)
         completer = QCompleter(model, combo)
         completer.setCaseSensitivity(Qt.CaseInsensitive)
         completer.setCompletionMode(QCompleter.PopupCompletion)
@@ -266,17 +353,16 @@ class LolPickSupportTab(QWidget):
         combo.lineEdit().textEdited.connect(lambda txt, c=combo: self._update_completer(c, txt))
 
     def _update_completer(self, combo: QComboBox, text: str):
-        # 入力を正規化して、チャンピオンリストを先頭一致でフィルタする（ひらがな/カタカナ無視）
+        with span("lol.update_completer"):
+            self._update_completer_impl(combo, text)
+
+    def _update_completer_impl(self, combo: QComboBox, text: str):
+        # 入力を正規化して、別名表（日本語名・英語名・ローマ字・通称）の先頭一致で絞り込む
         nt = self._to_hiragana(text)
         if nt == "":
             candidates = self.champions[:]
         else:
-            candidates = []
-            for name in self.champions:
-                if name == "指定なし":
-                    continue
-                if self._to_hiragana(name).startswith(nt):
-                    candidates.append(name)
+            candidates = self.aliases.prefix_matches(nt)
             if not candidates:
                 for name in self.champions:
                     if name == "指定なし":
@@ -288,7 +374,7 @@ class LolPickSupportTab(QWidget):
             candidates = ["指定なし"]
 
         # モデルを更新して補完候補を差し替える
-        combo._smodel.setStringList(candidates)
+        combo._smodel.set_names(candidates)
         combo._completer.setModel(combo._smodel)
 
         # 補完ポップアップを確実に表示する処理
@@ -310,16 +396,15 @@ class LolPickSupportTab(QWidget):
     def on_auto_get(self):
         """スクリーンショットの自動取得を開始/停止するトグル。
         - オーバーレイは開始時に表示、停止時に非表示にする。
+        - 縮小画像の差分で画面の変化を検知し、変化したときだけ OCR を行う（間隔は自動調整）。
         """
-        interval_ms = getattr(self, "_auto_interval", 5000)
-        if not hasattr(self, "_auto_timer"):
-            self._auto_timer = QTimer(self)
-            self._auto_timer.timeout.connect(self._capture_screen_once)
-            self._auto_interval = interval_ms
-
-        if not self._auto_timer.isActive():
-            # 開始：タイマーとオーバーレイを表示
-            self._auto_timer.start(self._auto_interval)
+        if not hasattr(self, "_auto_scheduler"):
+            self._auto_scheduler = AdaptiveCaptureScheduler(self._probe_capture, self._detect_from_probe, self)
+            self._probe_grab = None
+
+        if not self._auto_scheduler.isActive():
+            # 開始：スケジューラとオーバーレイを表示
+            self._auto_scheduler.start()
             self.auto_get_button.setText("自動取得停止")
             self.auto_get_button.setObjectName("primaryButton")
             try:
@@ -330,80 +415,86 @@ class LolPickSupportTab(QWidget):
                 pass
             self.result_box.append("自動取得を開始しました。")
         else:
-            # 停止：タイマーとオーバーレイを非表示
-            self._auto_timer.stop()
+            # 停止：スケジューラとオーバーレイを非表示
+            self._auto_scheduler.stop()
             self.auto_get_button.setText("チャンピオン自動取得")
             try:
                 self._overlay.hide()
             except Exception:
                 pass
-            self.result_box.append("自動取得を停止しました。")
+            self.result_box.append(
+                f"自動取得を停止しました。（変化検出 {self._auto_scheduler.probe_count} 回 / "
+                f"OCR {self._auto_scheduler.detect_count} 回"
+                + (f" / 取得失敗 {self._auto_scheduler.probe_failures} 回" if self._auto_scheduler.probe_failures else "")
+                + "）"
+            )
+
+    def _grab_capture_region(self):
+        """キャプチャ領域を取得し、(検出解像度の QImage, (x, y, w, h)) を返す。失敗時は None"""
+        grabbed = self.capture_geometry.grab()
+        if grabbed is None:
+            return None
+        image, rect = grabbed
+        return image, (rect.x(), rect.y(), rect.width(), rect.height())
+
+    def _probe_capture(self):
+        """変化検出用: キャプチャを縮小グレースケールの NumPy 配列にして返す"""
+        with span("lol.capture_probe"):
+            if self._overlay.isVisible():
+                self._overlay.sync_to_target()
+            self._probe_grab = self._grab_capture_region()
+            if self._probe_grab is None:
+                return None
+            return grayscale_thumbnail(self._probe_grab[0], PROBE_WIDTH, PROBE_HEIGHT)
+
+    def _detect_from_probe(self):
+        """変化が検出されたとき: 変化検出で取得したキャプチャをそのまま使ってフル検出する"""
+        with span("lol.capture_screen_once"):
+            self._capture_screen_once_impl(self._probe_grab)
 
     def _capture_screen_once(self):
-        """単発でスクリーンショットを取得して保存し、可能であれば OCR を試行する内部処理。
-        変更点: デスクトップ全体ではなく、オーバーレイで示した中央の矩形領域のみを保存します。
+        """単発でスクリーンショットを取得し、可能であれば OCR を試行する内部処理。
+        デスクトップ全体ではなく、オーバーレイで示した中央の矩形領域のみを対象にします。
+        画像はファイルに保存せずメモリ上で OCR に渡します（DIARYAPP_DEBUG_FRAMES 指定時のみ上限付きで保存）。
         """
+        with span("lol.capture_screen_once"):
+            self._capture_screen_once_impl()
+
+    def _capture_screen_once_impl(self, grabbed=None):
         try:
-            screen = QGuiApplication.primaryScreen()
-            if screen is None:
-                self.result_box.append("スクリーン取得に失敗しました: primaryScreen が見つかりません。")
+            if grabbed is None:
+                grabbed = self._grab_capture_region()
+            if grabbed is None:
+                self.result_box.append("スクリーン取得に失敗しました: 対象のスクリーンが見つかりません。")
                 return
+            image, (rx, ry, rw, rh) = grabbed
 
-            # オーバーレイで描画している矩形領域 (スクリーン座標) を計算
-            geom = screen.geometry()
-            sw = geom.width()
-            sh = geom.height()
-            # オーバーレイ側と同じ計算を再現（余白 40px を考慮）
-            rw = min(self._overlay._rect_w, sw - 40)
-            rh = min(self._overlay._rect_h, sh - 40)
-            rx = geom.x() + (sw - rw) // 2
-            ry = geom.y() + (sh - rh) // 2
-
-            # 指定矩形のみをキャプチャ
-            pix = screen.grabWindow(0, rx, ry, rw, rh)
-
-            ts = time.strftime("%Y%m%d_%H%M%S")
-            path = os.path.join(tempfile.gettempdir(), f"diaryapp_screenshot_{ts}.png")
-            saved = pix.save(path, "PNG")
-            if not saved:
-                self.result_box.append("スクリーンショットの保存に失敗しました。")
-                return
+            debug_path = self._debug_frames.save(image) if self._debug_frames is not None else None
 
-            ocr_text = None
-            # OCR が利用可能なら試行（pytesseract + PIL）
+            lines = None
+            # OCR が利用可能なら試行（pytesseract + PIL）。行ごとの位置と信頼度も取得する
             try:
-                import pytesseract
                 from PIL import Image
-                buf = QBuffer()
-                buf.open(QBuffer.ReadWrite)
-                pix.save(buf, "PNG")
-                data = bytes(buf.data())
-                buf.close()
-                img = Image.open(BytesIO(data))
-                try:
-                    # まず日本語指定で試す
-                    ocr_text = pytesseract.image_to_string(img, lang="jpn")
-                except Exception:
-                    ocr_text = pytesseract.image_to_string(img)
+                img = Image.fromarray(capture_to_rgb(image), "RGB")
+                lines = ocr_lines(img)
             except Exception:
-                ocr_text = None
+                lines = None
 
-            # OCR結果からチャンピオン名候補を簡易抽出（正規化して部分一致）
-            found = []
-            if ocr_text:
-                norm = self._to_hiragana(ocr_text)
-                for name in self.champions:
-                    if name == "指定なし":
-                        continue
-                    if self._to_hiragana(name) in norm:
-                        found.append(name)
+            # OCR結果からチャンピオン名候補を抽出し、画面上の位置からバン/ピック枠を推定して反映する
+            detections = detect_champions(lines, self._extract_champion_names) if lines else []
+            found = list(dict.fromkeys(d.name for d in detections))
+            changed = self._apply_detections(assign_slots(detections, self._detect_threshold))
 
-            # 表示（どの領域を保存したか明示）
-            msg = f"スクリーンショットを保存しました: {path} (領域: x={rx}, y={ry}, w={rw}, h={rh})"
+            # 表示（どの領域を取得したか明示）
+            msg = f"スクリーンショットを取得しました (領域: x={rx}, y={ry}, w={rw}, h={rh})"
+            if debug_path:
+                msg += f"\nデバッグ用に保存: {debug_path}"
             if found:
                 msg += "\n検出されたチャンピオン候補: " + ", ".join(found)
+                if changed:
+                    msg += "\n自動入力: " + ", ".join(changed)
             else:
-                if ocr_text is not None:
+                if lines is not None:
                     msg += "\nOCR 実行済み。候補は検出されませんでした。"
                 else:
                     msg += "\nOCR は利用できません（pytesseract が未インストール）。"
@@ -411,19 +502,51 @@ class LolPickSupportTab(QWidget):
         except Exception as e:
             self.result_box.append(f"スクリーンショット取得中にエラーが発生しました: {e}")
 
+    def _slot_combo(self, slot: tuple[str, int]) -> QComboBox | None:
+        kind, i = slot
+        combos = {"ban": self.ban_combos, "ally": self.our_picks_combos, "enemy": self.enemy_picks_combos}.get(kind)
+        if combos is None or not 0 <= i < len(combos):
+            return None
+        return combos[i]
+
+    def _apply_detections(self, slots: dict[tuple[str, int], str]) -> list[str]:
+        """検出結果をコンボに反映する。現在値と異なる枠だけを書き換え、変更内容の一覧を返す。
+        書き換え中はシグナルを止め（補完候補の更新や先読みを枠ごとに起こさない）、最後にまとめて通知する。"""
+        labels = {"ban": "バン", "ally": "味方", "enemy": "敵"}
+        changed = []
+        for slot, name in slots.items():
+            combo = self._slot_combo(slot)
+            if combo is None or combo.currentText().strip() == name:
+                continue
+            idx = combo.findText(name)
+            combo.blockSignals(True)
+            try:
+                if idx >= 0:
+                    combo.setCurrentIndex(idx)
+                else:
+                    combo.setEditText(name)
+            finally:
+                combo.blockSignals(False)
+            changed.append(f"{labels[slot[0]]}{slot[1] + 1}={name}")
+        if changed:
+            self._on_draft_edited()
+        return changed
+
+    def _extract_champion_names(self, ocr_text: str) -> list[tuple[str, float]]:
+        """OCR テキストからチャンピオン名をあいまい検索し、(名前, 一致度 0〜1) を出現順に返す（detect_champions の match_names）"""
+        return self.matcher.find_in_text(ocr_text)
+
     def on_clear(self):
         for cb in self.ban_combos + self.enemy_picks_combos + self.our_picks_combos:
             cb.setCurrentIndex(0)
             if cb.lineEdit():
                 cb.lineEdit().clear()
         self.role_combo.setCurrentIndex(0)
+        self._awaiting = None
         self.result_box.clear()
 
-    def on_generate(self):
-        if self.client is None:
-            QMessageBox.warning(self, "API未設定", "OPENAI_API_KEY が設定されていません。環境変数を設定してください。")
-            return
-
+    def _build_pick_request(self):
+        """現在のドラフト状態から (キャッシュキー, ローカル候補 [(名前, スコア)], AI へのメッセージ) を作る"""
         bans = self._collect_from_combos(self.ban_combos)
         our_picks = self._collect_our_picks()
         enemy_picks = self._collect_from_combos(self.enemy_picks_combos)
@@ -431,72 +554,225 @@ class LolPickSupportTab(QWidget):
         if role == "指定なし":
             role = "不特定"
 
-        prompt = (
-            "あなたは League of Legends のドラフトフェーズ専門アナリストです。"
-            "OP.GGなどの統計系サイト、公式のLOL情報、LoL wiki、SNSでのトッププレイヤーの傾向を考慮して最適なピックを提案してください。"
-            "パッチ15.23のメタ、ロールごとの強弱、ピック構成、チャンピオン相性、シナジー、カウンター、パワースパイク、エンゲージ/ディスエンゲージ構成、レンジ差、役割の補完などを深く理解しています。"
-            "以下の情報をもとに、ユーザーが選ぶべき最適なチャンピオン候補を「最大3体」提案してください。"
-            "\n\nバン一覧: " + (", ".join(bans) if bans else "なし")
-            + "\n味方の既ピック: " + (", ".join(our_picks) if our_picks else "なし")
-            + "\n敵の既ピック: " + (", ".join(enemy_picks) if enemy_picks else "なし")
-            + "\n自分のロール: " + role
-
-            +"【出力内容】"
-            "1. 最適ピック候補（最大3体）: 各チャンピオンについて、ユーザーのロールで適切に運用できるチャンピオンを選んでください。"
-
-            "2. 推奨理由（以下の観点で詳細に説明）:"
-            " - 対面ロールが確定している場合のレーン相性（有利ポイント / 不利ポイント）"
-            " - 味方構成とのシナジー（エンゲージ、ディスエンゲージ、CC連携、スケーリングの噛み合い）"
-            " - 敵構成へのカウンター要素（レンジ差、耐久 vs バースト、分断能力、エンゲージ耐性など）"
-            " - チーム構成バランス（AD/AP、前衛/後衛、CC量、オブジェクト戦力）"
-
-            "【ルール】"
-            " - BANされたチャンピオンは必ず候補から除外してください。"
-            " - ユーザーのロールに適したチャンピオンのみ提案してください。"
-            " - 敵のロールが曖昧な場合は「仮定」を明示し、その上で分析を行ってください。"
-            " - 可能な限り具体的な理由を提示し、抽象的な回答は避けてください。"
-            " - 現パッチの一般的なメタ傾向や構成理論に基づいた説明をしてください。"
-            " - 600トークン以内に収めてください。"
-        )
-
-        self.result_box.setPlainText("AIに問い合わせ中...")
+        # まずローカル推薦で全候補を一括採点する（数ミリ秒）
+        with span("lol.local_recommend"):
+            local = self.recommender.recommend(role, our_picks, enemy_picks, bans, top_k=LOCAL_TOP_K)
+
+        # 固定の指示はシステムプロンプト、ドラフト状況と候補はコンパクトな JSON で送る
+        messages = build_pick_messages(bans, our_picks, enemy_picks, role, [name for name, _ in local])
+        key = (tuple(sorted(bans)), tuple(sorted(our_picks.items())), tuple(sorted(enemy_picks)), role)
+        return key, local, messages
+
+    def on_generate(self):
+        started = time.perf_counter()
+        key, local, messages = self._build_pick_request()
+        local_text = self._format_local_candidates(local, key[3], key[2])
+        if self.client is None:
+            self.result_box.setPlainText(local_text + "\n\n（OPENAI_API_KEY 未設定のため AI の解説は省略しました）")
+            self._record_history(key, local, None, started)
+            return
+
+        # 先読み済みなら即座に表示する
+        cached = self._prefetcher.get(key)
+        if cached is not None:
+            self._awaiting = None
+            self._show_suggestion(key, local, cached, started, prefetched=True)
+            return
+
+        estimated = estimate_messages_tokens(messages)
+        self.result_box.setPlainText(local_text + f"\n\nAIに問い合わせ中...（推定入力 {estimated} トークン）")
+        # 問い合わせはバックグラウンドで行い、結果は _on_suggestion_ready で表示する
+        self._awaiting = (key, local, started)
+        self._prefetcher.request(key, messages, awaited=True)
+
+    def _on_draft_edited(self, _text=None):
+        """コンボ編集のたびにデバウンスタイマーを再始動する"""
+        if self._prefetcher is not None and self.speculative_check.isChecked():
+            self._prefetch_timer.start()
+
+    def _on_draft_settled(self):
+        """入力が落ち着いたら現在のドラフト状態で先読みを開始する"""
+        key, _local, messages = self._build_pick_request()
+        bans, allies, enemies, _role = key
+        if not (bans or allies or enemies):
+            return
+        self._prefetcher.request(key, messages)
+
+    def _on_suggestion_ready(self, key, result):
+        if self._awaiting is None or self._awaiting[0] != key:
+            return
+        _key, local, started = self._awaiting
+        self._awaiting = None
+        self._show_suggestion(key, local, result, started)
+
+    def _on_suggestion_failed(self, key, message: str):
+        if self._awaiting is None or self._awaiting[0] != key:
+            return
+        local = self._awaiting[1]
+        self._awaiting = None
+        self.result_box.setPlainText(self._format_local_candidates(local, key[3], key[2]))
+        QMessageBox.critical(self, "APIエラー", f"AIへの問い合わせに失敗しました:\n{message}")
+
+    def _show_suggestion(self, key, local: list[tuple[str, float]], result: dict, started: float,
+                         prefetched: bool = False):
+        footer = format_usage(result["report"])
+        if prefetched:
+            footer += "（先読み済み）"
+        self.result_box.setPlainText(self._format_local_candidates(local, key[3], key[2]) + "\n\n" + result["text"] + "\n\n" + footer)
+        self._record_history(key, local, result, started, prefetched)
+
+    def _record_history(self, key, local: list[tuple[str, float]], result: dict | None,
+                        started: float, prefetched: bool = False):
+        """表示した提案を履歴に追記する。提案文に出てきたチャンピオン名も集計用に記録する
+        （ローカル候補は DraftHistory が別の side で記録するので混ぜない）"""
+        if self.history is None:
+            return
+        bans, allies, enemies, role = key
+        text = result["text"] if result else ""
+        on_board = set(bans) | {champ for _role, champ in allies} | set(enemies)
+        suggested = [name for name, _conf in self.matcher.find_in_text(text)]
+        try:
+            with span("lol.record_history"):
+                self.history.add(
+                    role, list(bans), dict(allies), list(enemies), local,
+                    suggestion=text,
+                    suggested=[name for name in suggested if name not in on_board],
+                    prefetched=prefetched,
+                    wait_ms=(time.perf_counter() - started) * 1000.0,
+                    report=result["report"] if result else None,
+                    api_ms=result.get("elapsed_ms") if result else None,
+                )
+        except Exception as e:
+            self.result_box.append(f"\n履歴の保存に失敗しました: {e}")
+
+    def on_show_history(self):
+        if self.history is None:
+            QMessageBox.warning(self, "履歴", "履歴データベースを開けませんでした。")
+            return
+        if self._history_dialog is None:
+            self._history_dialog = DraftHistoryDialog(self.history, self._canonical_name, self)
+            self._history_dialog.replay_callback = self._replay_draft
+        else:
+            self._history_dialog.reload()
+        self._history_dialog.show()
+        self._history_dialog.raise_()
+
+    def _replay_draft(self, record):
+        """履歴のドラフト状態をコンボに再現し、当時の提案を表示する"""
+        slots = {("ban", i): name for i, name in enumerate(record.bans[:len(self.ban_combos)])}
+        for role, name in record.allies.items():
+            if role in self.role_labels:
+                slots[("ally", self.role_labels.index(role))] = name
+        slots.update({("enemy", i): name for i, name in enumerate(record.enemies[:len(self.enemy_picks_combos)])})
+        # 履歴に無い枠は空に戻す
+        for kind, combos in (("ban", self.ban_combos), ("ally", self.our_picks_combos), ("enemy", self.enemy_picks_combos)):
+            for i in range(len(combos)):
+                slots.setdefault((kind, i), "指定なし")
+        self.role_combo.blockSignals(True)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "あなたはLoLについて非常に詳しいコーチです。助言は日本語で簡潔に行ってください。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6,
-                max_tokens=600
+            idx = self.role_combo.findText(record.role)
+            self.role_combo.setCurrentIndex(idx if idx >= 0 else 0)
+        finally:
+            self.role_combo.blockSignals(False)
+        self._apply_detections(slots)
+        self._awaiting = None
+        text = self._format_local_candidates(record.local_candidates, record.role, record.enemies)
+        if record.suggestion:
+            text += "\n\n" + record.suggestion
+        self.result_box.setPlainText(f"（履歴 {record.created_at.replace('T', ' ')} を再現）\n" + text)
+
+    def shutdown(self):
+        """アプリ終了時に呼ぶ: 未開始の先読みを取り消す"""
+        self._prefetch_timer.stop()
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+        if self.history is not None:
+            self.history.close()
+
+    def _format_local_candidates(self, ranked: list[tuple[str, float]], role: str | None = None,
+                                 enemies: list[str] = ()) -> str:
+        """ローカル候補の表示文。対戦履歴の集計があれば勝率を添える"""
+        if not ranked:
+            return "ローカル候補: なし"
+        items = []
+        for name, score in ranked:
+            stats = self.match_stats.describe(name, role, list(enemies))
+            items.append(f"{name}（{score:.1f}" + (f"、{stats}" if stats else "") + "）")
+        return "ローカル候補: " + ", ".join(items)
+
+    def on_import_matches(self):
+        """対戦履歴フォルダの新しいファイルだけをバックグラウンドで集計する"""
+        if self._match_import_thread is not None:
+            return
+        pending = self.match_stats.pending_files(MATCH_HISTORY_DIR)
+        if not pending:
+            QMessageBox.information(
+                self, "戦績取込",
+                f"新しい対戦履歴はありません。\n（{os.path.abspath(MATCH_HISTORY_DIR)} に JSON を置いてください。"
+                f"取り込み済み {self.match_stats.match_count} 試合）",
             )
-            ai_text = None
+            return
+        self.import_matches_button.setEnabled(False)
+        self.import_matches_button.setText(f"取込中 0/{len(pending)}")
+
+        def work():
             try:
-                ai_text = response.choices[0].message["content"]
-            except Exception:
-                try:
-                    ai_text = response.choices[0].message.content
-                except Exception:
-                    ai_text = str(response)
-            self.result_box.setPlainText(ai_text.strip())
+                batch = self.match_stats.collect(pending, progress=self.match_import_progress.emit)
+            except Exception as e:
+                batch = e
+            self.match_import_finished.emit(batch)
+
+        self._match_import_thread = threading.Thread(target=work, name="match-import", daemon=True)
+        self._match_import_thread.start()
+
+    def _on_match_import_progress(self, done: int, total: int):
+        self.import_matches_button.setText(f"取込中 {done}/{total}")
+
+    def _on_match_import_finished(self, batch):
+        self._match_import_thread = None
+        self.import_matches_button.setEnabled(True)
+        self.import_matches_button.setText("戦績取込")
+        if isinstance(batch, Exception):
+            QMessageBox.critical(self, "戦績取込", f"対戦履歴の集計に失敗しました:\n{batch}")
+            return
+        # 加算と保存は GUI スレッドで行う（表示中の勝率と競合しない）
+        self.match_stats.apply(batch)
+        try:
+            self.match_stats.save()
         except Exception as e:
-            self.result_box.setPlainText("")
-            QMessageBox.critical(self, "APIエラー", f"AIへの問い合わせに失敗しました:\n{e}")
+            QMessageBox.warning(self, "戦績取込", f"集計結果の保存に失敗しました:\n{e}")
+        msg = f"対戦履歴を取り込みました: 新規 {batch.match_count} 試合（累計 {self.match_stats.match_count} 試合）"
+        if batch.errors:
+            msg += f"\n読み込めなかったファイル: {len(batch.errors)} 件（{batch.errors[0]} など）"
+        if batch.unresolved:
+            names = sorted(batch.unresolved, key=batch.unresolved.get, reverse=True)
+            msg += (f"\nチャンピオン名を解決できず見送った試合があります（{len(batch.skipped_files)} ファイル）: "
+                    + ", ".join(names[:10]) + (" など" if len(names) > 10 else "")
+                    + "\nutils/build_champion_aliases.py で別名表を作ってから再度取り込むと集計されます。")
+        self.result_box.append(msg)
+
+    def _canonical_name(self, text: str) -> str:
+        """入力が別名（"ahri" など）なら日本語名に直す"""
+        t = text.strip()
+        if not t:
+            return t
+        return self.aliases.lookup(t) or t
 
     def _collect_from_combos(self, combos):
         vals = []
         for cb in combos:
-            t = cb.currentText().strip()
+            t = self._canonical_name(cb.currentText())
             if t and t != "指定なし":
                 vals.append(t)
         return vals
 
-    def _collect_our_picks(self):
-        vals = []
+    def _collect_our_picks(self) -> dict[str, str]:
+        """味方の既ピックを {ロール: チャンピオン} で返す"""
+        vals = {}
         for i, champ_cb in enumerate(self.our_picks_combos):
-            champ = champ_cb.currentText().strip()
+            champ = self._canonical_name(champ_cb.currentText())
             if not champ or champ == "指定なし":
                 continue
             role = self.role_labels[i] if i < len(self.role_labels) else "指定なし"
-            vals.append(f"{champ}（{role}）")
+            vals[role] = champ
         return vals
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""ローカルの対戦履歴（Riot match-v5 形式の JSON）からチャンピオンごとの勝率表を集計する。
+
+フォルダに置かれた JSON を読み、次の表を列指向の NumPy 配列で保持する（行・列はチャンピオン一覧の順）:
+    games[i], wins[i]                 チャンピオン i の試合数・勝利数
+    role_games[i, r], role_wins[i, r] ロール別
+    vs_games[i, j], vs_wins[i, j]     i が敵チームの j と対戦したときの試合数・勝利数
+
+取り込み済みのファイル（パス・サイズ・更新時刻）と試合 ID を記録し、再集計では新しいファイルだけを読む。
+チャンピオン名を解決できない参加者がいる試合は数えず、そのファイルも取り込み済みにしない
+（別名表を作り直した後の取り込みで読み直す）。
+状態は .npz に保存する。Qt には依存しない。
+
+match-v5 形式（必要な項目のみ）:
+    {"metadata": {"matchId": "JP1_..."},
+     "info": {"participants": [{"championName": "Ahri", "teamId": 100, "teamPosition": "MIDDLE", "win": true}, ...]}}
+"""
+import json
+import os
+
+import numpy as np
+
+from pick_recommender import ROLES
+
+MATCH_HISTORY_DIR = "match_history"
+# 集計結果は日記の保存先（diary_store.DIARIES_DIR）と同じく、起動時のカレントディレクトリによらず src の隣に置く
+MATCH_STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "match_stats.npz")
+
+# match-v5 の teamPosition → アプリのロール名
+POSITION_TO_ROLE = {
+    "TOP": "トップ",
+    "JUNGLE": "ジャングル",
+    "MIDDLE": "ミッド",
+    "BOTTOM": "ADC",
+    "UTILITY": "サポート",
+}
+
+# 勝率を表示する最低試合数（少なすぎる標本は表示しない）
+MIN_GAMES_TO_SHOW = 5
+
+
+class MatchBatch:
+    """新しく読んだ試合の集計差分。バックグラウンドで作り、GUI スレッドで apply する"""
+
+    def __init__(self, n: int):
+        self.games = np.zeros(n, dtype=np.int32)
+        self.wins = np.zeros(n, dtype=np.int32)
+        self.role_games = np.zeros((n, len(ROLES)), dtype=np.int32)
+        self.role_wins = np.zeros((n, len(ROLES)), dtype=np.int32)
+        self.vs_games = np.zeros((n, n), dtype=np.int32)
+        self.vs_wins = np.zeros((n, n), dtype=np.int32)
+        self.files = {}  # パス → [サイズ, 更新時刻]
+        self.match_ids = set()
+        self.errors = []  # 読めなかったファイル
+        self.unresolved = {}  # 解決できなかった championName → 出現した試合数
+        self.skipped_files = []  # 名前を解決できない試合があり、取り込み済みにしなかったファイル
+
+    @property
+    def match_count(self) -> int:
+        return len(self.match_ids)
+
+
+class MatchStats:
+    def __init__(self, names: list[str], resolve_name=None):
+        """resolve_name: match-v5 の championName（英語 ID）→ 日本語名。None なら championName をそのまま使う"""
+        self.names = list(names)
+        self.index = {n: i for i, n in enumerate(self.names)}
+        self.resolve_name = resolve_name or (lambda name: name)
+        empty = MatchBatch(len(self.names))
+        self.games, self.wins = empty.games, empty.wins
+        self.role_games, self.role_wins = empty.role_games, empty.role_wins
+        self.vs_games, self.vs_wins = empty.vs_games, empty.vs_wins
+        self.files = {}
+        self.match_ids = set()
+
+    # ---------- 保存・読み込み ----------
+    @classmethod
+    def load(cls, names: list[str], resolve_name=None, path: str = MATCH_STATS_FILE) -> "MatchStats":
+        """保存済みの集計を読み込む。チャンピオン一覧が変わっていれば名前で対応付け直す"""
+        stats = cls(names, resolve_name)
+        if not os.path.exists(path):
+            return stats
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                saved_names = [str(n) for n in data["names"]]
+                meta = json.loads(str(data["meta"]))
+                arrays = {key: data[key] for key in ("games", "wins", "role_games", "role_wins", "vs_games", "vs_wins")}
+        except (OSError, ValueError, KeyError):
+            return stats
+
+        # 保存時と現在の一覧の両方にある名前だけを写す
+        src = np.array([i for i, n in enumerate(saved_names) if n in stats.index], dtype=np.intp)
+        dst = np.array([stats.index[saved_names[i]] for i in src], dtype=np.intp)
+        stats.games[dst] = arrays["games"][src]
+        stats.wins[dst] = arrays["wins"][src]
+        stats.role_games[dst] = arrays["role_games"][src]
+        stats.role_wins[dst] = arrays["role_wins"][src]
+        stats.vs_games[np.ix_(dst, dst)] = arrays["vs_games"][np.ix_(src, src)]
+        stats.vs_wins[np.ix_(dst, dst)] = arrays["vs_wins"][np.ix_(src, src)]
+        stats.files = meta.get("files", {})
+        stats.match_ids = set(meta.get("match_ids", []))
+        return stats
+
+    def save(self, path: str = MATCH_STATS_FILE):
+        meta = json.dumps({"files": self.files, "match_ids": sorted(self.match_ids)}, ensure_ascii=False)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp, names=np.array(self.names), meta=np.array(meta),
+            games=self.games, wins=self.wins, role_games=self.role_games, role_wins=self.role_wins,
+            vs_games=self.vs_games, vs_wins=self.vs_wins,
+        )
+        os.replace(tmp, path)
+
+    # ---------- 取り込み ----------
+    def pending_files(self, folder: str = MATCH_HISTORY_DIR) -> list[str]:
+        """未取り込み（または更新された）JSON ファイルの一覧"""
+        if not os.path.isdir(folder):
+            return []
+        pending = []
+        for entry in os.scandir(folder):
+            if not entry.is_file() or not entry.name.lower().endswith(".json"):
+                continue
+            st = entry.stat()
+            if self.files.get(entry.path) != [st.st_size, st.st_mtime]:
+                pending.append(entry.path)
+        return sorted(pending)
+
+    def collect(self, paths: list[str], progress=None) -> MatchBatch:
+        """ファイルを読んで差分を作る（自身の状態は変えないので別スレッドから呼べる）。
+        progress(読んだ数, 全体数) を渡すと途中経過を通知する"""
+        batch = MatchBatch(len(self.names))
+        for done, path in enumerate(paths, 1):
+            try:
+                st = os.stat(path)
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                batch.errors.append(f"{os.path.basename(path)}: {e}")
+                continue
+            # 1 ファイルに 1 試合、または試合の配列
+            complete = True
+            for match in data if isinstance(data, list) else [data]:
+                complete &= self._collect_match(match, batch)
+            if complete:
+                batch.files[path] = [st.st_size, st.st_mtime]
+            else:
+                batch.skipped_files.append(path)
+            if progress is not None:
+                progress(done, len(paths))
+        return batch
+
+    def _collect_match(self, match: dict, batch: MatchBatch) -> bool:
+        """試合を差分に加える。名前を解決できない参加者がいて数えなかった場合だけ False"""
+        try:
+            match_id = match["metadata"]["matchId"]
+            participants = match["info"]["participants"]
+        except (KeyError, TypeError):
+            return True
+        if match_id in self.match_ids or match_id in batch.match_ids:
+            return True
+
+        teams = {}  # teamId → (インデックス, ロール列, 勝敗)
+        unresolved = set()
+        for p in participants:
+            champion = p.get("championName", "")
+            i = self.index.get(self.resolve_name(champion))
+            if i is None:
+                unresolved.add(champion)
+                continue
+            role = POSITION_TO_ROLE.get(p.get("teamPosition") or p.get("individualPosition") or "")
+            idx, cols, win = teams.setdefault(p.get("teamId"), ([], [], bool(p.get("win"))))
+            idx.append(i)
+            cols.append(ROLES.index(role) if role else -1)
+        if unresolved:
+            # 一部の参加者だけで数えると対面の表が欠けるので、試合ごと見送る
+            for champion in unresolved:
+                batch.unresolved[champion] = batch.unresolved.get(champion, 0) + 1
+            return False
+        if not teams:
+            return True
+        batch.match_ids.add(match_id)
+
+        for team_id, (idx, cols, win) in teams.items():
+            idx = np.array(idx, dtype=np.intp)
+            cols = np.array(cols, dtype=np.intp)
+            batch.games[idx] += 1
+            batch.wins[idx] += int(win)
+            has_role = cols >= 0
+            batch.role_games[idx[has_role], cols[has_role]] += 1
+            batch.role_wins[idx[has_role], cols[has_role]] += int(win)
+            for other_id, (other_idx, _cols, _win) in teams.items():
+                if other_id == team_id:
+                    continue
+                grid = np.ix_(idx, np.array(other_idx, dtype=np.intp))
+                batch.vs_games[grid] += 1
+                batch.vs_wins[grid] += int(win)
+        return True
+
+    def apply(self, batch: MatchBatch):
+        """collect の差分を加算する"""
+        self.games += batch.games
+        self.wins += batch.wins
+        self.role_games += batch.role_games
+        self.role_wins += batch.role_wins
+        self.vs_games += batch.vs_games
+        self.vs_wins += batch.vs_wins
+        self.files.update(batch.files)
+        self.match_ids |= batch.match_ids
+
+    # ---------- 参照 ----------
+    @property
+    def match_count(self) -> int:
+        return len(self.match_ids)
+
+    def win_rate(self, name: str, role: str | None = None) -> tuple[float, int] | None:
+        """(勝率, 試合数)。ロールを指定するとそのロールでの成績。試合が無ければ None"""
+        i = self.index.get(name)
+        if i is None:
+            return None
+        if role in ROLES:
+            r = ROLES.index(role)
+            games, wins = int(self.role_games[i, r]), int(self.role_wins[i, r])
+        else:
+            games, wins = int(self.games[i]), int(self.wins[i])
+        return (wins / games, games) if games else None
+
+    def matchup_rate(self, name: str, enemies: list[str]) -> tuple[float, int] | None:
+        """敵チャンピオンたちと対戦したときの合計の (勝率, 対戦数)"""
+        i = self.index.get(name)
+        enemy_idx = [self.index[e] for e in enemies if e in self.index]
+        if i is None or not enemy_idx:
+            return None
+        games = int(self.vs_games[i, enemy_idx].sum())
+        wins = int(self.vs_wins[i, enemy_idx].sum())
+        return (wins / games, games) if games else None
+
+    def describe(self, name: str, role: str | None, enemies: list[str]) -> str:
+        """候補の横に添える短い説明（例: "勝率 54%/120戦・対面 48%/25戦"）。十分な試合が無ければ空文字"""
+        parts = []
+        overall = self.win_rate(name, role) or self.win_rate(name)
+        if overall and overall[1] >= MIN_GAMES_TO_SHOW:
+            parts.append(f"勝率 {overall[0]:.0%}/{overall[1]}戦")
+        matchup = self.matchup_rate(name, enemies)
+        if matchup and matchup[1] >= MIN_GAMES_TO_SHOW:
+            parts.append(f"対面 {matchup[0]:.0%}/{matchup[1]}戦")
+        return "・".join(parts)
@@ -0,0 +1,102 @@
+"""ピック提案の先読み（投機的実行）。
+
+ドラフト入力が落ち着いた時点でバックグラウンドスレッドから AI に問い合わせ、結果をキャッシュする。
+ボタンが押されたときに同じドラフト状態の結果があれば即座に表示できる。
+"""
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+from pick_prompt import PICK_MAX_TOKENS, PICK_MODEL, PICK_TEMPERATURE
+from token_accounting import usage_report
+from tracing import span
+
+# 保持する結果の件数（ドラフトを行き来しても再問い合わせしないため）
+CACHE_SIZE = 32
+# 実行中の古い問い合わせが新しいものを塞がないよう 2 本まで並列にする
+MAX_WORKERS = 2
+
+
+class SuggestionPrefetcher(QObject):
+    """ドラフト状態をキーに AI 提案を非同期取得・キャッシュする"""
+
+    # ワーカースレッドから emit され、受信側（GUI スレッド）へはキュー経由で届く
+    ready = Signal(object, object)  # (key, {"text": str, "report": dict, "elapsed_ms": float})
+    failed = Signal(object, str)  # (key, エラーメッセージ)
+
+    def __init__(self, client, timeout: float, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pick-prefetch")
+        self._cache = OrderedDict()
+        self._inflight = {}
+        # 画面が結果を待っている key（新しい先読みが来ても取り消さない）
+        self._awaited = set()
+        self.ready.connect(self._store)
+        self.failed.connect(self._forget)
+
+    def get(self, key):
+        """キャッシュ済みの結果を返す（無ければ None）"""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def is_pending(self, key) -> bool:
+        return key in self._inflight
+
+    def request(self, key, messages: list[dict], awaited: bool = False):
+        """key の結果が無ければ問い合わせを開始する。まだ始まっていない古い問い合わせは取り消す。
+        awaited=True（ボタンで要求した）の key は、結果か失敗が届くまで取り消さない"""
+        if awaited:
+            self._awaited.add(key)
+        if key in self._cache or key in self._inflight:
+            return
+        for old_key, fut in list(self._inflight.items()):
+            if old_key in self._awaited:
+                continue
+            if fut.cancel():
+                del self._inflight[old_key]
+        fut = self._executor.submit(self._fetch, key, messages)
+        self._inflight[key] = fut
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, key, messages: list[dict]):
+        try:
+            started = time.perf_counter()
+            with span("api.pick_suggestion"):
+                response = self.client.chat_completion(
+                    model=PICK_MODEL,
+                    timeout=self.timeout,
+                    messages=messages,
+                    temperature=PICK_TEMPERATURE,
+                    max_tokens=PICK_MAX_TOKENS,
+                )
+            try:
+                text = response.choices[0].message.content or ""
+            except Exception:
+                text = str(response)
+            self.ready.emit(key, {
+                "text": text.strip(),
+                "report": usage_report(response, PICK_MODEL),
+                "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+            })
+        except Exception as e:
+            self.failed.emit(key, str(e))
+
+    def _store(self, key, result):
+        self._inflight.pop(key, None)
+        self._awaited.discard(key)
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _forget(self, key, _message):
+        self._inflight.pop(key, None)
+        self._awaited.discard(key)
@@ -0,0 +1,60 @@
+"""ピック提案用のプロンプト。
+
+固定の指示文はすべてシステムプロンプトにまとめて毎回同一の先頭部分として送る
+（プロバイダ側のプロンプトキャッシュが効くよう、可変部分より前に置く）。
+ドラフト状況は可変部分として、コンパクトな JSON でユーザーメッセージに載せる。
+"""
+import json
+
+PICK_MODEL = "gpt-4.1-mini"
+PICK_MAX_TOKENS = 600
+PICK_TEMPERATURE = 0.6
+
+PICK_SYSTEM_PROMPT = (
+    "あなたはLoLについて非常に詳しいコーチであり、League of Legends のドラフトフェーズ専門アナリストです。"
+    "助言は日本語で簡潔に行ってください。"
+    "OP.GGなどの統計系サイト、公式のLOL情報、LoL wiki、SNSでのトッププレイヤーの傾向を考慮して最適なピックを提案してください。"
+    "パッチ15.23のメタ、ロールごとの強弱、ピック構成、チャンピオン相性、シナジー、カウンター、パワースパイク、"
+    "エンゲージ/ディスエンゲージ構成、レンジ差、役割の補完などを深く理解しています。"
+    "\n\n【入力形式】ユーザーメッセージは JSON で与えられます。"
+    "bans: バン一覧 / allies: 味方の既ピック（ロール→チャンピオン）/ enemies: 敵の既ピック / role: 自分のロール"
+    "（\"不特定\" はロール未指定）/ candidates: ローカルの推薦エンジンが算出した上位候補（任意）。"
+    "\n\n【出力内容】"
+    "1. 最適ピック候補（最大3体）: ユーザーのロールで適切に運用できるチャンピオンを選んでください。"
+    "candidates がある場合は原則その中から選び、選んだ理由を解説してください。"
+    "2. 推奨理由（以下の観点で詳細に説明）:"
+    " - 対面ロールが確定している場合のレーン相性（有利ポイント / 不利ポイント）"
+    " - 味方構成とのシナジー（エンゲージ、ディスエンゲージ、CC連携、スケーリングの噛み合い）"
+    " - 敵構成へのカウンター要素（レンジ差、耐久 vs バースト、分断能力、エンゲージ耐性など）"
+    " - チーム構成バランス（AD/AP、前衛/後衛、CC量、オブジェクト戦力）"
+    "\n\n【ルール】"
+    " - BANされたチャンピオンは必ず候補から除外してください。"
+    " - ユーザーのロールに適したチャンピオンのみ提案してください。"
+    " - 敵のロールが曖昧な場合は「仮定」を明示し、その上で分析を行ってください。"
+    " - 可能な限り具体的な理由を提示し、抽象的な回答は避けてください。"
+    " - 現パッチの一般的なメタ傾向や構成理論に基づいた説明をしてください。"
+    " - 600トークン以内に収めてください。"
+)
+
+
+def build_draft_payload(bans: list[str], allies: dict[str, str], enemies: list[str], role: str,
+                        candidates: list[str] | None = None) -> str:
+    """ドラフト状況を区切り文字を詰めた JSON 文字列にする（空の項目は省略）"""
+    data = {"role": role}
+    if bans:
+        data["bans"] = bans
+    if allies:
+        data["allies"] = allies
+    if enemies:
+        data["enemies"] = enemies
+    if candidates:
+        data["candidates"] = candidates
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def build_pick_messages(bans: list[str], allies: dict[str, str], enemies: list[str], role: str,
+                        candidates: list[str] | None = None) -> list[dict]:
+    return [
+        {"role": "system", "content": PICK_SYSTEM_PROMPT},
+        {"role": "user", "content": build_draft_payload(bans, allies, enemies, role, candidates)},
+    ]
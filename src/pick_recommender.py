@@ -0,0 +1,128 @@
+"""オフラインで動くローカルのピック推薦エンジン。
+
+チャンピオン一覧（champion_names_ja.json）と、ロール適性・シナジー・カウンターを記述した
+ローカルデータ（pick_data.json）から行列を作り、全候補のスコアを NumPy で一括計算する。
+Qt や OpenAI には依存しない。
+
+pick_data.json の形式:
+    {
+      "roles":   {"トップ": ["ダリウス", ...], "ジャングル": [...], ...},
+      "synergy": [["ザヤ", "ラカン", 1.0], ...],   # 味方同士の相性（対称）
+      "counter": [["ポッピー", "ヤスオ", 0.8], ...] # 前者が後者に強い（逆向きは同値で減点）
+    }
+"""
+import json
+import os
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAMPION_JSON = os.path.join(ROOT_DIR, "champion_names_ja.json")
+PICK_DATA_JSON = os.path.join(ROOT_DIR, "pick_data.json")
+
+ROLES = ["トップ", "ジャングル", "ミッド", "ADC", "サポート"]
+NO_CHAMPION = "指定なし"
+
+# スコアの重み
+ROLE_WEIGHT = 2.0  # ロール適性があれば加点
+UNKNOWN_ROLE_PRIOR = 0.5  # ロール表に載っていないチャンピオンの適性（0〜1）
+SYNERGY_WEIGHT = 1.0
+COUNTER_WEIGHT = 1.0
+
+
+def load_roster(path: str = CHAMPION_JSON) -> list[str]:
+    """チャンピオン名一覧を読み込む（先頭は必ず「指定なし」）"""
+    with open(path, "r", encoding="utf-8") as f:
+        names = json.load(f)
+    if NO_CHAMPION not in names:
+        names.insert(0, NO_CHAMPION)
+    return names
+
+
+class PickRecommender:
+    """ロール適性 × シナジー × カウンターの線形スコアで候補を順位付けする"""
+
+    def __init__(self, names: list[str], roles: dict | None = None,
+                 synergy: list | None = None, counter: list | None = None):
+        self.names = list(names)
+        self.index = {n: i for i, n in enumerate(self.names)}
+        n = len(self.names)
+
+        # ロール適性: (チャンピオン数, ロール数)。表に載っていない場合は全ロールに事前値
+        self.role_fit = np.zeros((n, len(ROLES)), dtype=np.float32)
+        listed = np.zeros(n, dtype=bool)
+        for r, role in enumerate(ROLES):
+            for name in (roles or {}).get(role, []):
+                i = self.index.get(name)
+                if i is not None:
+                    self.role_fit[i, r] = 1.0
+                    listed[i] = True
+        self.role_fit[~listed] = UNKNOWN_ROLE_PRIOR
+
+        # synergy[i, j]: i を選んだときに味方 j から得る加点
+        self.synergy = np.zeros((n, n), dtype=np.float32)
+        for a, b, w in synergy or []:
+            i, j = self.index.get(a), self.index.get(b)
+            if i is not None and j is not None:
+                self.synergy[i, j] = self.synergy[j, i] = float(w)
+
+        # counter[i, j]: i を選んだときに敵 j に対して得る加点
+        self.counter = np.zeros((n, n), dtype=np.float32)
+        for a, b, w in counter or []:
+            i, j = self.index.get(a), self.index.get(b)
+            if i is not None and j is not None:
+                self.counter[i, j] = float(w)
+                self.counter[j, i] = -float(w)
+
+        # 「指定なし」は常に候補外
+        self._always_excluded = np.zeros(n, dtype=bool)
+        if NO_CHAMPION in self.index:
+            self._always_excluded[self.index[NO_CHAMPION]] = True
+
+    @classmethod
+    def load(cls, roster_path: str = CHAMPION_JSON, data_path: str = PICK_DATA_JSON) -> "PickRecommender":
+        names = load_roster(roster_path)
+        data = {}
+        if os.path.exists(data_path):
+            with open(data_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        return cls(names, data.get("roles"), data.get("synergy"), data.get("counter"))
+
+    def _indices(self, names) -> list[int]:
+        return [self.index[n] for n in names if n in self.index]
+
+    def score_all(self, role: str | None, allies: dict[str, str], enemies: list[str],
+                  bans: list[str]) -> np.ndarray:
+        """全チャンピオンのスコアを 1 回の行列演算で求める（除外対象は -inf）"""
+        if role in ROLES:
+            fit = self.role_fit[:, ROLES.index(role)]
+        else:
+            # ロール未指定なら、味方がまだ埋めていないロールのうち最も適性の高いもの
+            open_cols = [r for r, name in enumerate(ROLES) if name not in allies] or list(range(len(ROLES)))
+            fit = self.role_fit[:, open_cols].max(axis=1)
+
+        ally_idx = self._indices(allies.values())
+        enemy_idx = self._indices(enemies)
+        score = ROLE_WEIGHT * fit
+        if ally_idx:
+            score = score + SYNERGY_WEIGHT * self.synergy[:, ally_idx].sum(axis=1)
+        if enemy_idx:
+            score = score + COUNTER_WEIGHT * self.counter[:, enemy_idx].sum(axis=1)
+
+        excluded = self._always_excluded.copy()
+        excluded[self._indices(bans)] = True
+        excluded[ally_idx] = True
+        excluded[enemy_idx] = True
+        return np.where(excluded, -np.inf, score)
+
+    def recommend(self, role: str | None, allies: dict[str, str], enemies: list[str],
+                  bans: list[str], top_k: int = 5) -> list[tuple[str, float]]:
+        """スコア上位 top_k 件を (名前, スコア) の降順リストで返す"""
+        score = self.score_all(role, allies, enemies, bans)
+        valid = int(np.isfinite(score).sum())
+        k = min(top_k, valid)
+        if k <= 0:
+            return []
+        # 候補数は高々数百なので全体を安定ソートし、同点は一覧順で決定的にする
+        top = np.argsort(-score, kind="stable")[:k]
+        return [(self.names[i], float(score[i])) for i in top]
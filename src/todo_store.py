@@ -0,0 +1,20 @@
+"""Todo の保存形式（JSON 配列）の読み書き。Qt に依存しないため CLI などからも利用できる。"""
+import json
+import os
+
+TODO_FILE = "todos.json"
+
+
+def read_todos(path: str = TODO_FILE) -> list[str]:
+    """JSON ファイルから Todo 一覧を読み込む。ファイルが無ければ空リストを返す。"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        todos = json.load(f)
+    return [str(t) for t in todos]
+
+
+def write_todos(todos: list[str], path: str = TODO_FILE):
+    """Todo 一覧を JSON ファイルに保存する"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(list(todos), f, ensure_ascii=False, indent=2)
@@ -1,5 +1,4 @@
 import os
-import json
 from PySide6.QtWidgets import (
     QWidget, QListWidget, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout,
     QListWidgetItem, QMessageBox, QGraphicsDropShadowEffect, QLabel
@@ -7,7 +6,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont, QColor
 
-TODO_FILE = "todos.json"
+from todo_store import TODO_FILE, read_todos, write_todos
 
 
 class TodoTab(QWidget):
@@ -150,8 +149,7 @@ class TodoTab(QWidget):
         try:
             # None チェックを追加して安全にテキストを取得
             todos = [self.list_widget.item(i).text() for i in range(self.list_widget.count()) if self.list_widget.item(i) is not None]
-            with open(TODO_FILE, "w", encoding="utf-8") as f:
-                json.dump(todos, f, ensure_ascii=False, indent=2)
+            write_todos(todos, TODO_FILE)
             QMessageBox.information(self, "保存", f"TODO を保存しました ({TODO_FILE})")
         except Exception as e:
             QMessageBox.critical(self, "保存エラー", f"保存に失敗しました:\n{e}")
@@ -161,11 +159,10 @@ class TodoTab(QWidget):
         if not os.path.exists(TODO_FILE):
             return
         try:
-            with open(TODO_FILE, "r", encoding="utf-8") as f:
-                todos = json.load(f)
+            todos = read_todos(TODO_FILE)
             self.list_widget.clear()
             for t in todos:
-                item = QListWidgetItem(str(t))
+                item = QListWidgetItem(t)
                 item.setFlags(item.flags() | Qt.ItemIsEditable | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
                 self.list_widget.addItem(item)
         except Exception as e:
@@ -0,0 +1,105 @@
+"""トークン数の見積もりと API 利用料の集計。
+
+tiktoken がインストールされていれば正確に数え、無ければ文字種ごとの近似で見積もる。
+"""
+import threading
+import unicodedata
+
+# 100 万トークンあたりの料金（USD）: (入力, キャッシュ済み入力, 出力)
+MODEL_PRICING_PER_1M = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "text-embedding-3-small": (0.02, 0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.13, 0.0),
+}
+
+# チャット形式のメッセージ 1 件ごとに付く制御トークンの概算
+_PER_MESSAGE_OVERHEAD = 3
+_REPLY_PRIMING = 3
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """テキストのトークン数を見積もる"""
+    if not text:
+        return 0
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    # 近似: 日本語などの全角文字は 1 文字 ≒ 1 トークン、半角は 4 文字 ≒ 1 トークン
+    wide = 0
+    narrow = 0
+    for ch in text:
+        if unicodedata.east_asian_width(ch) in ("W", "F"):
+            wide += 1
+        else:
+            narrow += 1
+    return wide + (narrow + 3) // 4
+
+
+def estimate_messages_tokens(messages: list[dict]) -> int:
+    """Chat Completions に渡すメッセージ列の入力トークン数を見積もる"""
+    total = _REPLY_PRIMING
+    for m in messages:
+        total += _PER_MESSAGE_OVERHEAD + estimate_tokens(str(m.get("content", "")))
+    return total
+
+
+def usage_report(response, model: str) -> dict:
+    """API 応答の usage からトークン数と料金（USD）をまとめる"""
+    usage = getattr(response, "usage", None)
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    price_in, price_cached, price_out = MODEL_PRICING_PER_1M.get(model, (0.0, 0.0, 0.0))
+    cost = ((prompt - cached) * price_in + cached * price_cached + completion * price_out) / 1_000_000
+    return {
+        "model": model,
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "completion_tokens": completion,
+        "cost_usd": cost,
+    }
+
+
+def format_usage(report: dict) -> str:
+    return (
+        f"トークン: 入力 {report['prompt_tokens']}（キャッシュ {report['cached_tokens']}）"
+        f" / 出力 {report['completion_tokens']}　料金: ${report['cost_usd']:.5f}"
+    )
+
+
+class TokenLedger:
+    """セッション中の累計トークン数・料金を保持する（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+
+    def add(self, report: dict):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += report["prompt_tokens"]
+            self.cached_tokens += report["cached_tokens"]
+            self.completion_tokens += report["completion_tokens"]
+            self.cost_usd += report["cost_usd"]
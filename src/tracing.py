@@ -0,0 +1,113 @@
+"""軽量トレーシング層。
+
+スパン（処理区間）の所要時間をリングバッファに記録し、p50/p95 などの統計や
+Chrome の trace event 形式（chrome://tracing / Perfetto で開ける JSON）への書き出しを提供する。
+Qt には依存しないため、GUI 以外（CLI やバッチ）からも利用できる。
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# リングバッファに保持するスパン数の上限（古いものから捨てる）
+DEFAULT_CAPACITY = 4096
+
+# 環境変数でトレースファイルの出力先を指定すると、アプリ終了時に書き出す
+TRACE_FILE_ENV = "DIARYAPP_TRACE_FILE"
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """ソート済みリストから nearest-rank 法でパーセンタイル値を求める"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Tracer:
+    """スパン計測を行うトレーサ。スレッドセーフで、記録はリングバッファに保持する。"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        # 各要素: (name, start_ns, dur_ns, thread_id)
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self.enabled = True
+
+    @contextmanager
+    def span(self, name: str):
+        """with 文で囲んだ区間の所要時間を記録する"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns() - start)
+
+    def traced(self, name: str | None = None):
+        """関数全体を計測するデコレータ（Qt のスロットには span() を使うこと）"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name: str, start_ns: int, dur_ns: int):
+        with self._lock:
+            self._records.append((name, start_ns, dur_ns, threading.get_ident()))
+
+    def records(self) -> list:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def stats(self) -> dict:
+        """スパン名ごとの件数と p50/p95/最大（ミリ秒）を返す"""
+        durations = {}
+        for name, _start, dur, _tid in self.records():
+            durations.setdefault(name, []).append(dur / 1e6)
+        result = {}
+        for name, values in durations.items():
+            values.sort()
+            result[name] = {
+                "count": len(values),
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "max_ms": values[-1],
+            }
+        return result
+
+    def export_chrome_trace(self, path: str):
+        """Chrome trace event 形式の JSON として書き出す"""
+        pid = os.getpid()
+        events = []
+        for name, start, dur, tid in self.records():
+            events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin_ns) / 1000.0,
+                "dur": dur / 1000.0,
+                "pid": pid,
+                "tid": tid,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+# アプリ全体で共有するトレーサ
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
@@ -0,0 +1,278 @@
+"""週・月の複数日タイムライン表示。
+
+日ごとの列を横に並べ、縦は日のタイムライン（06:00 〜 翌日 06:00）と同じ目盛り・倍率で描く。
+描画はスクロール位置から見えている列・時間帯だけを対象にし、列の背景（グリッド線）は
+1 列分を QPixmap に描いておいて全列で使い回す（目盛り・倍率・列幅が変わったときだけ作り直す）。
+日記は表示される列の分だけ diary_store から読み、最近使った日を DayCache に保持する。
+"""
+import datetime
+from collections import OrderedDict
+
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QColor, QFont, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import QAbstractScrollArea, QToolTip
+
+from diary_store import DAY_START_MIN, DAY_TOTAL_MINUTES, DIARIES_DIR, format_minutes, read_day
+
+# 読み込んだ日記を保持する日数（月表示 2 画面分程度）
+DAY_CACHE_SIZE = 64
+
+HEADER_HEIGHT = 28
+TIME_GUTTER_WIDTH = 50
+# 列幅の下限。月表示ではこれより狭くせず横スクロールにする
+MIN_COLUMN_WIDTH = 90
+
+WEEKDAY_LABELS = "月火水木金土日"
+
+
+class DayCache:
+    """日付 → イベント一覧の LRU。読めない日（JSON でない等）は空として扱う"""
+
+    def __init__(self, capacity: int = DAY_CACHE_SIZE, diaries_dir: str = DIARIES_DIR):
+        self.capacity = capacity
+        self.diaries_dir = diaries_dir
+        self._days = OrderedDict()
+
+    def get(self, date: datetime.date) -> list[dict]:
+        events = self._days.get(date)
+        if events is not None:
+            self._days.move_to_end(date)
+            return events
+        try:
+            events = read_day(date, self.diaries_dir) or []
+        except (OSError, ValueError):
+            events = []
+        # 描画時に開始時刻順で走査して打ち切れるよう並べておく
+        events = sorted(events, key=lambda ev: ev["start"])
+        self._days[date] = events
+        if len(self._days) > self.capacity:
+            self._days.popitem(last=False)
+        return events
+
+    def invalidate(self, date: datetime.date | None = None):
+        """保存などで内容が変わった日を捨てる（None なら全部）"""
+        if date is None:
+            self._days.clear()
+        else:
+            self._days.pop(date, None)
+
+
+def week_range(date: datetime.date) -> tuple[datetime.date, int]:
+    """date を含む週（月曜始まり）の (初日, 日数)"""
+    return date - datetime.timedelta(days=date.weekday()), 7
+
+
+def month_range(date: datetime.date) -> tuple[datetime.date, int]:
+    """date を含む月の (初日, 日数)"""
+    first = date.replace(day=1)
+    next_month = (first + datetime.timedelta(days=32)).replace(day=1)
+    return first, (next_month - first).days
+
+
+class MultiDayView(QAbstractScrollArea):
+    """複数日の列を並べたタイムライン。列をダブルクリックすると day_activated_callback(date) を呼ぶ"""
+
+    def __init__(self, cache: DayCache | None = None, parent=None):
+        super().__init__(parent)
+        self.cache = cache if cache is not None else DayCache()
+        self.start_min = DAY_START_MIN
+        self.total_minutes = DAY_TOTAL_MINUTES
+        self.slot_minutes = 15
+        self.slot_height = 12
+        self.first_date = datetime.date.today()
+        self.days = 7
+        self.day_activated_callback = None
+
+        self._label_font = QFont("Yu Gothic UI", 9)
+        self._grid_cache = None  # ((列幅, 目盛り, 高さ), QPixmap)
+        self._minute_y = []
+        self._rebuild_geometry()
+
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.viewport().setAttribute(Qt.WA_OpaquePaintEvent)
+
+    # ---------- 表示範囲・目盛り ----------
+    def set_range(self, first_date: datetime.date, days: int):
+        self.first_date = first_date
+        self.days = max(1, days)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def set_scale(self, slot_minutes: int, slot_height: int):
+        """日のタイムラインと同じ目盛り（分）と 1 目盛りの高さにそろえる"""
+        if (slot_minutes, slot_height) == (self.slot_minutes, self.slot_height):
+            return
+        self.slot_minutes = slot_minutes
+        self.slot_height = slot_height
+        self._rebuild_geometry()
+
+    def date_at(self, index: int) -> datetime.date:
+        return self.first_date + datetime.timedelta(days=index)
+
+    def _rebuild_geometry(self):
+        self.content_height = self.slot_height * (self.total_minutes // self.slot_minutes)
+        px_per_min = self.slot_height / self.slot_minutes
+        self._minute_y = [int(round(m * px_per_min)) for m in range(self.total_minutes + 1)]
+        self._hour_labels = [
+            (self._minute_y[m], f"{((self.start_min + m) // 60) % 24:02d}:00")
+            for m in range(0, self.total_minutes + 1, max(60, self.slot_minutes))
+        ]
+        self._grid_cache = None
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def _y_for_minutes(self, minutes: int) -> int:
+        offset = max(0, min(self.total_minutes, minutes - self.start_min))
+        return self._minute_y[offset]
+
+    def column_width(self) -> int:
+        available = self.viewport().width() - TIME_GUTTER_WIDTH
+        return max(MIN_COLUMN_WIDTH, available // self.days)
+
+    def _update_scrollbars(self):
+        view = self.viewport()
+        content_w = self.column_width() * self.days
+        h_bar = self.horizontalScrollBar()
+        h_bar.setRange(0, max(0, content_w - (view.width() - TIME_GUTTER_WIDTH)))
+        h_bar.setPageStep(view.width())
+        h_bar.setSingleStep(self.column_width() // 4)
+        v_bar = self.verticalScrollBar()
+        v_bar.setRange(0, max(0, self.content_height - (view.height() - HEADER_HEIGHT)))
+        v_bar.setPageStep(view.height())
+        v_bar.setSingleStep(self.slot_height)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        # 見出し・時刻欄は固定なので画面のずらしコピーは使わず描き直す（見えている分だけなので軽い）
+        self.viewport().update()
+
+    # ---------- 描画 ----------
+    def _grid_pixmap(self, col_w: int) -> QPixmap:
+        """1 列分の背景（グリッド線と左の区切り線）。全列で共有する"""
+        key = (col_w, self.slot_minutes, self.slot_height)
+        if self._grid_cache is not None and self._grid_cache[0] == key:
+            return self._grid_cache[1]
+        pix = QPixmap(col_w, max(1, self.content_height))
+        pix.fill(QColor("#ffffff"))
+        p = QPainter(pix)
+        # 目盛りが細かいときは 1 時間ごとの線だけ濃くする
+        hour_pen = QPen(QColor("#e2e6ec"))
+        slot_pen = QPen(QColor("#f3f4f6"))
+        slots = self.total_minutes // self.slot_minutes
+        for i in range(slots + 1):
+            minute = i * self.slot_minutes
+            p.setPen(hour_pen if (self.start_min + minute) % 60 == 0 else slot_pen)
+            y = self._minute_y[minute]
+            p.drawLine(0, y, col_w, y)
+        p.setPen(QPen(QColor("#e2e6ec")))
+        p.drawLine(0, 0, 0, self.content_height)
+        p.end()
+        self._grid_cache = (key, pix)
+        return pix
+
+    def paintEvent(self, event):
+        view = self.viewport()
+        painter = QPainter(view)
+        painter.fillRect(event.rect(), QColor("#ffffff"))
+        painter.setFont(self._label_font)
+        fm = painter.fontMetrics()
+
+        col_w = self.column_width()
+        sx = self.horizontalScrollBar().value()
+        sy = self.verticalScrollBar().value()
+        body_h = view.height() - HEADER_HEIGHT
+        body_w = view.width() - TIME_GUTTER_WIDTH
+
+        # 見えている列と時間帯だけ
+        first_col = max(0, sx // col_w)
+        last_col = min(self.days - 1, (sx + body_w) // col_w)
+        top_min = self.start_min + sy * self.slot_minutes // max(1, self.slot_height)
+        bottom_min = self.start_min + (sy + body_h) * self.slot_minutes // max(1, self.slot_height) + self.slot_minutes
+
+        grid = self._grid_pixmap(col_w)
+        today = datetime.date.today()
+        painter.save()
+        painter.setClipRect(TIME_GUTTER_WIDTH, HEADER_HEIGHT, body_w, body_h)
+        for col in range(first_col, last_col + 1):
+            x = TIME_GUTTER_WIDTH + col * col_w - sx
+            painter.drawPixmap(QRect(x, HEADER_HEIGHT, col_w, body_h), grid, QRect(0, sy, col_w, body_h))
+            date = self.date_at(col)
+            if date == today:
+                painter.fillRect(QRect(x + 1, HEADER_HEIGHT, col_w - 1, body_h), QColor(102, 163, 255, 18))
+            for ev in self.cache.get(date):
+                if ev["start"] >= bottom_min:
+                    break  # 開始時刻順なので以降は画面より下
+                if ev["end"] <= top_min:
+                    continue
+                top = self._y_for_minutes(ev["start"])
+                rect = QRect(x + 4, HEADER_HEIGHT + top - sy + 1, col_w - 8,
+                             max(2, self._y_for_minutes(ev["end"]) - top - 1))
+                painter.setPen(QPen(QColor("#66a3ff")))
+                painter.setBrush(QColor(102, 163, 255, 220))
+                painter.drawRoundedRect(rect, 4, 4)
+                if rect.height() >= fm.height():
+                    painter.setPen(QColor("#ffffff"))
+                    text = fm.elidedText(ev.get("title") or "(無題)", Qt.ElideRight, rect.width() - 6)
+                    painter.drawText(rect.adjusted(3, 0, -3, 0), Qt.AlignTop | Qt.AlignLeft, text)
+        painter.restore()
+
+        # 左の時刻欄（縦スクロールだけ追従）
+        painter.fillRect(QRect(0, HEADER_HEIGHT, TIME_GUTTER_WIDTH, body_h), QColor("#ffffff"))
+        painter.setPen(QColor("#666666"))
+        for y, label in self._hour_labels:
+            y = HEADER_HEIGHT + y - sy
+            if HEADER_HEIGHT <= y <= view.height():
+                painter.drawText(6, y + fm.ascent() // 2, label)
+
+        # 上の日付見出し（横スクロールだけ追従）
+        painter.fillRect(QRect(0, 0, view.width(), HEADER_HEIGHT), QColor("#f7f8fb"))
+        painter.save()
+        painter.setClipRect(TIME_GUTTER_WIDTH, 0, body_w, HEADER_HEIGHT)
+        for col in range(first_col, last_col + 1):
+            x = TIME_GUTTER_WIDTH + col * col_w - sx
+            date = self.date_at(col)
+            weekday = date.weekday()
+            color = "#1f4f8b" if date == today else ("#c0504d" if weekday == 6 else "#444444")
+            painter.setPen(QColor(color))
+            painter.drawText(QRect(x, 0, col_w, HEADER_HEIGHT), Qt.AlignCenter,
+                             f"{date.month}/{date.day}（{WEEKDAY_LABELS[weekday]}）")
+        painter.restore()
+
+    # ---------- 操作 ----------
+    def _column_at(self, x: int) -> int | None:
+        if x < TIME_GUTTER_WIDTH:
+            return None
+        col = (x - TIME_GUTTER_WIDTH + self.horizontalScrollBar().value()) // self.column_width()
+        return col if 0 <= col < self.days else None
+
+    def mouseDoubleClickEvent(self, event):
+        col = self._column_at(event.pos().x())
+        if col is not None and self.day_activated_callback:
+            self.day_activated_callback(self.date_at(col))
+
+    def viewportEvent(self, event):
+        # イベントのツールチップ（時刻・タイトル・場所）
+        if event.type() == event.Type.ToolTip:
+            self._show_tooltip(event)
+            return True
+        return super().viewportEvent(event)
+
+    def _show_tooltip(self, event):
+        col = self._column_at(event.pos().x())
+        y = event.pos().y() - HEADER_HEIGHT + self.verticalScrollBar().value()
+        if col is None or event.pos().y() < HEADER_HEIGHT:
+            QToolTip.hideText()
+            return
+        minute = self.start_min + y * self.slot_minutes // max(1, self.slot_height)
+        for ev in self.cache.get(self.date_at(col)):
+            if ev["start"] <= minute < ev["end"]:
+                text = f"{format_minutes(ev['start'])}-{format_minutes(ev['end'])} {ev.get('title') or '(無題)'}"
+                if ev.get("location"):
+                    text += f"\n{ev['location']}"
+                QToolTip.showText(event.globalPos(), text, self.viewport())
+                return
+        QToolTip.hideText()
@@ -0,0 +1,5 @@
+"""src/ のモジュールはアプリと同じくモジュール名だけで import する"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
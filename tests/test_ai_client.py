@@ -0,0 +1,158 @@
+"""AIClient の再試行・レート制限のテスト（httpx.MockTransport でサーバー応答を差し替える）"""
+import json
+
+import httpx
+import pytest
+from openai import APIStatusError
+
+import ai_client
+from ai_client import AIClient, BACKOFF_MAX_S
+
+BASE_URL = "http://mock.local/v1"
+
+COMPLETION = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4.1-mini",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+}
+
+
+class FakeClock:
+    """time.sleep / time.monotonic を置き換え、待ち時間を記録する"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ai_client.time, "sleep", fake.sleep)
+    monkeypatch.setattr(ai_client.time, "monotonic", fake.monotonic)
+    return fake
+
+
+def _client(responses: list, max_retries: int = 3) -> tuple[AIClient, list]:
+    """responses を順に返すモックサーバーに向けたクライアントと、受けたリクエストの一覧"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[min(len(requests), len(responses)) - 1]
+
+    client = AIClient("test-key", base_url=BASE_URL, max_retries=max_retries,
+                      transport=httpx.MockTransport(handler))
+    return client, requests
+
+
+def _ok(headers=None) -> httpx.Response:
+    return httpx.Response(200, json=COMPLETION, headers=headers or {})
+
+
+def _error(status: int, headers=None) -> httpx.Response:
+    return httpx.Response(status, json={"error": {"message": "error", "type": "server_error"}}, headers=headers or {})
+
+
+def _ask(client: AIClient):
+    return client.chat_completion([{"role": "user", "content": "hi"}], timeout=1.0)
+
+
+def test_success_parses_response_and_accounts_tokens(clock):
+    client, requests = _client([_ok()])
+    response = _ask(client)
+    assert response.choices[0].message.content == "ok"
+    assert len(requests) == 1
+    assert json.loads(requests[0].content)["messages"][0]["content"] == "hi"
+    assert client.usage.prompt_tokens == 10
+    assert clock.sleeps == []
+
+
+def test_429_waits_for_retry_after_then_succeeds(clock):
+    client, requests = _client([_error(429, {"retry-after": "2"}), _ok()])
+    assert _ask(client).choices[0].message.content == "ok"
+    assert len(requests) == 2
+    assert clock.sleeps == [2.0]
+
+
+def test_retry_after_ms_takes_precedence(clock):
+    client, _requests = _client([_error(429, {"retry-after-ms": "250", "retry-after": "9"}), _ok()])
+    _ask(client)
+    assert clock.sleeps == [0.25]
+
+
+def test_retry_after_is_capped(clock):
+    client, _requests = _client([_error(503, {"retry-after": "3600"}), _ok()])
+    _ask(client)
+    assert clock.sleeps == [BACKOFF_MAX_S * 4]
+
+
+def test_5xx_backs_off_with_growing_cap(clock, monkeypatch):
+    # full jitter の上限（0.5, 1, 2 秒）がそのまま返るようにする
+    monkeypatch.setattr(ai_client.random, "uniform", lambda low, high: high)
+    client, requests = _client([_error(500), _error(502), _error(503), _ok()])
+    assert _ask(client).choices[0].message.content == "ok"
+    assert len(requests) == 4
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+
+
+def test_gives_up_after_max_retries(clock):
+    client, requests = _client([_error(503)], max_retries=2)
+    with pytest.raises(APIStatusError) as excinfo:
+        _ask(client)
+    assert excinfo.value.status_code == 503
+    assert len(requests) == 3  # 最初の 1 回 + 再試行 2 回
+    assert len(clock.sleeps) == 2
+
+
+def test_non_retryable_status_is_raised_immediately(clock):
+    client, requests = _client([_error(400), _ok()])
+    with pytest.raises(APIStatusError):
+        _ask(client)
+    assert len(requests) == 1
+    assert clock.sleeps == []
+
+
+def test_exhausted_rate_limit_delays_next_request(clock):
+    headers = {
+        "x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1.5s",
+        "x-ratelimit-remaining-tokens": "5000", "x-ratelimit-reset-tokens": "6m0s",
+    }
+    client, _requests = _client([_ok(headers), _ok()])
+    _ask(client)
+    assert client._not_before == pytest.approx(clock.now + 1.5)
+    assert client.last_rate_limit["x-ratelimit-remaining-requests"] == "0"
+    # 次の呼び出しはリセットまで待ってから送る
+    _ask(client)
+    assert clock.sleeps == [pytest.approx(1.5)]
+
+
+def test_rate_limit_headers_on_error_are_honoured(clock):
+    headers = {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "250ms", "retry-after": "0"}
+    client, _requests = _client([_error(429, headers), _ok()])
+    _ask(client)
+    # Retry-After（0 秒）の後、トークン枯渇のリセット（0.25 秒）まで待つ
+    assert clock.sleeps == [0.0, pytest.approx(0.25)]
+
+
+def test_remaining_rate_limit_does_not_delay(clock):
+    headers = {"x-ratelimit-remaining-requests": "10", "x-ratelimit-reset-requests": "1s"}
+    client, _requests = _client([_ok(headers), _ok()])
+    _ask(client)
+    _ask(client)
+    assert client._not_before == 0.0
+    assert clock.sleeps == []
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1s", 1.0), ("6m0s", 360.0), ("250ms", 0.25), ("1h2m", 3720.0), ("", None), ("soon", None),
+])
+def test_parse_duration(value, expected):
+    assert ai_client._parse_duration(value) == expected
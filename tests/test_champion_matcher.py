@@ -0,0 +1,93 @@
+"""champion_matcher（OCR テキストのあいまい検索）のテスト"""
+import json
+import os
+
+import pytest
+
+from champion_matcher import ChampionMatcher, approximate_find, max_errors_for, to_hiragana, to_romaji
+
+ROSTER_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "champion_names_ja.json")
+
+
+@pytest.fixture(scope="module")
+def roster() -> list[str]:
+    with open(ROSTER_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def matcher(roster) -> ChampionMatcher:
+    return ChampionMatcher(roster)
+
+
+def test_to_hiragana_normalizes_width_kana_case_and_separators():
+    assert to_hiragana("ﾂｲｽﾃｯﾄﾞ・フェイト") == "ついすてっどふぇいと"
+    assert to_hiragana(" Xin Zhao ") == "xinzhao"
+    assert to_hiragana("") == ""
+
+
+def test_to_romaji():
+    assert to_romaji("ダリウス") == "dariusu"
+    assert to_romaji("ツイステッド・フェイト") == "tsuisuteddofeito"
+    assert to_romaji("アーリ") == "ari"
+
+
+def test_exact_names_are_found_in_order_of_appearance(matcher):
+    assert matcher.find_in_text("敵: ダリウス、味方: ジンクス") == [("ダリウス", 1.0), ("ジンクス", 1.0)]
+
+
+def test_one_misread_character_is_recovered(matcher):
+    # 「ス」を「ヌ」と誤認識しても 4 文字の名前なら 1 文字までは許容する
+    assert matcher.find_in_text("ダリウヌ") == [("ダリウス", 0.75)]
+
+
+def test_longer_names_tolerate_two_errors(matcher):
+    found = dict(matcher.find_in_text("ツイステッド・フヱイ卜"))
+    assert found["ツイステッド・フェイト"] == pytest.approx(1.0 - 2 / len("ついすてっどふぇいと"))
+
+
+def test_too_many_errors_are_rejected(matcher):
+    # 4 文字の名前で 2 文字違いは許容しない
+    assert matcher.find_in_text("ダソウヌ") == []
+
+
+def test_short_names_require_exact_match(matcher):
+    assert max_errors_for(3) == 0
+    assert matcher.find_in_text("アーリ") == [("アーリ", 1.0)]
+    assert matcher.find_in_text("アーソ") == []
+
+
+def test_romaji_input_is_matched(matcher):
+    assert matcher.find_in_text("DARIUSU を選択") == [("ダリウス", 1.0)]
+
+
+def test_english_alias_requires_alias_table(roster, matcher):
+    # 英語名は champion_aliases.json の別名を渡したときだけ解決できる
+    assert matcher.find_in_text("I pick ahri") == []
+    with_aliases = ChampionMatcher(roster, {"ahri": "アーリ"})
+    assert with_aliases.find_in_text("I pick ahri") == [("アーリ", 1.0)]
+
+
+def test_overlapping_names_are_resolved_once(matcher):
+    assert matcher.find_in_text("シンドラとリー・シン") == [("シンドラ", 1.0), ("リー・シン", 1.0)]
+
+
+def test_each_name_is_reported_once(matcher):
+    assert matcher.find_in_text("ダリウス ダリウス") == [("ダリウス", 1.0)]
+
+
+def test_no_champion_placeholder_is_not_indexed(matcher):
+    assert matcher.find_in_text("指定なし") == []
+
+
+def test_empty_and_noise_text(matcher):
+    assert matcher.find_in_text("") == []
+    assert matcher.find_in_text("12345 !!! ----") == []
+
+
+def test_approximate_find():
+    assert approximate_find("だりうす", "xxだりうすyy", 1) == (0, 6)
+    # 1 文字違い（置換でも末尾の欠落でも距離 1）
+    assert approximate_find("だりうす", "xxだりうぬyy", 1)[0] == 1
+    assert approximate_find("だりうす", "だそうぬ", 1) is None
+    assert approximate_find("", "abc", 1) is None
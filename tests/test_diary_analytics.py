@@ -0,0 +1,101 @@
+"""日記の時間集計（diary_analytics）のテスト"""
+import datetime
+import os
+
+import pytest
+
+import diary_analytics
+from diary_analytics import DiaryAnalytics, extract_tags
+from diary_store import day_path, write_day
+
+MON = datetime.date(2026, 10, 19)  # 月曜日
+
+
+def _day(n: int) -> datetime.date:
+    return MON + datetime.timedelta(days=n)
+
+
+def _event(start: int, minutes: int, title: str, location: str = "", reflection: str = "") -> dict:
+    return {"start": start, "end": start + minutes, "title": title, "location": location, "reflection": reflection}
+
+
+@pytest.fixture
+def analytics():
+    a = DiaryAnalytics()
+    a.update_day(_day(-1), [_event(540, 60, "読書")], None)  # 前の週の日曜
+    a.update_day(_day(0), [_event(540, 30, "読書", reflection="#趣味"), _event(600, 90, "仕事", "会社")], None)
+    a.update_day(_day(1), [_event(540, 45, "読書", reflection="#趣味 #読書")], None)
+    a.update_day(_day(13), [_event(540, 15, "散歩")], None)  # 翌々週の日曜（11 月 1 日）
+    return a
+
+
+def test_anchored_next_to_sources():
+    assert os.path.dirname(diary_analytics.ANALYTICS_FILE) == os.path.dirname(os.path.abspath(diary_analytics.__file__))
+
+
+def test_extract_tags():
+    assert extract_tags({"title": "読書 #趣味", "reflection": "#趣味、#本。"}) == ["趣味", "本"]
+
+
+def test_totals(analytics):
+    assert analytics.totals("title") == [("読書", 135), ("仕事", 90), ("散歩", 15)]
+    assert analytics.totals("title", since=_day(0), until=_day(1)) == [("仕事", 90), ("読書", 75)]
+    assert analytics.totals("location", limit=1) == [("(場所なし)", 150)]
+    assert analytics.totals("tag") == [("趣味", 75), ("読書", 45)]
+
+
+def test_daily_weekly_monthly_series(analytics):
+    assert analytics.series("day", label="読書") == [(_day(-1), 60), (_day(0), 30), (_day(1), 45)]
+    # 週は月曜始まり
+    assert analytics.series("week") == [(_day(-7), 60), (_day(0), 165), (_day(7), 15)]
+    assert analytics.series("month") == [(datetime.date(2026, 10, 1), 225), (datetime.date(2026, 11, 1), 15)]
+    assert analytics.series("day", label="無いラベル") == []
+
+
+def test_update_day_replaces_rows(analytics):
+    analytics.update_day(_day(0), [_event(540, 10, "読書")], None)
+    assert analytics.series("day", label="読書")[1] == (_day(0), 10)
+    assert ("仕事", 90) not in analytics.totals("title")
+    assert analytics.event_count == 4
+
+
+def test_streaks(analytics):
+    # 日曜〜火曜の 3 日連続が最長、最後に書いたのは 11 月 1 日の 1 日だけ
+    assert analytics.streaks(today=_day(13)) == (1, 3)
+    # 今日まだ書いていなくても、昨日まで続いていれば現在の連続に数える
+    assert analytics.streaks(today=_day(14)) == (1, 3)
+    assert analytics.streaks(today=_day(15)) == (0, 3)
+    assert analytics.streaks(label="読書", today=_day(2)) == (3, 3)
+    assert analytics.streaks(label="仕事", today=_day(0)) == (1, 1)
+    assert DiaryAnalytics().streaks() == (0, 0)
+
+
+def test_trends(analytics):
+    assert analytics.trends(days=7, today=_day(6)) == [("仕事", 90, 0), ("読書", 75, 60)]
+
+
+def test_refresh_reads_only_changed_files_and_save_load(tmp_path):
+    diaries = str(tmp_path / "Diaries")
+    write_day(_day(0), [_event(540, 30, "読書")], diaries)
+    write_day(_day(1), [_event(540, 60, "仕事")], diaries)
+    a = DiaryAnalytics()
+    assert a.refresh(diaries) == 2
+    assert a.refresh(diaries) == 0
+
+    path = str(tmp_path / "analytics.npz")
+    a.save(path)
+    loaded = DiaryAnalytics.load(path)
+    assert loaded.totals("title") == a.totals("title")
+    assert loaded.pending_days(diaries) == ([], [])
+
+    os.remove(day_path(_day(1), diaries))
+    write_day(_day(0), [_event(540, 45, "読書")], diaries)
+    assert loaded.refresh(diaries) == 2
+    assert loaded.totals("title") == [("読書", 45)]
+
+
+def test_load_missing_or_broken_file(tmp_path):
+    assert DiaryAnalytics.load(str(tmp_path / "none.npz")).event_count == 0
+    broken = tmp_path / "broken.npz"
+    broken.write_bytes(b"not npz")
+    assert DiaryAnalytics.load(str(broken)).event_count == 0
@@ -0,0 +1,141 @@
+"""日記の意味検索の索引（diary_embeddings.EmbeddingIndex）のテスト"""
+import datetime
+import json
+import os
+
+import pytest
+
+import diary_embeddings
+from diary_embeddings import EmbeddingIndex, HashingEmbedder
+from diary_store import day_path, write_day
+
+DAY = datetime.date(2026, 10, 19)
+
+
+class CountingEmbedder(HashingEmbedder):
+    """埋め込んだ文章を記録するローカル埋め込み"""
+
+    def __init__(self):
+        super().__init__(dim=64)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded += texts
+        return super().embed(texts)
+
+
+def _event(start: int, title: str, reflection: str = "") -> dict:
+    return {"start": start, "end": start + 60, "title": title, "location": "", "reflection": reflection}
+
+
+@pytest.fixture
+def diaries(tmp_path):
+    path = str(tmp_path / "Diaries")
+    write_day(DAY, [_event(540, "散歩", "公園で紅葉を見た"), _event(720, "昼食", "ラーメン")], path)
+    write_day(DAY + datetime.timedelta(days=1), [_event(540, "散歩", "公園で紅葉を見た"), _event(600, "")], path)
+    return path
+
+
+def _index(tmp_path, embedder=None) -> EmbeddingIndex:
+    return EmbeddingIndex(embedder or CountingEmbedder(), prefix=str(tmp_path / "emb"))
+
+
+def test_prefix_is_anchored_next_to_sources():
+    assert os.path.dirname(diary_embeddings.EMBEDDINGS_PREFIX) == os.path.dirname(os.path.abspath(diary_embeddings.__file__))
+
+
+def test_sync_embeds_each_text_once_and_stores_only_hashes(tmp_path, diaries):
+    index = _index(tmp_path)
+    assert index.sync(diaries) == 2
+    assert sorted(index.embedder.embedded) == ["散歩\n\n公園で紅葉を見た", "昼食\n\nラーメン"]
+    with open(index.index_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert all(isinstance(h, str) for hashes in meta["days"].values() for h in hashes)
+    assert "公園" not in json.dumps(meta, ensure_ascii=False)
+
+
+def test_sync_saves_index_once(tmp_path, diaries, monkeypatch):
+    monkeypatch.setattr(diary_embeddings, "EMBED_BATCH_SIZE", 1)
+    index = _index(tmp_path)
+    saves = []
+    original = index._save_index
+    monkeypatch.setattr(index, "_save_index", lambda: (saves.append(1), original()))
+    index.sync(diaries)
+    assert len(saves) == 1
+
+
+def test_second_sync_reads_only_changed_days(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    reloaded = _index(tmp_path)
+    assert reloaded.pending_days(diaries) == ([], [])
+    assert reloaded.sync(diaries) == 0
+
+    write_day(DAY, [_event(540, "散歩", "公園で紅葉を見た"), _event(800, "読書", "小説を読んだ")], diaries)
+    assert reloaded.sync(diaries) == 1
+    assert reloaded.embedder.embedded == ["読書\n\n小説を読んだ"]
+
+
+def test_search_returns_events_from_all_days(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    hits = index.search("公園で紅葉", k=10, diaries_dir=diaries)
+    assert [(hit.date, hit.event["title"]) for hit in hits[:2]] == [
+        (DAY, "散歩"), (DAY + datetime.timedelta(days=1), "散歩"),
+    ]
+    assert hits[0].score >= hits[-1].score
+    assert len(index.search("公園", k=1, diaries_dir=diaries)) == 1
+    assert index.search("  ", diaries_dir=diaries) == []
+
+
+def test_removed_day_is_dropped(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    os.remove(day_path(DAY, diaries))
+    index.sync(diaries)
+    assert list(index.days) == [(DAY + datetime.timedelta(days=1)).strftime("%Y%m%d")]
+    assert {hit.date for hit in index.search("ラーメン", k=10, diaries_dir=diaries)} == {DAY + datetime.timedelta(days=1)}
+
+
+def test_compaction_drops_unused_rows(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    write_day(DAY, [_event(540, "新しい予定", "別の内容")], diaries)
+    os.remove(day_path(DAY + datetime.timedelta(days=1), diaries))
+    index.sync(diaries)
+    # 3 行のうち 2 行が使われなくなり、半分を超えたので使われている行だけに詰め直す
+    assert len(index.rows) == 1
+    assert list(index.rows.values()) == [0]
+    assert os.path.getsize(index.matrix_path) == index.dim * 4
+    assert [hit.event["title"] for hit in index.search("新しい予定", k=5, diaries_dir=diaries)] == ["新しい予定"]
+
+
+def test_no_compaction_below_threshold(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    write_day(DAY, [_event(540, "散歩", "公園で紅葉を見た"), _event(800, "読書", "小説を読んだ")], diaries)
+    index.sync(diaries)
+    # 3 行中 1 行（昼食）だけが使われなくなった状態では詰め直さない
+    assert len(index.rows) == 3
+
+
+def test_old_index_format_is_read(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    with open(index.index_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["days"] = {key: [[h, {"title": "旧形式"}] for h in hashes] for key, hashes in meta["days"].items()}
+    with open(index.index_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    reloaded = _index(tmp_path)
+    assert reloaded.days == index.days
+
+
+def test_truncated_matrix_rebuilds_index(tmp_path, diaries):
+    index = _index(tmp_path)
+    index.sync(diaries)
+    with open(index.matrix_path, "r+b") as f:
+        f.truncate(4)
+    reloaded = _index(tmp_path)
+    assert reloaded.rows == {} and reloaded.files == {}
+    assert reloaded.sync(diaries) == 2
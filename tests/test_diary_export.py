@@ -0,0 +1,96 @@
+"""日記の書き出し（diary_export）のテスト"""
+import csv
+import datetime
+import io
+import json
+import os
+
+import pytest
+
+from diary_export import export_diaries, export_to_file, iter_events
+from diary_store import write_day
+
+DAY = datetime.date(2026, 10, 19)
+NEXT = DAY + datetime.timedelta(days=1)
+
+
+def _event(start: int, title: str, location: str = "", reflection: str = "") -> dict:
+    return {"start": start, "end": start + 30, "title": title, "location": location, "reflection": reflection}
+
+
+@pytest.fixture
+def diaries(tmp_path):
+    path = str(tmp_path / "Diaries")
+    write_day(NEXT, [_event(600, "散歩", "公園")], path)
+    write_day(DAY, [_event(720, "昼食", reflection="美味しかった\n また行きたい"), _event(540, "会議", "会社")], path)
+    with open(os.path.join(path, "20261021.json"), "w", encoding="utf-8") as f:
+        f.write("JSON ではないメモ")
+    return path
+
+
+def test_iter_events_orders_by_date_and_start(diaries):
+    assert [(d, ev["title"]) for d, ev in iter_events(diaries)] == [(DAY, "会議"), (DAY, "昼食"), (NEXT, "散歩")]
+
+
+def test_iter_events_filters_and_reports_progress(diaries):
+    progress = []
+    found = list(iter_events(diaries, since=NEXT, progress=lambda done, total: progress.append((done, total))))
+    assert [ev["title"] for _d, ev in found] == ["散歩"]
+    # JSON でない日も日数には数える
+    assert progress == [(1, 2), (2, 2)]
+    assert [ev["title"] for _d, ev in iter_events(diaries, query="また行き")] == ["昼食"]
+    assert list(iter_events(diaries, until=DAY - datetime.timedelta(days=1))) == []
+
+
+def test_csv(diaries):
+    out = io.StringIO()
+    assert export_diaries(out, "csv", diaries) == 3
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ["date", "start", "end", "title", "location", "reflection"]
+    assert rows[1] == ["2026-10-19", "09:00", "09:30", "会議", "会社", ""]
+    assert rows[2][5] == "美味しかった\n また行きたい"
+
+
+def test_jsonl(diaries):
+    out = io.StringIO()
+    export_diaries(out, "jsonl", diaries, query="公園")
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"date": "2026-10-20", "start": 600, "end": 630, "title": "散歩", "location": "公園", "reflection": ""},
+    ]
+
+
+def test_markdown(diaries):
+    out = io.StringIO()
+    export_diaries(out, "md", diaries)
+    assert out.getvalue() == (
+        "## 2026-10-19\n\n"
+        "- 09:00–09:30 会議（会社）\n"
+        "- 12:00–12:30 昼食\n"
+        "    美味しかった\n"
+        "     また行きたい\n"
+        "\n"
+        "## 2026-10-20\n\n"
+        "- 10:00–10:30 散歩（公園）\n"
+    )
+
+
+def test_unknown_format_and_cancel(diaries):
+    with pytest.raises(ValueError):
+        export_diaries(io.StringIO(), "xml", diaries)
+    out = io.StringIO()
+    assert export_diaries(out, "jsonl", diaries, cancelled=lambda: len(out.getvalue()) > 0) == 1
+
+
+def test_export_to_file_picks_format_from_extension(diaries, tmp_path):
+    csv_path = str(tmp_path / "out.csv")
+    assert export_to_file(csv_path, diaries_dir=diaries) == 3
+    with open(csv_path, "rb") as f:
+        assert f.read(3) == b"\xef\xbb\xbf"  # Excel 向けに BOM 付き
+    md_path = str(tmp_path / "out.md")
+    export_to_file(md_path, diaries_dir=diaries, since=NEXT)
+    with open(md_path, "r", encoding="utf-8") as f:
+        assert f.read().startswith("## 2026-10-20")
+    other = str(tmp_path / "out.txt")
+    export_to_file(other, diaries_dir=diaries)
+    with open(other, "r", encoding="utf-8") as f:
+        assert json.loads(f.readline())["title"] == "会議"
@@ -0,0 +1,172 @@
+"""編集ジャーナル（diary_journal）の記録・再生・チェックポイントのテスト"""
+import datetime
+import hashlib
+import json
+import os
+
+import pytest
+
+from diary_journal import EditJournal, journal_path, ops_for_changes, read_journal, recover_day
+from diary_store import day_path, read_day, write_day
+from event_store import EventStore
+
+DAY = datetime.date(2026, 10, 19)
+
+
+def _event(start: int, title: str = "") -> dict:
+    return {"start": start, "end": start + 15, "title": title, "location": "", "reflection": ""}
+
+
+def _open_day(diaries_dir: str):
+    """DiaryTab と同じ手順で日記を開き、ストアの変更をジャーナルに記録するようにする"""
+    events, ids, _replayed = recover_day(DAY, diaries_dir)
+    store = EventStore()
+    store.reset(events or [], ids)
+    journal = EditJournal(DAY, diaries_dir)
+    journal.base_ids = ids
+
+    def record(changes):
+        for op in ops_for_changes(changes, store):
+            journal.record(op)
+
+    store.subscribe(record)
+    return store, journal
+
+
+@pytest.fixture
+def diaries_dir(tmp_path):
+    path = str(tmp_path / "Diaries")
+    write_day(DAY, [_event(360, "起床"), _event(420, "朝食"), _event(480, "通勤")], path)
+    return path
+
+
+def test_replay_restores_remove_insert_and_update_by_id(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    store.remove(0)
+    new_id = store.insert(_event(540, "会議"))
+    # 削除で並びがずれても ID で対象を特定する
+    store.update(2, title="電車で通勤")
+    store.update(new_id, reflection="長引いた")
+    journal.close()  # 異常終了（チェックポイント前）
+
+    events, ids, replayed = recover_day(DAY, diaries_dir)
+    assert replayed == 4
+    assert ids == store.ids() == [1, 2, new_id]
+    assert events == store.events()
+    assert [ev["title"] for ev in events] == ["朝食", "電車で通勤", "会議"]
+    # 日記ファイルはまだ書き換えていない
+    assert len(read_day(DAY, diaries_dir)) == 3
+
+
+def test_batched_update_is_recorded_as_one_set_op(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    with store.batch():
+        store.update(1, start=435, end=450)
+        store.update(1, title="遅めの朝食")
+    journal.close()
+
+    _base, ops = read_journal(journal_path(DAY, diaries_dir))
+    assert ops == [{"op": "set", "id": 1, "fields": {"end": 450, "start": 435, "title": "遅めの朝食"}}]
+    events, _ids, replayed = recover_day(DAY, diaries_dir)
+    assert replayed == 1
+    assert events[1] == {**_event(435, "遅めの朝食"), "end": 450}
+
+
+def test_checkpoint_writes_file_and_keeps_ids_for_later_ops(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    store.remove(0)
+    journal.checkpoint(store.events(), store.ids())
+    assert not os.path.exists(journal.path)
+    assert journal.pending == 0
+
+    # チェックポイント後の操作は新しい基準（ID [1, 2]）に対して再生される
+    store.update(2, title="在宅")
+    journal.close()
+    base, _ops = read_journal(journal.path)
+    assert base["ids"] == [1, 2]
+    events, ids, replayed = recover_day(DAY, diaries_dir)
+    assert (ids, replayed) == ([1, 2], 1)
+    assert [ev["title"] for ev in events] == ["朝食", "在宅"]
+
+
+def test_stale_journal_with_hash_mismatch_is_dropped(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    store.update(0, title="二重に適用されてはいけない")
+    journal.close()
+    # チェックポイントで日記ファイルを書いた直後、ジャーナルを消す前に終了した状態
+    write_day(DAY, store.events(), diaries_dir)
+
+    events, ids, replayed = recover_day(DAY, diaries_dir)
+    assert replayed == 0
+    assert ids == [0, 1, 2]
+    assert events == store.events()
+    assert not os.path.exists(journal_path(DAY, diaries_dir))
+
+
+def test_journal_with_mismatched_id_count_is_dropped(diaries_dir):
+    path = journal_path(DAY, diaries_dir)
+    with open(day_path(DAY, diaries_dir), "r", encoding="utf-8") as f:
+        sha1 = hashlib.sha1(f.read().encode("utf-8")).hexdigest()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "base", "sha1": sha1, "ids": [0, 1]}) + "\n")
+        f.write(json.dumps({"op": "remove", "id": 0}) + "\n")
+
+    events, _ids, replayed = recover_day(DAY, diaries_dir)
+    assert replayed == 0
+    assert len(events) == 3
+    assert not os.path.exists(path)
+
+
+def test_truncated_last_line_is_ignored(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    store.update(0, title="確定した編集")
+    journal.close()
+    # 書きかけで終了した最終行
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "id": 1, "fields": {"title": "書きか')
+
+    events, _ids, replayed = recover_day(DAY, diaries_dir)
+    assert replayed == 1
+    assert events[0]["title"] == "確定した編集"
+    assert events[1]["title"] == "朝食"
+
+
+def test_ops_for_unknown_ids_are_skipped(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    store.update(0, title="有効")
+    journal.record({"op": "set", "id": 99, "fields": {"title": "無効"}})
+    journal.record({"op": "remove", "id": "0"})
+    journal.close()
+
+    events, ids, _replayed = recover_day(DAY, diaries_dir)
+    assert ids == [0, 1, 2]
+    assert events[0]["title"] == "有効"
+
+
+def test_journal_without_diary_file_replays_onto_empty_day(tmp_path):
+    diaries_dir = str(tmp_path / "Diaries")
+    store, journal = _open_day(diaries_dir)
+    event_id = store.insert(_event(600, "新しい日"))
+    journal.close()
+
+    events, ids, replayed = recover_day(DAY, diaries_dir)
+    assert (ids, replayed) == ([event_id], 1)
+    assert events[0]["title"] == "新しい日"
+
+
+def test_no_diary_and_no_journal(tmp_path):
+    assert recover_day(DAY, str(tmp_path)) == (None, [], 0)
+
+
+def test_non_json_diary_raises_value_error(tmp_path):
+    with open(day_path(DAY, str(tmp_path)), "w", encoding="utf-8") as f:
+        f.write("これは JSON ではない")
+    with pytest.raises(ValueError):
+        recover_day(DAY, str(tmp_path))
+
+
+def test_reset_is_not_journaled(diaries_dir):
+    store, journal = _open_day(diaries_dir)
+    store.reset([_event(360)])
+    assert journal.pending == 0
+    assert not os.path.exists(journal.path)
@@ -0,0 +1,73 @@
+"""ピック提案の履歴（draft_history）の記録と集計のテスト"""
+import os
+
+import pytest
+
+import draft_history
+from draft_history import SIDE_LOCAL, SIDE_SUGGESTED, DraftHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    h = DraftHistory(str(tmp_path / "history.sqlite3"))
+    yield h
+    h.close()
+
+
+def _add(history, enemies, suggested=(), local=(), created_at="2026-10-19T12:00:00", **kwargs):
+    return history.add("ミッド", [], {"トップ": "ダリウス"}, list(enemies), [(n, 1.0) for n in local],
+                       suggestion="提案文", suggested=list(suggested), created_at=created_at, **kwargs)
+
+
+def _sides(history, draft_id, side):
+    return [row[0] for row in history._conn.execute(
+        "SELECT champion FROM draft_champions WHERE draft_id = ? AND side = ?", (draft_id, side))]
+
+
+def test_default_db_is_anchored_next_to_sources():
+    assert os.path.isabs(draft_history.HISTORY_DB)
+    assert os.path.dirname(draft_history.HISTORY_DB) == os.path.dirname(os.path.abspath(draft_history.__file__))
+
+
+def test_add_and_get_round_trip(history):
+    draft_id = history.add("ミッド", ["ヨネ"], {"トップ": "ダリウス"}, ["アーリ"], [("シンドラ", 0.6543)],
+                           suggestion="シンドラがおすすめ", suggested=["シンドラ"], prefetched=True, wait_ms=12.5)
+    record = history.get(draft_id)
+    assert (record.role, record.bans, record.allies, record.enemies) == ("ミッド", ["ヨネ"], {"トップ": "ダリウス"}, ["アーリ"])
+    assert record.local_candidates == [("シンドラ", 0.654)]
+    assert record.prefetched and record.wait_ms == 12.5
+    assert history.get(draft_id + 1) is None
+    assert history.count() == 1
+
+
+def test_local_candidates_are_not_counted_as_suggested(history):
+    draft_id = _add(history, ["アーリ"], suggested=["シンドラ"], local=["ゼド", "シンドラ"])
+    assert _sides(history, draft_id, SIDE_SUGGESTED) == ["シンドラ"]
+    assert sorted(_sides(history, draft_id, SIDE_LOCAL)) == ["シンドラ", "ゼド"]
+    assert history.count_suggested_against("ゼド", "アーリ") == (0, 1)
+    assert history.count_suggested_against("シンドラ", "アーリ") == (1, 1)
+
+
+def test_count_and_top_suggested_against(history):
+    _add(history, ["アーリ", "ジンクス"], suggested=["シンドラ", "シンドラ"])
+    _add(history, ["アーリ"], suggested=["シンドラ", "ゼド"])
+    _add(history, ["アーリ"], suggested=["ゼド"])
+    _add(history, ["ジンクス"], suggested=["ゼド"])
+
+    assert history.count_suggested_against("シンドラ", "アーリ") == (2, 3)
+    assert history.count_suggested_against("シンドラ", "ジンクス") == (1, 2)
+    assert history.count_suggested_against("シンドラ", "ヨネ") == (0, 0)
+    assert history.top_suggested_against("アーリ") == [("シンドラ", 2), ("ゼド", 2)]
+    assert history.top_suggested_against("アーリ", limit=1) == [("シンドラ", 2)]
+
+
+def test_recent_filters_by_champion_and_period(history):
+    old = _add(history, ["アーリ"], created_at="2026-10-01T09:00:00")
+    mid = _add(history, ["ゼド"], local=["アーリ"], created_at="2026-10-10T09:00:00")
+    new = _add(history, ["ジンクス"], created_at="2026-10-19T09:00:00")
+
+    assert [r.id for r in history.recent()] == [new, mid, old]
+    assert [r.id for r in history.recent(limit=1)] == [new]
+    assert [r.id for r in history.recent(champion="アーリ")] == [mid, old]
+    assert [r.id for r in history.recent(champion="ダリウス")] == [new, mid, old]
+    assert [r.id for r in history.recent(since="2026-10-05", until="2026-10-15")] == [mid]
@@ -0,0 +1,112 @@
+"""EventStore の通知（batch でのまとめ方）のテスト"""
+from event_store import EventStore
+
+
+def _event(start: int, title: str = "") -> dict:
+    return {"start": start, "end": start + 15, "title": title, "location": "", "reflection": ""}
+
+
+def _recording_store(events=()):
+    store = EventStore(events)
+    received = []
+    store.subscribe(received.append)
+    return store, received
+
+
+def test_each_change_outside_batch_is_notified_immediately():
+    store, received = _recording_store([_event(360)])
+    store.update(0, title="朝食")
+    new_id = store.insert(_event(420))
+    assert [c.updated for c in received] == [{0: {"title"}}, {}]
+    assert received[1].inserted == [new_id]
+
+
+def test_batch_coalesces_updates_into_one_changeset():
+    store, received = _recording_store([_event(360, "a"), _event(420, "b")])
+    with store.batch():
+        store.update(0, title="x")
+        store.update(0, start=375, end=390)
+        store.update(1, location="家")
+    assert len(received) == 1
+    changes = received[0]
+    assert changes.updated == {0: {"title", "start", "end"}, 1: {"location"}}
+    # previous は最初の更新前の状態（元の位置を消すため）
+    assert changes.previous[0]["title"] == "a"
+    assert changes.previous[0]["start"] == 360
+    assert changes.affected_range(store) == (360, 435)
+
+
+def test_insert_then_update_in_batch_is_reported_as_insert_only():
+    store, received = _recording_store()
+    with store.batch():
+        event_id = store.insert(_event(360))
+        store.update(event_id, title="散歩")
+    assert received[0].inserted == [event_id]
+    assert received[0].updated == {}
+    assert store.get(event_id)["title"] == "散歩"
+
+
+def test_insert_then_remove_in_batch_emits_nothing():
+    store, received = _recording_store()
+    with store.batch():
+        event_id = store.insert(_event(360))
+        store.remove(event_id)
+    assert received == []
+    assert len(store) == 0
+
+
+def test_update_then_remove_in_batch_reports_original_event():
+    store, received = _recording_store([_event(360, "元")])
+    with store.batch():
+        store.update(0, title="変更")
+        store.remove(0)
+    assert received[0].updated == {}
+    assert received[0].removed[0]["title"] == "元"
+
+
+def test_nested_batches_emit_once_at_outermost_end():
+    store, received = _recording_store([_event(360)])
+    store.begin_batch()
+    with store.batch():
+        store.update(0, title="a")
+    assert received == []
+    store.update(0, title="b")
+    store.end_batch()
+    assert len(received) == 1
+    assert received[0].updated == {0: {"title"}}
+
+
+def test_unmatched_end_batch_is_ignored():
+    store, received = _recording_store([_event(360)])
+    store.end_batch()
+    store.update(0, title="a")
+    assert len(received) == 1
+
+
+def test_update_without_change_is_not_notified():
+    store, received = _recording_store([_event(360, "a")])
+    assert store.update(0, title="a") == {}
+    assert store.update(99, title="x") == {}
+    assert store.remove(99) is None
+    assert received == []
+
+
+def test_ids_stay_stable_after_remove_and_are_not_reused():
+    store, _received = _recording_store([_event(360), _event(420), _event(480)])
+    store.remove(1)
+    new_id = store.insert(_event(540))
+    assert store.ids() == [0, 2, new_id]
+    assert new_id == 3
+    # 使用中の ID を指定した追加は新しい ID に振り替える
+    assert store.insert(_event(600), event_id=0) == 4
+
+
+def test_reset_notifies_reset_and_discards_pending_batch():
+    store, received = _recording_store([_event(360)])
+    store.begin_batch()
+    store.update(0, title="捨てられる")
+    store.reset([_event(420)], ids=[5])
+    store.end_batch()
+    assert [c.reset for c in received] == [True]
+    assert store.ids() == [5]
+    assert store.insert(_event(480)) == 6
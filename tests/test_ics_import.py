@@ -0,0 +1,127 @@
+"""カレンダー取り込み（ics_import）のテスト"""
+import datetime
+import os
+import time
+
+import pytest
+
+from diary_store import day_path, read_day, write_day
+from ics_import import import_ics, parse_ics_datetime, split_into_days, unfold_lines
+
+DAY = datetime.date(2026, 10, 19)
+
+
+@pytest.fixture
+def tokyo_tz(monkeypatch):
+    """ローカルタイムゾーンを Asia/Tokyo に固定する"""
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _write_ics(path, events: list[str]) -> str:
+    body = "".join(f"BEGIN:VEVENT\r\n{ev}END:VEVENT\r\n" for ev in events)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{body}END:VCALENDAR\r\n")
+    return str(path)
+
+
+def _vevent(start: str, end: str, summary: str) -> str:
+    return f"DTSTART:{start}\r\nDTEND:{end}\r\nSUMMARY:{summary}\r\n"
+
+
+def test_unfold_lines_joins_continuation_lines():
+    lines = ["SUMMARY:長い\r\n", " タイトル\r\n", "\tの続き\r\n", "LOCATION:会議室\r\n"]
+    assert list(unfold_lines(lines)) == ["SUMMARY:長いタイトルの続き", "LOCATION:会議室"]
+    assert list(unfold_lines([])) == []
+
+
+def test_parse_utc_and_tzid_convert_to_local_time(tokyo_tz):
+    assert parse_ics_datetime("20261019T010000Z", {}) == datetime.datetime(2026, 10, 19, 10, 0)
+    assert parse_ics_datetime("20261019T090000", {"TZID": "Europe/London"}) == datetime.datetime(2026, 10, 19, 17, 0)
+    # タイムゾーン指定なしはそのままローカル時刻
+    assert parse_ics_datetime("20261019T090000", {}) == datetime.datetime(2026, 10, 19, 9, 0)
+
+
+def test_parse_skips_all_day_and_broken_values():
+    assert parse_ics_datetime("20261019", {"VALUE": "DATE"}) is None
+    assert parse_ics_datetime("2026101XT0900", {}) is None
+
+
+def test_split_into_days_rounds_to_slots():
+    start = datetime.datetime(2026, 10, 19, 9, 7)
+    end = datetime.datetime(2026, 10, 19, 9, 31)
+    assert list(split_into_days(start, end)) == [(DAY, 9 * 60, 9 * 60 + 45)]
+
+
+def test_split_into_days_across_day_boundary():
+    # 06:00 が日記の日付の区切り。05:50 までは前日、その後は翌日に分ける
+    start = datetime.datetime(2026, 10, 19, 23, 10)
+    end = datetime.datetime(2026, 10, 20, 7, 20)
+    assert list(split_into_days(start, end)) == [
+        (DAY, 23 * 60, 30 * 60),
+        (DAY + datetime.timedelta(days=1), 6 * 60, 7 * 60 + 30),
+    ]
+
+
+def test_split_into_days_before_6am_belongs_to_previous_day():
+    start = datetime.datetime(2026, 10, 20, 1, 0)
+    end = datetime.datetime(2026, 10, 20, 2, 0)
+    assert list(split_into_days(start, end)) == [(DAY, 25 * 60, 26 * 60)]
+
+
+def test_import_writes_events_and_reimport_is_deduplicated(tmp_path):
+    ics = _write_ics(tmp_path / "cal.ics", [
+        _vevent("20261019T090000", "20261019T100000", "会議"),
+        _vevent("20261019T120000", "20261019T130000", "昼食"),
+    ])
+    diaries = str(tmp_path / "Diaries")
+
+    first = import_ics(ics, diaries)
+    assert (first.events, first.duplicates, first.days) == (2, 0, {DAY})
+    assert [ev["title"] for ev in read_day(DAY, diaries)] == ["会議", "昼食"]
+
+    second = import_ics(ics, diaries)
+    assert (second.events, second.duplicates, second.days) == (0, 2, set())
+    assert len(read_day(DAY, diaries)) == 2
+
+
+def test_import_merges_with_existing_diary(tmp_path):
+    diaries = str(tmp_path / "Diaries")
+    write_day(DAY, [{"start": 8 * 60, "end": 8 * 60 + 15, "title": "朝食", "location": "", "reflection": "美味しい"}],
+              diaries)
+    ics = _write_ics(tmp_path / "cal.ics", [_vevent("20261019T090000", "20261019T100000", "会議")])
+
+    import_ics(ics, diaries)
+    events = read_day(DAY, diaries)
+    assert [(ev["title"], ev["reflection"]) for ev in events] == [("朝食", "美味しい"), ("会議", "")]
+
+
+def test_import_skips_and_reports_non_json_days(tmp_path):
+    diaries = str(tmp_path / "Diaries")
+    os.makedirs(diaries)
+    with open(day_path(DAY, diaries), "w", encoding="utf-8") as f:
+        f.write("手書きのメモ")
+    next_day = DAY + datetime.timedelta(days=1)
+    ics = _write_ics(tmp_path / "cal.ics", [
+        _vevent("20261019T090000", "20261019T100000", "会議"),
+        _vevent("20261019T120000", "20261019T130000", "昼食"),
+        _vevent("20261020T090000", "20261020T100000", "散歩"),
+    ])
+
+    result = import_ics(ics, diaries)
+    assert result.skipped_days == {DAY}
+    assert result.skipped_events == 2
+    assert (result.events, result.days) == (1, {next_day})
+    with open(day_path(DAY, diaries), "r", encoding="utf-8") as f:
+        assert f.read() == "手書きのメモ"
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    diaries = str(tmp_path / "Diaries")
+    ics = _write_ics(tmp_path / "cal.ics", [_vevent("20261019T090000", "20261019T100000", "会議")])
+    result = import_ics(ics, diaries, dry_run=True)
+    assert result.events == 1
+    assert read_day(DAY, diaries) is None
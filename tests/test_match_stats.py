@@ -0,0 +1,118 @@
+"""対戦履歴からの勝率集計（match_stats）のテスト"""
+import json
+import os
+
+import pytest
+
+import match_stats
+from match_stats import MatchStats
+
+NAMES = ["アーリ", "ゼド", "ダリウス", "ガレン"]
+EN_TO_JA = {"Ahri": "アーリ", "Zed": "ゼド", "Darius": "ダリウス", "Garen": "ガレン"}
+
+
+def _match(match_id: str, blue: list[tuple[str, str]], red: list[tuple[str, str]], blue_win: bool = True) -> dict:
+    participants = [{"championName": c, "teamId": 100, "teamPosition": pos, "win": blue_win} for c, pos in blue]
+    participants += [{"championName": c, "teamId": 200, "teamPosition": pos, "win": not blue_win} for c, pos in red]
+    return {"metadata": {"matchId": match_id}, "info": {"participants": participants}}
+
+
+def _write(folder, name: str, data) -> str:
+    path = os.path.join(str(folder), name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def _import(stats: MatchStats, folder):
+    batch = stats.collect(stats.pending_files(str(folder)))
+    stats.apply(batch)
+    return batch
+
+
+@pytest.fixture
+def stats():
+    return MatchStats(NAMES, EN_TO_JA.get)
+
+
+def test_stats_file_is_anchored_next_to_sources():
+    assert os.path.dirname(match_stats.MATCH_STATS_FILE) == os.path.dirname(os.path.abspath(match_stats.__file__))
+
+
+def test_collect_counts_games_roles_and_matchups(stats, tmp_path):
+    _write(tmp_path, "1.json", _match("JP1_1", [("Ahri", "MIDDLE"), ("Darius", "TOP")], [("Zed", "MIDDLE")]))
+    _write(tmp_path, "2.json", [
+        _match("JP1_2", [("Ahri", "MIDDLE")], [("Zed", "MIDDLE")], blue_win=False),
+        _match("JP1_3", [("Ahri", "TOP")], [("Garen", "TOP")]),
+    ])
+    batch = _import(stats, tmp_path)
+
+    assert batch.match_count == 3 and stats.match_count == 3
+    assert stats.win_rate("アーリ") == pytest.approx((2 / 3, 3))
+    assert stats.win_rate("アーリ", "ミッド") == (0.5, 2)
+    assert stats.win_rate("アーリ", "トップ") == (1.0, 1)
+    assert stats.win_rate("ゼド") == (0.5, 2)
+    assert stats.matchup_rate("アーリ", ["ゼド"]) == (0.5, 2)
+    assert stats.matchup_rate("アーリ", ["ゼド", "ガレン"]) == pytest.approx((2 / 3, 3))
+    assert stats.matchup_rate("ダリウス", ["ガレン"]) is None
+    assert stats.win_rate("ガレン", "ミッド") is None
+
+
+def test_only_new_or_changed_files_are_read(stats, tmp_path):
+    _write(tmp_path, "1.json", _match("JP1_1", [("Ahri", "MIDDLE")], [("Zed", "MIDDLE")]))
+    _import(stats, tmp_path)
+    assert stats.pending_files(str(tmp_path)) == []
+
+    path = _write(tmp_path, "2.json", _match("JP1_2", [("Ahri", "MIDDLE")], [("Zed", "MIDDLE")]))
+    assert stats.pending_files(str(tmp_path)) == [path]
+    _import(stats, tmp_path)
+    assert stats.win_rate("アーリ") == (1.0, 2)
+
+
+def test_same_match_is_counted_once(stats, tmp_path):
+    match = _match("JP1_1", [("Ahri", "MIDDLE")], [("Zed", "MIDDLE")])
+    _write(tmp_path, "a.json", match)
+    _write(tmp_path, "b.json", [match, match])
+    _import(stats, tmp_path)
+    # 書き直されたファイルを読み直しても、取り込み済みの試合は数えない
+    _write(tmp_path, "a.json", [match])
+    _import(stats, tmp_path)
+    assert stats.win_rate("アーリ") == (1.0, 1)
+
+
+def test_unresolved_names_skip_match_and_file(stats, tmp_path):
+    path = _write(tmp_path, "1.json", _match("JP1_1", [("Ahri", "MIDDLE")], [("Smolder", "MIDDLE")]))
+    with open(os.path.join(str(tmp_path), "broken.json"), "w", encoding="utf-8") as f:
+        f.write("{")
+    batch = _import(stats, tmp_path)
+
+    assert batch.unresolved == {"Smolder": 1}
+    assert batch.skipped_files == [path]
+    assert len(batch.errors) == 1 and batch.errors[0].startswith("broken.json")
+    assert stats.match_count == 0 and stats.win_rate("アーリ") is None
+    # 取り込み済みにしていないので、次回も読み直す
+    assert path in stats.pending_files(str(tmp_path))
+
+
+def test_save_and_load_remaps_changed_roster(stats, tmp_path):
+    folder = tmp_path / "history"
+    folder.mkdir()
+    _write(folder, "1.json", _match("JP1_1", [("Ahri", "MIDDLE")], [("Zed", "MIDDLE")]))
+    _import(stats, folder)
+    path = str(tmp_path / "stats.npz")
+    stats.save(path)
+
+    loaded = MatchStats.load(["ゼド", "新チャンピオン", "アーリ"], EN_TO_JA.get, path)
+    assert loaded.win_rate("アーリ", "ミッド") == (1.0, 1)
+    assert loaded.matchup_rate("ゼド", ["アーリ"]) == (0.0, 1)
+    assert loaded.win_rate("新チャンピオン") is None
+    assert loaded.match_count == 1
+    assert loaded.pending_files(str(folder)) == []
+
+
+def test_describe_needs_enough_games(stats, tmp_path):
+    for i in range(match_stats.MIN_GAMES_TO_SHOW):
+        _write(tmp_path, f"{i}.json", _match(f"JP1_{i}", [("Ahri", "MIDDLE")], [("Zed", "MIDDLE")], blue_win=i > 0))
+    _import(stats, tmp_path)
+    assert stats.describe("アーリ", "ミッド", ["ゼド"]) == "勝率 80%/5戦・対面 80%/5戦"
+    assert stats.describe("ダリウス", None, ["ゼド"]) == ""
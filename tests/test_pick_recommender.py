@@ -0,0 +1,77 @@
+"""ローカルのピック推薦（pick_recommender）のテスト"""
+import json
+
+import numpy as np
+import pytest
+
+from pick_recommender import NO_CHAMPION, ROLE_WEIGHT, UNKNOWN_ROLE_PRIOR, PickRecommender, load_roster
+
+NAMES = [NO_CHAMPION, "ダリウス", "ガレン", "アーリ", "ゼド", "ザヤ", "ラカン", "ティーモ"]
+ROLES_DATA = {
+    "トップ": ["ダリウス", "ガレン"],
+    "ミッド": ["アーリ", "ゼド"],
+    "ADC": ["ザヤ"],
+    "サポート": ["ラカン"],
+}
+
+
+@pytest.fixture
+def recommender() -> PickRecommender:
+    return PickRecommender(NAMES, ROLES_DATA,
+                           synergy=[["ザヤ", "ラカン", 1.0]],
+                           counter=[["ガレン", "ダリウス", 0.5], ["存在しない", "ダリウス", 1.0]])
+
+
+def test_role_fit_ranks_listed_champions_first(recommender):
+    assert recommender.recommend("トップ", {}, [], [], top_k=2) == [("ダリウス", ROLE_WEIGHT), ("ガレン", ROLE_WEIGHT)]
+    # ロール表に載っていないチャンピオンは全ロールに事前値
+    assert ("ティーモ", ROLE_WEIGHT * UNKNOWN_ROLE_PRIOR) in recommender.recommend("ミッド", {}, [], [], top_k=10)
+
+
+def test_synergy_is_symmetric(recommender):
+    top = recommender.recommend("ADC", {"サポート": "ラカン"}, [], [], top_k=1)
+    assert top == [("ザヤ", ROLE_WEIGHT + 1.0)]
+    score = recommender.score_all("サポート", {"ADC": "ザヤ"}, [], [])
+    assert score[NAMES.index("ラカン")] == pytest.approx(ROLE_WEIGHT + 1.0)
+
+
+def test_counter_adds_and_reverse_subtracts(recommender):
+    assert recommender.recommend("トップ", {}, ["ダリウス"], [], top_k=1) == [("ガレン", ROLE_WEIGHT + 0.5)]
+    score = recommender.score_all("トップ", {}, ["ガレン"], [])
+    assert score[NAMES.index("ダリウス")] == pytest.approx(ROLE_WEIGHT - 0.5)
+
+
+def test_bans_picks_and_placeholder_are_excluded(recommender):
+    score = recommender.score_all(None, {"トップ": "ダリウス"}, ["アーリ"], ["ゼド"])
+    for name in (NO_CHAMPION, "ダリウス", "アーリ", "ゼド"):
+        assert score[NAMES.index(name)] == -np.inf
+    names = [n for n, _s in recommender.recommend(None, {"トップ": "ダリウス"}, ["アーリ"], ["ゼド"], top_k=10)]
+    assert not {NO_CHAMPION, "ダリウス", "アーリ", "ゼド"} & set(names)
+
+
+def test_without_role_uses_best_open_role(recommender):
+    # トップは味方が埋めているので、ガレンのトップ適性は使わない
+    score = recommender.score_all(None, {"トップ": "ダリウス"}, [], [])
+    assert score[NAMES.index("ガレン")] == 0.0
+    assert score[NAMES.index("アーリ")] == ROLE_WEIGHT
+
+
+def test_ties_are_broken_by_roster_order_and_top_k_is_capped(recommender):
+    assert [n for n, _s in recommender.recommend("ミッド", {}, [], [], top_k=2)] == ["アーリ", "ゼド"]
+    all_candidates = recommender.recommend("ミッド", {}, [], [], top_k=100)
+    assert len(all_candidates) == len(NAMES) - 1
+    banned_all = NAMES[1:]
+    assert recommender.recommend("ミッド", {}, [], banned_all) == []
+
+
+def test_load_adds_placeholder_and_tolerates_missing_data(tmp_path):
+    roster = tmp_path / "names.json"
+    roster.write_text(json.dumps(["アーリ", "ゼド"], ensure_ascii=False), encoding="utf-8")
+    assert load_roster(str(roster)) == [NO_CHAMPION, "アーリ", "ゼド"]
+
+    rec = PickRecommender.load(str(roster), str(tmp_path / "missing.json"))
+    assert rec.recommend("ミッド", {}, [], []) == [("アーリ", ROLE_WEIGHT * UNKNOWN_ROLE_PRIOR),
+                                                  ("ゼド", ROLE_WEIGHT * UNKNOWN_ROLE_PRIOR)]
+    data = tmp_path / "pick_data.json"
+    data.write_text(json.dumps({"roles": {"ミッド": ["ゼド"]}}, ensure_ascii=False), encoding="utf-8")
+    assert PickRecommender.load(str(roster), str(data)).recommend("ミッド", {}, [], [], top_k=1) == [("ゼド", ROLE_WEIGHT)]
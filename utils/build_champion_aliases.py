@@ -0,0 +1,119 @@
+"""ダウンロード済みの champion.json から別名表 champion_aliases.json を生成する。
+
+使い方（get_all_champion_images.py を実行したディレクトリで）:
+    python utils/build_champion_aliases.py
+    python utils/build_champion_aliases.py --en champion.json --ja champion_ja_JP.json --out champion_aliases.json
+
+英語版・日本語版の champion.json を英語 ID で突き合わせ、日本語名・英語 ID・英語名・ローマ字・通称を 1 件にまとめる。
+日本語名は champion_names_ja.json の表記に揃える（正規化して一致するものがあればそちらを使う）。
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from champion_matcher import NO_CHAMPION, to_hiragana, to_romaji  # noqa: E402
+
+# よく使われる通称（英語 ID → 通称）。Data Dragon に無い情報なのでここで管理する。
+# 他のチャンピオン名の一部と紛らわしい通称（「シン」→シン・ジャオ/リー・シン/シンドラ、「イー」「リー」「カサ」「トリン」など）は
+# 補完や提案文からの名前の拾い出しで別のチャンピオンに当たるため載せない
+# （既存の champion_aliases.json に残っていても ChampionAliases が読み込み時に除く）
+COMMON_NICKNAMES = {
+    "AurelionSol": ["asol", "ソル"],
+    "Blitzcrank": ["blitz", "ブリッツ"],
+    "Caitlyn": ["cait", "ケイト"],
+    "Cassiopeia": ["cassio", "カシオ"],
+    "DrMundo": ["mundo", "ムンド"],
+    "Ezreal": ["ez", "エズ"],
+    "Fiddlesticks": ["fiddle", "フィドル"],
+    "Heimerdinger": ["heimer", "ハイマー"],
+    "JarvanIV": ["j4", "jarvan", "ジャーヴァン"],
+    "Kassadin": ["kass"],
+    "Katarina": ["kata", "カタリナ"],
+    "KogMaw": ["kog", "コグ"],
+    "LeeSin": ["lee"],
+    "Malphite": ["malph", "マルファ"],
+    "MasterYi": ["yi"],
+    "MissFortune": ["mf", "ミスフォ"],
+    "MonkeyKing": ["wukong"],
+    "Mordekaiser": ["morde", "モルデ"],
+    "Nidalee": ["nida", "ニダリー"],
+    "Nunu": ["nunu", "ヌヌ"],
+    "Orianna": ["ori", "オリ"],
+    "Pantheon": ["panth", "パンテ"],
+    "RekSai": ["reksai", "レク"],
+    "Seraphine": ["sera", "セラ"],
+    "TahmKench": ["tahm", "タム"],
+    "TwistedFate": ["tf", "ツイフェ"],
+    "Tryndamere": ["trynd"],
+    "Velkoz": ["velkoz", "ヴェル"],
+    "Vladimir": ["vlad", "ブラッド"],
+    "XinZhao": ["xin"],
+}
+
+
+def _load_data(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["data"]
+
+
+def build_aliases(en_data: dict, ja_data: dict, roster: list[str]) -> list[dict]:
+    """英語 ID ごとの別名エントリを作る（日本語名順）"""
+    roster_by_norm = {to_hiragana(name): name for name in roster if name != NO_CHAMPION}
+    entries = []
+    for champ_id, info in en_data.items():
+        ja_info = ja_data.get(champ_id)
+        if ja_info is None:
+            print(f"日本語名が見つかりません: {champ_id}", file=sys.stderr)
+            continue
+        ja = roster_by_norm.get(to_hiragana(ja_info["name"]), ja_info["name"])
+        entries.append({
+            "ja": ja,
+            "id": champ_id,
+            "en": info.get("name", champ_id),
+            "romaji": to_romaji(ja),
+            "nicknames": COMMON_NICKNAMES.get(champ_id, []),
+        })
+    entries.sort(key=lambda e: to_hiragana(e["ja"]))
+    return entries
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="champion.json から別名表を生成する")
+    parser.add_argument("--en", default="champion.json", help="英語版 champion.json")
+    parser.add_argument("--ja", default="champion_ja_JP.json", help="日本語版 champion.json")
+    parser.add_argument("--names", default=os.path.join(ROOT_DIR, "champion_names_ja.json"),
+                        help="アプリで使う日本語名一覧（表記を揃える）")
+    parser.add_argument("--out", default=os.path.join(ROOT_DIR, "champion_aliases.json"))
+    args = parser.parse_args(argv)
+
+    try:
+        en_data = _load_data(args.en)
+        ja_data = _load_data(args.ja)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"champion.json を読み込めません: {e}", file=sys.stderr)
+        print("先に utils/get_all_champion_images.py を実行してください。", file=sys.stderr)
+        return 1
+    try:
+        with open(args.names, "r", encoding="utf-8") as f:
+            roster = json.load(f)
+    except (OSError, ValueError):
+        roster = []
+
+    version = next(iter(en_data.values()), {}).get("version")
+    entries = build_aliases(en_data, ja_data, roster)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "champions": entries}, f, ensure_ascii=False, indent=2)
+    print(f"{len(entries)} 件を書き出しました: {args.out}")
+
+    missing = set(roster) - {NO_CHAMPION} - {e["ja"] for e in entries}
+    if missing:
+        print("champion_names_ja.json にあって別名表に無い名前: " + ", ".join(sorted(missing)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""champion_icons/ の PNG を 1 枚のスプライトアトラスにまとめる。
+
+使い方（get_all_champion_images.py を実行したディレクトリで）:
+    python utils/build_icon_atlas.py
+    python utils/build_icon_atlas.py --icons champion_icons --cell 48
+
+出力:
+    champion_icons_atlas.png   各アイコンを cell×cell に縮小して格子状に並べた画像
+    champion_icons_atlas.json  {"cell": 48, "icons": {"Ahri": [x, y], ...}}（キーはファイル名＝英語 ID）
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPainter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# アトラスに格納する 1 アイコンの大きさ（表示は最大でもこの大きさまで）
+DEFAULT_CELL = 48
+
+
+def build_atlas(icon_dir: str, cell: int) -> tuple[QImage, dict]:
+    files = sorted(f for f in os.listdir(icon_dir) if f.lower().endswith(".png"))
+    columns = max(1, math.ceil(math.sqrt(len(files))))
+    rows = max(1, math.ceil(len(files) / columns))
+    atlas = QImage(columns * cell, rows * cell, QImage.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.transparent)
+
+    offsets = {}
+    painter = QPainter(atlas)
+    try:
+        for i, filename in enumerate(files):
+            icon = QImage(os.path.join(icon_dir, filename))
+            if icon.isNull():
+                print(f"読み込めません: {filename}", file=sys.stderr)
+                continue
+            icon = icon.scaled(cell, cell, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            x, y = (i % columns) * cell, (i // columns) * cell
+            painter.drawImage(x, y, icon)
+            offsets[os.path.splitext(filename)[0]] = [x, y]
+    finally:
+        painter.end()
+    return atlas, offsets
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="チャンピオンアイコンのアトラスを作る")
+    parser.add_argument("--icons", default="champion_icons", help="アイコン PNG のディレクトリ")
+    parser.add_argument("--cell", type=int, default=DEFAULT_CELL, help="1 アイコンの大きさ（ピクセル）")
+    parser.add_argument("--out", default=os.path.join(ROOT_DIR, "champion_icons_atlas"),
+                        help="出力ファイル名（拡張子なし）")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.icons):
+        print(f"アイコンのディレクトリがありません: {args.icons}", file=sys.stderr)
+        print("先に utils/get_all_champion_images.py を実行してください。", file=sys.stderr)
+        return 1
+
+    atlas, offsets = build_atlas(args.icons, args.cell)
+    if not atlas.save(args.out + ".png", "PNG"):
+        print(f"保存に失敗しました: {args.out}.png", file=sys.stderr)
+        return 1
+    with open(args.out + ".json", "w", encoding="utf-8") as f:
+        json.dump({"cell": args.cell, "icons": offsets}, f, ensure_ascii=False)
+    print(f"{len(offsets)} 件をまとめました: {args.out}.png ({atlas.width()}x{atlas.height()})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
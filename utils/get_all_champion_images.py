@@ -10,9 +10,16 @@ except (requests.RequestException, IndexError) as e:
     print(f"バージョン取得エラー: {e}")
     exit(1)
 
-# 2. champion.json を取る
+# 2. champion.json を取る（英語版と日本語版。別名表の生成に使うので保存しておく）
 cj = requests.get(f"https://ddragon.leagueoflegends.com/cdn/{v}/data/en_US/champion.json").json()
 champions = cj["data"]
+with open("champion.json", "w", encoding="utf-8") as f:
+    json.dump(cj, f, ensure_ascii=False)
+
+cj_ja = requests.get(f"https://ddragon.leagueoflegends.com/cdn/{v}/data/ja_JP/champion.json", timeout=10)
+if cj_ja.ok:
+    with open("champion_ja_JP.json", "w", encoding="utf-8") as f:
+        json.dump(cj_ja.json(), f, ensure_ascii=False)
 
 os.makedirs("champion_icons", exist_ok=True)
 os.makedirs("champion_splashes", exist_ok=True)